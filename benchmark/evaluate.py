@@ -3,46 +3,707 @@ import pandas as pd
 import numpy as np
 import yaml
 import argparse
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, ConcatDataset, Subset, default_collate
 from tqdm import tqdm
 import os
 import sys
+import multiprocessing as mp
+import queue as queue_module
+import time
 
-from benchmark.utils.data_loader import AudioManifestDataset
-from benchmark.utils.metrics import calculate_metrics
+from benchmark.utils.audio_preprocessing import DropFailedCollate
+from benchmark.utils.data_loader import DurationBucketBatchSampler, open_audio_dataset
+from benchmark.utils.manifest import load_manifest
+from benchmark.utils.metrics import calculate_metrics, calculate_metrics_many
+from benchmark.utils.streaming_metrics import StreamingMetrics
+from benchmark.utils.bootstrap import bootstrap_ci
 from benchmark.utils.model_loader import load_model_from_path
+from benchmark.utils.feature_store import FeatureCachedDetector
+from benchmark.utils.precision import apply_precision, find_backbone
+from benchmark.utils.preflight import PreflightIndex, preflight_failures
+from benchmark.utils.compiled_backend import compile_backend
+from benchmark.utils.onnx_runtime import OnnxDetector
+from benchmark.utils.batch_size import (
+    BatchSizeCache, default_memory_budget, is_out_of_memory, model_hash, probe_batch_size,
+)
+from benchmark.utils.score_journal import ScoreJournal, file_sha1
+from benchmark.utils.score_store import ScoreStore, new_run_id, path_hashes
+from benchmark.utils.stage_timer import STAGE_TIMER, TimedCall, write_timing_report
+from benchmark.utils.windowing import WindowedScorer
 from benchmark.generate_latex_table import generate_latex_from_metrics
-from models.detector_wrapper import AudioDeepfakeDetector
 
-def run_evaluation(model, dataloader, device):
+def _group_by_batch(completed):
     """
-    Runs the model over the dataset and collects scores and labels.
+    Groups consecutive (key, score, label) results whose keys are
+    (batch tag, position) into (tag, positions, scores, labels) tuples.
     """
-    all_scores = []
-    all_labels = []
-    
+    groups = []
+    for (tag, position), score, label in completed:
+        if not groups or groups[-1][0] is not tag:
+            groups.append((tag, [], [], []))
+        groups[-1][1].append(position)
+        groups[-1][2].append(score)
+        groups[-1][3].append(label)
+    return [(tag, positions, np.array(scores), np.array(labels)) for tag, positions, scores, labels in groups]
+
+def _score_batch(model, waveforms):
+    """
+    Scores a batch with one detector, or with every detector of a list, in
+    which case the result has one column per detector.
+
+    A batch that runs out of memory is split in two halves that are scored
+    separately (recursively), instead of aborting the run.
+    """
+    try:
+        if isinstance(model, (list, tuple)):
+            return torch.stack([m.get_prediction_score(waveforms).reshape(-1) for m in model], dim=1)
+        return model.get_prediction_score(waveforms)
+    except RuntimeError as e:
+        if not is_out_of_memory(e) or len(waveforms) < 2:
+            raise
+    if waveforms.is_cuda:
+        torch.cuda.empty_cache()
+    half = len(waveforms) // 2
+    print(f"\nWarning: out of memory on a batch of {len(waveforms)}; retrying as two batches of {half} and {len(waveforms) - half}.")
+    halves = [_score_batch(model, waveforms[:half]), _score_batch(model, waveforms[half:])]
+    if not isinstance(model, (list, tuple)):
+        halves = [h.reshape(-1) for h in halves]
+    return torch.cat(halves, dim=0)
+
+def _score_on_device(model, waveforms, device):
+    # Host-to-device copy and forward pass, timed separately when timing is on
+    with STAGE_TIMER.stage('host_to_device', sync_device=device):
+        waveforms = waveforms.to(device)
+    with STAGE_TIMER.stage('model', sync_device=device):
+        return _score_batch(model, waveforms)
+
+def _score_variable_length(model, waveforms, lengths, device):
+    """
+    Scores a zero-padded batch of variable-length clips without letting the
+    padding reach the model, which has no input mask: each clip is trimmed to
+    its own length and clips of equal length are scored together, so a score
+    never depends on the other clips of the batch.
+
+    Returns:
+        np.ndarray: One score per item, or (items, detectors) for a list of detectors.
+    """
+    lengths = [int(length) for length in lengths]
+    scores = None
+    for length in sorted(set(lengths)):
+        indices = [i for i, l in enumerate(lengths) if l == length]
+        group_scores = _score_on_device(model, waveforms[indices, :length], device).cpu().numpy()
+        group_scores = group_scores.reshape(len(indices), -1)
+        if scores is None:
+            scores = np.zeros((len(lengths), group_scores.shape[1]), dtype=group_scores.dtype)
+        scores[indices] = group_scores
+    return scores if isinstance(model, (list, tuple)) else scores.flatten()
+
+def iter_scored_batches(model, dataloader, device, batch_plan=None, desc="Evaluating", windowing=None,
+                        scope_fn=None):
+    """
+    Runs the model over a DataLoader and yields (tag, positions, scores, labels).
+
+    `model` may also be a list of detectors; every batch then goes through each
+    of them and `scores` has shape (items, detectors).
+
+    `batch_plan` holds one tag per batch, in loader order; it defaults to the
+    loader's batch sampler, i.e. the manifest rows of each batch. `positions`
+    index the items of the tagged batch that the scores belong to. With a
+    DropFailedCollate, only the items that failed to load are left out;
+    with any other collate, batches with loading errors are skipped.
+
+    Padded batches of variable-length clips (with per-item lengths) are
+    scored clip by clip trimmed to their lengths, grouping equal lengths; see
+    _score_variable_length.
+
+    With `windowing` (keyword arguments of WindowedScorer except score_fn), each
+    utterance is scored over sliding windows that are packed across utterances
+    into full model batches; results are then yielded as utterances complete,
+    so a batch may be yielded in several parts.
+
+    `scope_fn` maps a batch tag to the stage timer scope (the manifest) that
+    the time spent waiting for and scoring the batch is attributed to.
+    """
+    if batch_plan is None:
+        batch_plan = dataloader.batch_sampler
+
+    scorer = None
+    if windowing is not None:
+        scorer = WindowedScorer(lambda w: _score_on_device(model, w, device), **windowing)
+
     with torch.no_grad():
-        for waveforms, labels in tqdm(dataloader, desc="Evaluating"):
-            # Skip batches with loading errors
-            if -1 in labels:
+        batches = iter(tqdm(dataloader, desc=desc))
+        for tag in batch_plan:
+            if scope_fn is not None:
+                STAGE_TIMER.scope = scope_fn(tag)
+            with STAGE_TIMER.stage('data_wait'):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            STAGE_TIMER.step()
+
+            # Padding-aware collates also return per-item lengths
+            waveforms, labels = batch[0], batch[1]
+            lengths = batch[2] if len(batch) > 2 else None
+            if len(batch) == 4:
+                # DropFailedCollate: failed items are already left out
+                positions = batch[3].tolist()
+                if not positions:
+                    continue
+            elif -1 in labels:
+                # Skip batches with loading errors
+                continue
+            else:
+                positions = list(range(len(labels)))
+
+            if scorer is not None:
+                if lengths is None:
+                    lengths = [waveforms.shape[-1]] * len(labels)
+                for i, position in enumerate(positions):
+                    scorer.add((tag, position), waveforms[i], int(lengths[i]), int(labels[i]))
+                yield from _group_by_batch(scorer.score_ready())
                 continue
-            
-            waveforms = waveforms.to(device)
             
             # Get model predictions using the wrapper's method
-            scores = model.get_prediction_score(waveforms)
-            
-            all_scores.extend(scores.cpu().numpy().flatten())
-            all_labels.extend(labels.numpy().flatten())
+            if lengths is not None and bool((lengths < waveforms.shape[-1]).any()):
+                scores = _score_variable_length(model, waveforms, lengths, device)
+            else:
+                scores = _score_on_device(model, waveforms, device).cpu().numpy()
+                scores = scores.reshape(len(labels), -1) if isinstance(model, (list, tuple)) else scores.flatten()
             
-    return all_labels, all_scores
+            yield tag, positions, scores, labels.numpy().flatten()
+
+        if scorer is not None:
+            yield from _group_by_batch(scorer.score_ready(flush=True))
+
+def run_group_evaluation(models, jobs, batch_size, device, collate_fn=None, num_workers=4,
+                         max_batch_samples=None, windowing=None):
+    """
+    Streams the pending rows of every dataset in a group through a single
+    DataLoader, so one worker pool serves the whole group and keeps prefetching
+    across dataset boundaries. Batches never mix datasets; each one is tagged
+    with its dataset, scored by every detector and journaled as soon as it is
+    scored, so decoding is paid once for all detectors.
+
+    Args:
+        models (list): The detectors to evaluate.
+        jobs (list[dict]): One entry per dataset with keys 'journals' (one per
+                           detector), 'dataset' (None if nothing is left to
+                           score) and 'pending_rows', and optionally
+                           'accumulators' (StreamingMetrics, one per detector).
+        max_batch_samples (int, optional): If given, batches group clips of
+                           similar length and are capped by padded samples,
+                           with `batch_size` as the item cap.
+        windowing (dict, optional): Sliding-window scoring settings, see
+                           iter_scored_batches.
+
+    Yields:
+        dict: Each job, in order, once all of its batches have been scored.
+    """
+    datasets = []
+    batch_plan = []
+    batch_sampler = []
+    offset = 0
+    for job_idx, job in enumerate(jobs):
+        if job['dataset'] is None:
+            continue
+        datasets.append(job['dataset'])
+        rows = job['pending_rows']
+        if max_batch_samples is None:
+            row_batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+        else:
+            row_batches = DurationBucketBatchSampler(
+                job['dataset'].get_lengths(), max_batch_samples, rows=rows, max_batch_size=batch_size
+            )
+        for batch_rows in row_batches:
+            batch_plan.append((job_idx, batch_rows))
+            batch_sampler.append([offset + r for r in batch_rows])
+        offset += len(job['dataset'])
+
+    next_job = 0
+    if batch_sampler:
+        # Clips that fail to load are dropped from their batch, not the batch itself
+        collate_fn = DropFailedCollate(collate_fn or default_collate)
+        if STAGE_TIMER.enabled:
+            collate_fn = TimedCall('collate', collate_fn)
+        dataloader = DataLoader(ConcatDataset(datasets), batch_sampler=batch_sampler,
+                                num_workers=num_workers, collate_fn=collate_fn,
+                                worker_init_fn=STAGE_TIMER.worker_init_fn())
+        for (job_idx, rows), positions, scores, labels in iter_scored_batches(
+                list(models), dataloader, device, batch_plan=batch_plan, windowing=windowing,
+                scope_fn=lambda tag: jobs[tag[0]].get('manifest_path')):
+            # The first result of a later dataset means the earlier ones are done
+            while next_job < job_idx:
+                yield jobs[next_job]
+                next_job += 1
+            batch_rows = [rows[p] for p in positions]
+            scores = np.asarray(scores).reshape(len(batch_rows), -1)
+            STAGE_TIMER.scope = jobs[job_idx].get('manifest_path')
+            with STAGE_TIMER.stage('score_write'):
+                for model_idx, journal in enumerate(jobs[job_idx]['journals']):
+                    journal.append(batch_rows, scores[:, model_idx], labels)
+            for model_idx, accumulator in enumerate(jobs[job_idx].get('accumulators') or []):
+                accumulator.update(labels, scores[:, model_idx])
+
+    while next_job < len(jobs):
+        yield jobs[next_job]
+        next_job += 1
+
+def build_detector(model_cfg, eval_cfg, device):
+    """
+    Loads the configured model and wraps it for scoring.
+    """
+    # An exported ONNX graph runs on ONNX Runtime, without the PyTorch model code
+    if model_cfg.get('backend') == 'onnx':
+        if device.type != 'cpu':
+            raise ValueError("Config error: the 'onnx' backend requires the evaluation device to be 'cpu'.")
+        ignored = [key for key in ('feature_store_dir', 'backend_compile') if eval_cfg.get(key)]
+        if (eval_cfg.get('precision') or 'fp32') != 'fp32':
+            ignored.append('precision')
+        if ignored:
+            print(f"Warning: {', '.join(ignored)} do not apply to ONNX models and are ignored.")
+        return OnnxDetector(model_cfg['checkpoint'])
+
+    # Imported here so that ONNX-only runs do not import fairseq
+    from models.detector_wrapper import AudioDeepfakeDetector
+
+    # Get model-specific arguments from the config, defaulting to an empty dict
+    model_args = model_cfg.get('model_args', {})
+    
+    # Load the raw pretrained detector
+    print(f"Loading raw model '{model_cfg['class_name']}' from '{model_cfg['checkpoint']}'...")
+    raw_model = load_model_from_path(
+        model_py_path=model_cfg['path'], 
+        model_class_name=model_cfg['class_name'], 
+        checkpoint_path=model_cfg['checkpoint'], 
+        device=device,
+        model_args=model_args,
+    )
+
+    # Wrap the raw model with the new class
+    # Pass the raw_model object itself, not the config arguments
+    model = AudioDeepfakeDetector(raw_model)
+    model.to(device) # Ensure the wrapped model is on the correct device
+
+    # Optionally serve SSL front-end embeddings from an on-disk feature store.
+    # Reduced-precision embeddings are kept apart from the fp32 ones.
+    precision = eval_cfg.get('precision') or 'fp32'
+    if eval_cfg.get('feature_store_dir'):
+        model = FeatureCachedDetector(
+            model,
+            eval_cfg['feature_store_dir'],
+            dtype=eval_cfg.get('feature_store_dtype', 'float32'),
+            compression=eval_cfg.get('feature_store_compression'),
+            variant=None if precision == 'fp32' else precision,
+        )
+
+    # Optionally run inference in reduced precision
+    model = apply_precision(model, precision, device)
+
+    # Optionally compile the back-end, caching artifacts across runs
+    if eval_cfg.get('backend_compile'):
+        checkpoint_hash = file_sha1(model_cfg['checkpoint']) if os.path.isfile(model_cfg['checkpoint']) else model_cfg['checkpoint']
+        model = compile_backend(
+            model,
+            eval_cfg['backend_compile'],
+            eval_cfg.get('compile_cache_dir') or os.path.join(eval_cfg['results_dir'], 'compiled'),
+            checkpoint_hash=f"{checkpoint_hash}:{precision}",
+        )
+
+    # Time the SSL front-end and the back-end separately when timing is on
+    if STAGE_TIMER.enabled:
+        backbone = find_backbone(model)
+        if hasattr(backbone, 'extract_frontend') and hasattr(backbone, 'forward_backend'):
+            backbone.extract_frontend = TimedCall('extract_feat', backbone.extract_frontend)
+            backbone.forward_backend = TimedCall('backend', backbone.forward_backend)
+    return model
+
+def run_precision_check(model_cfgs, model_names, eval_cfg, data_args, jobs, device,
+                        models=None, windowing=None):
+    """
+    Measures the accuracy cost of a reduced inference precision, or of float16
+    feature store entries: scores an evenly spaced calibration subset of the
+    evaluated rows with each model as configured and with an fp32 reference
+    without feature store, then reports and saves the EER/AUC change and the
+    score deviation per model.
+
+    Args:
+        models (list, optional): The already built reduced-precision
+                                 detectors; built here if None.
+    """
+    precision = eval_cfg.get('precision') or 'fp32'
+    num_rows = int(eval_cfg.get('precision_check_rows') or 0)
+    fp16_features = bool(eval_cfg.get('feature_store_dir')) and eval_cfg.get('feature_store_dtype') == 'float16'
+    if (precision == 'fp32' and not fp16_features) or num_rows <= 0 or not jobs:
+        return
+    if fp16_features:
+        precision = f"{precision}+float16-features"
+
+    print(f"\n--- Precision check: {precision} vs fp32 on up to {num_rows} calibration rows ---")
+    dataset = ConcatDataset([open_audio_dataset(job['manifest_path'], **data_args) for job in jobs])
+    rows = np.unique(np.linspace(0, len(dataset) - 1, min(num_rows, len(dataset))).astype(int))
+    collate_fn = DropFailedCollate(dataset.datasets[0].collate_fn or default_collate)
+    dataloader = DataLoader(Subset(dataset, rows.tolist()), batch_size=eval_cfg['batch_size'],
+                            shuffle=False, num_workers=4, collate_fn=collate_fn)
 
-def main(config):
+    if models is None:
+        models = [build_detector(model_cfg, eval_cfg, device) for model_cfg in model_cfgs]
+    reference_cfg = dict(eval_cfg, precision='fp32', feature_store_dir=None)
+    references = [build_detector(model_cfg, reference_cfg, device) for model_cfg in model_cfgs]
+
+    # Reduced and reference detectors alternate, so each batch is decoded once
+    paired = [m for pair in zip(models, references) for m in pair]
+    all_scores, all_labels = [], []
+    for _, _, scores, labels in iter_scored_batches(
+            paired, dataloader, device, desc="Precision check", windowing=windowing):
+        all_scores.append(np.asarray(scores).reshape(len(labels), -1))
+        all_labels.extend(labels)
+    all_scores = np.concatenate(all_scores) if all_scores else np.zeros((0, len(paired)))
+
+    for i, model_name in enumerate(model_names):
+        reduced_scores, reference_scores = all_scores[:, 2 * i], all_scores[:, 2 * i + 1]
+        reduced = calculate_metrics(all_labels, reduced_scores)
+        reference = calculate_metrics(all_labels, reference_scores)
+        deviation = np.abs(reduced_scores - reference_scores)
+        report = {
+            'precision': precision,
+            'rows': int(len(all_labels)),
+            'fp32': {'eer': float(reference['eer']), 'auc': float(reference['auc'])},
+            precision: {'eer': float(reduced['eer']), 'auc': float(reduced['auc'])},
+            'delta': {
+                'eer': float(reduced['eer'] - reference['eer']),
+                'auc': float(reduced['auc'] - reference['auc']),
+            },
+            'max_abs_score_diff': float(deviation.max()) if len(deviation) else 0.0,
+            'mean_abs_score_diff': float(deviation.mean()) if len(deviation) else 0.0,
+        }
+
+        print(f"\n{model_name} ({report['rows']} rows):")
+        if reference['eer'] == -1:
+            print("  -> Single class calibration subset. EER and AUC deltas cannot be computed.")
+        else:
+            print(f"  EER: {reference['eer']*100:.2f}% -> {reduced['eer']*100:.2f}% "
+                  f"({report['delta']['eer']*100:+.2f} pp) | "
+                  f"AUC: {reference['auc']:.4f} -> {reduced['auc']:.4f} ({report['delta']['auc']:+.4f})")
+        print(f"  Score |diff|: max {report['max_abs_score_diff']:.4g} | mean {report['mean_abs_score_diff']:.4g}")
+
+        output_path = os.path.join(eval_cfg['results_dir'], f"{model_name}_precision_check.yaml")
+        with open(output_path, 'w') as f:
+            yaml.dump(report, f, default_flow_style=False, sort_keys=False)
+        print(f"Precision check saved to {output_path}")
+
+def resolve_auto_batch_size(models, model_cfgs, checkpoint_sha1s, eval_cfg, data_args, device, num_replicas=0):
+    """
+    Resolves `batch_size: auto` to the largest batch whose forward pass fits the
+    memory budget (`batch_memory_budget_mb`, split across CPU replicas) for the
+    loaded models and the current input length. Results are cached per (model
+    hash, input length, host, budget), so probing only runs once per setup.
+    """
+    if eval_cfg.get('windowed_scoring'):
+        input_length = eval_cfg['windowed_scoring'].get('window', 64000)
+    else:
+        input_length = data_args.get('target_length', 64000)
+    if input_length is None:
+        raise ValueError("Config error: batch_size 'auto' needs a fixed input length "
+                         "(data_args.target_length or windowed_scoring.window).")
+
+    if eval_cfg.get('batch_memory_budget_mb'):
+        budget = int(eval_cfg['batch_memory_budget_mb']) << 20
+    else:
+        budget = default_memory_budget(device)
+    if num_replicas:
+        budget //= num_replicas
+
+    cache = BatchSizeCache(eval_cfg.get('batch_size_cache') or os.path.join(eval_cfg['results_dir'], 'batch_size_cache.json'))
+    key = BatchSizeCache.key(
+        model_hash(*checkpoint_sha1s, eval_cfg.get('precision') or 'fp32', eval_cfg.get('backend_compile')),
+        input_length, device, budget,
+    )
+    batch_size = cache.get(key)
+    if batch_size is not None:
+        print(f"Auto batch size: {batch_size} (cached for {input_length} samples, {budget >> 20} MB budget)")
+        return batch_size
+
+    # Probe without the feature store, so random inputs never reach it
+    if models is None or eval_cfg.get('feature_store_dir'):
+        probe_cfg = dict(eval_cfg, feature_store_dir=None)
+        models = [build_detector(model_cfg, probe_cfg, device) for model_cfg in model_cfgs]
+    print(f"Probing the largest batch of {input_length} samples within {budget >> 20} MB...")
+    batch_size = probe_batch_size(
+        lambda x: _score_batch(models, x), input_length, device, budget,
+        max_batch_size=int(eval_cfg.get('max_auto_batch_size') or 1024),
+    )
+    cache.put(key, batch_size)
+    print(f"Auto batch size: {batch_size} (saved to {cache.path})")
+    return batch_size
+
+class _QueueJournal:
+    """
+    Stands in for a ScoreJournal inside a CPU replica and forwards every scored
+    batch to the parent process, which owns the real journal.
+    """
+    def __init__(self, queue, job_idx, model_idx):
+        self.queue = queue
+        self.job_idx = job_idx
+        self.model_idx = model_idx
+
+    def append(self, rows, scores, labels):
+        self.queue.put(('scores', self.job_idx, self.model_idx, list(rows), np.asarray(scores), np.asarray(labels)))
+
+def _cpu_replica_main(replica_idx, num_threads, model_cfgs, eval_cfg, data_args, shards, windowing, queue):
+    """
+    Entry point of one CPU replica process: loads its own model with its own
+    thread budget and scores its shard of every dataset through
+    run_group_evaluation, reporting scores and finished datasets to the parent.
+    """
+    try:
+        torch.set_num_threads(num_threads)
+        device = torch.device('cpu')
+        if eval_cfg.get('timing'):
+            STAGE_TIMER.enable()
+        models = [build_detector(model_cfg, eval_cfg, device) for model_cfg in model_cfgs]
+
+        jobs = []
+        for job_idx, (manifest_path, rows) in enumerate(shards):
+            STAGE_TIMER.scope = manifest_path
+            with STAGE_TIMER.stage('manifest_load'):
+                dataset = open_audio_dataset(manifest_path, **data_args) if rows else None
+            journals = [_QueueJournal(queue, job_idx, model_idx) for model_idx in range(len(models))]
+            jobs.append({'manifest_path': manifest_path, 'journals': journals, 'dataset': dataset,
+                         'pending_rows': rows})
+        collate_fn = next((job['dataset'].collate_fn for job in jobs if job['dataset'] is not None), None)
+
+        finished = run_group_evaluation(
+            models, jobs, eval_cfg['batch_size'], device, collate_fn=collate_fn,
+            num_workers=eval_cfg.get('cpu_replica_loader_workers', 2),
+            max_batch_samples=eval_cfg.get('max_batch_samples'), windowing=windowing,
+        )
+        for job_idx, _ in enumerate(finished):
+            # The loader has shut down by the last job, so worker timings are in
+            if job_idx == len(jobs) - 1 and STAGE_TIMER.enabled:
+                STAGE_TIMER.collect_workers()
+                queue.put(('timing', replica_idx, STAGE_TIMER.snapshot()))
+            queue.put(('done', replica_idx, job_idx))
+    except Exception as e:
+        queue.put(('error', replica_idx, repr(e)))
+        raise
+
+def run_replicated_group_evaluation(jobs, num_replicas, model_cfgs, eval_cfg, data_args, windowing=None):
+    """
+    CPU counterpart of run_group_evaluation that runs `num_replicas` processes,
+    each with its own model replica and intra-op thread budget. The pending rows
+    of every dataset are split into contiguous shards, one per replica; scored
+    batches are journaled here as they arrive, keyed by manifest row, so the
+    merged scores come back in manifest order.
+
+    Yields:
+        dict: Each job, in order, once every replica has finished it.
+    """
+    num_threads = eval_cfg.get('cpu_threads_per_replica') or max(1, (os.cpu_count() or 1) // num_replicas)
+    print(f"Starting {num_replicas} CPU replicas with {num_threads} threads each...")
+
+    # One contiguous shard of pending rows per replica and dataset
+    replica_shards = [[] for _ in range(num_replicas)]
+    for job in jobs:
+        shards = np.array_split(np.asarray(job['pending_rows'], dtype=np.int64), num_replicas)
+        for replica_idx, shard in enumerate(shards):
+            replica_shards[replica_idx].append((job['manifest_path'], shard.tolist()))
+
+    # Spawn rather than fork so replicas never inherit the parent's state
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_cpu_replica_main,
+            args=(i, num_threads, model_cfgs, eval_cfg, data_args, replica_shards[i], windowing, queue),
+        )
+        for i in range(num_replicas)
+    ]
+    for process in processes:
+        process.start()
+
+    done_counts = [0] * len(jobs)
+    next_job = 0
+    progress = tqdm(total=sum(len(job['pending_rows']) for job in jobs), desc="Evaluating")
+    try:
+        while next_job < len(jobs):
+            try:
+                message = queue.get(timeout=10)
+            except queue_module.Empty:
+                failed = [p for p in processes if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(f"{len(failed)} CPU replica(s) exited unexpectedly.")
+                continue
+
+            if message[0] == 'scores':
+                _, job_idx, model_idx, rows, scores, labels = message
+                jobs[job_idx]['journals'][model_idx].append(rows, scores, labels)
+                if jobs[job_idx].get('accumulators'):
+                    jobs[job_idx]['accumulators'][model_idx].update(labels, scores)
+                if model_idx == 0:
+                    progress.update(len(rows))
+            elif message[0] == 'timing':
+                STAGE_TIMER.merge(message[2])
+            elif message[0] == 'done':
+                done_counts[message[2]] += 1
+                while next_job < len(jobs) and done_counts[next_job] == num_replicas:
+                    yield jobs[next_job]
+                    next_job += 1
+            else:
+                raise RuntimeError(f"CPU replica {message[1]} failed: {message[2]}")
+    finally:
+        progress.close()
+        for process in processes:
+            if process.is_alive() and next_job < len(jobs):
+                process.terminate()
+            process.join()
+
+def _journal_chunks(journal, manifest_hashes, scored, accumulator=None, kept=None):
+    """
+    Streams the scores of a journal as (rows, hashes, scores, labels) chunks
+    for ScoreStore.append_chunks, marking the rows in the boolean array
+    `scored`, and feeding `accumulator` and collecting (rows, scores, labels)
+    chunks in the list `kept` when given.
+    """
+    for rows, scores, labels in journal.read_chunks(len(scored)):
+        scored[rows] = True
+        if accumulator is not None:
+            accumulator.update(labels, scores)
+        if kept is not None:
+            kept.append((rows, scores, labels))
+        yield rows, manifest_hashes[rows], scores, labels
+
+
+def report_dataset_results(dataset_name, labels, scores, output_path, title=None, accumulator=None,
+                           metrics=None, bootstrap_args=None, operating_points=None):
+    """
+    Computes, prints and saves the results of one detector on one dataset.
+
+    With a StreamingMetrics `accumulator` holding the same scores, metrics come
+    from it instead of from the full arrays; already computed `metrics` are
+    used as they are. With `bootstrap_args` (keyword arguments of
+    bootstrap_ci), bootstrap confidence intervals 'eer_ci' and 'auc_ci' are
+    added to two-class results. With `operating_points` ({'fpr_targets': [...],
+    'fnr_targets': [...]}), 'fnr_at_fpr_<t>' and 'fpr_at_fnr_<t>' are added.
+    Scores are exported as a `score,label` CSV to `output_path` unless it is
+    None.
+
+    Returns:
+        dict: The metrics, with values converted to plain Python numbers.
+    """
+    # Calculate metrics
+    if metrics is None:
+        with STAGE_TIMER.stage('metrics'):
+            if accumulator is not None:
+                metrics = accumulator.compute(operating_points=operating_points)
+            else:
+                metrics = calculate_metrics(labels, scores, operating_points=operating_points)
+    if bootstrap_args is not None and metrics['eer'] != -1:
+        with STAGE_TIMER.stage('metrics'):
+            metrics.update(bootstrap_ci(labels, scores, **bootstrap_args))
+        metrics['ci_level'] = bootstrap_args.get('confidence', 0.95)
+    
+    # Convert all metric values to standard Python floats before saving
+    for key, value in metrics.items():
+        if isinstance(value, (np.float32, np.float64, np.int32, np.int64)):
+            metrics[key] = float(value)
+    
+    print(f"\nResults for {title or dataset_name}:")
+    if metrics['eer'] == -1 and metrics['tpr'] == -1 and metrics['tnr'] == -1:
+        print("  -> No clips were scored.")
+    elif metrics['eer'] == -1:
+        print(f"  -> Single class dataset. Accuracy: {metrics.get('accuracy', 0)*100:.2f}%")
+    else:
+        print(f"  EER: {metrics['eer']*100:.2f}% | AUC: {metrics['auc']:.4f} | Accuracy: {metrics['accuracy']*100:.2f}%")
+        print(f"  TPR: {metrics['tpr']*100:.2f}% | TNR: {metrics['tnr']*100:.2f}% | Precision: {metrics['precision']*100:.2f}% | F1: {metrics['f1']:.4f}")
+        print(f"  TP: {metrics['tp']} | TN: {metrics['tn']} | FP: {metrics['fp']} | FN: {metrics['fn']}")
+        if not metrics.get('exact', True):
+            (eer_low, eer_high), (auc_low, auc_high) = metrics['eer_bounds'], metrics['auc_bounds']
+            print(f"  Histogram estimates: EER in [{eer_low*100:.3f}%, {eer_high*100:.3f}%] | "
+                  f"AUC in [{auc_low:.5f}, {auc_high:.5f}]")
+        if 'eer_ci' in metrics:
+            (eer_low, eer_high), (auc_low, auc_high) = metrics['eer_ci'], metrics['auc_ci']
+            print(f"  {metrics['ci_level']*100:g}% CI: EER [{eer_low*100:.2f}%, {eer_high*100:.2f}%] | "
+                  f"AUC [{auc_low:.4f}, {auc_high:.4f}]")
+        points = [f"{key[:3].upper()} @ {key[7:10].upper()}={key[11:]}: {value*100:.2f}%"
+                  for key, value in metrics.items() if key.startswith(('fnr_at_fpr_', 'fpr_at_fnr_'))]
+        if points:
+            print(f"  {' | '.join(points)}")
+
+    # Export detailed scores
+    if output_path is not None:
+        with STAGE_TIMER.stage('score_write'):
+            results_df = pd.DataFrame({'score': scores, 'label': labels})
+            results_df.to_csv(output_path, index=False)
+        print(f"Detailed scores saved to {output_path}")
+    return metrics
+
+def summarize_group(group_name, group_results):
+    """
+    Prints the per-dataset summary of a group and adds an 'Average' entry over
+    the multi-class datasets to `group_results`.
+    """
+    print(f"\n--- Summary for group '{group_name}' ---")
+    for name, metrics in group_results.items():
+         if metrics['eer'] == -1 and metrics['tpr'] == -1 and metrics['tnr'] == -1:
+             print(f"- {name}: No clips scored")
+         elif metrics['eer'] == -1:
+             print(f"- {name}: Single class dataset (Acc={metrics.get('accuracy', 0)*100:.2f}%)")
+         else:
+             print(f"- {name}: EER={metrics['eer']*100:.2f}%, AUC={metrics['auc']:.4f}, Acc={metrics['accuracy']*100:.2f}%")
+
+    valid_results = [m for m in group_results.values() if m['eer'] != -1]
+    
+    if valid_results:
+        avg_eer = float(np.mean([m['eer'] for m in valid_results]))
+        avg_auc = float(np.mean([m['auc'] for m in valid_results]))
+        avg_acc = float(np.mean([m['accuracy'] for m in valid_results]))
+        avg_tpr = float(np.mean([m['tpr'] for m in valid_results]))
+        avg_tnr = float(np.mean([m['tnr'] for m in valid_results]))
+        avg_pre = float(np.mean([m['precision'] for m in valid_results]))
+        avg_f1  = float(np.mean([m['f1'] for m in valid_results]))
+        sum_tp  = int(sum(m['tp'] for m in valid_results))
+        sum_tn  = int(sum(m['tn'] for m in valid_results))
+        sum_fp  = int(sum(m['fp'] for m in valid_results))
+        sum_fn  = int(sum(m['fn'] for m in valid_results))
+
+        print("---------------------------------")
+        print("Average Metrics (for multi-class datasets):")
+        print(f"  EER: {avg_eer*100:.2f}% | AUC: {avg_auc:.4f} | Accuracy: {avg_acc*100:.2f}%")
+        print(f"  TPR: {avg_tpr*100:.2f}% | TNR: {avg_tnr*100:.2f}% | Precision: {avg_pre*100:.2f}% | F1: {avg_f1:.4f}")
+        print(f"  TP: {sum_tp} | TN: {sum_tn} | FP: {sum_fp} | FN: {sum_fn}")
+
+        # Add average metrics to the group results for saving
+        group_results['Average'] = {
+            'eer': avg_eer, 'auc': avg_auc, 'accuracy': avg_acc,
+            'tpr': avg_tpr, 'tnr': avg_tnr,
+            'precision': avg_pre, 'f1': avg_f1,
+            'tp': sum_tp, 'tn': sum_tn, 'fp': sum_fp, 'fn': sum_fn,
+        }
+    else:
+        print("---------------------------------")
+        print("No multi-class datasets were evaluated to calculate average metrics.")
+
+def main(config, resume=False):
     """
     Main function to orchestrate the evaluation pipeline, driven by a config dictionary.
+
+    Scores are journaled per batch under `<results_dir>/journal`. With `resume`,
+    datasets already finished are skipped and partially scored datasets continue
+    from the first unscored row, provided the manifest, checkpoint, data args
+    and scoring settings (precision, windowed scoring, back-end compilation,
+    feature store dtype) are unchanged.
+
+    With `timing` enabled, wall time and counts of every pipeline stage are
+    written per dataset to `<results_dir>/timing/<dataset>.json`.
+
+    Clips that cannot be evaluated (excluded by the `preflight` check, or
+    failing to load during evaluation) are listed with the reason in
+    `<results_dir>/<run>_failures.csv`.
     """
-    # Extract config sections for clarity
-    model_cfg = config['model']
+    # Extract config sections for clarity. 'model' may hold a single model or a
+    # list of models, which are then all evaluated on a single decoding pass.
+    model_cfgs = config['model'] if isinstance(config['model'], list) else [config['model']]
     data_cfg = config['data']
     eval_cfg = config['evaluation_settings']
     
@@ -67,24 +728,22 @@ def main(config):
     
     # Create results directory
     os.makedirs(eval_cfg['results_dir'], exist_ok=True)
+
+    # Optional per-stage timing (before the models are built, so they get instrumented)
+    if eval_cfg.get('timing'):
+        STAGE_TIMER.enable()
     
-    # Get model-specific arguments from the config, defaulting to an empty dict
-    model_args = model_cfg.get('model_args', {})
-    
-    # Load the raw pretrained detector
-    print(f"Loading raw model '{model_cfg['class_name']}' from '{model_cfg['checkpoint']}'...")
-    raw_model = load_model_from_path(
-        model_py_path=model_cfg['path'], 
-        model_class_name=model_cfg['class_name'], 
-        checkpoint_path=model_cfg['checkpoint'], 
-        device=device,
-        model_args=model_args,
-    )
+    # Output files are prefixed with each model's 'name' (default: its class_name;
+    # ONNX models have no class_name and need a name)
+    model_names = [model_cfg.get('name') or model_cfg['class_name'] for model_cfg in model_cfgs]
+    if len(set(model_names)) != len(model_names):
+        raise ValueError("Config error: when evaluating several models, give each one a unique 'name'.")
 
-    # Wrap the raw model with the new class
-    # Pass the raw_model object itself, not the config arguments
-    model = AudioDeepfakeDetector(raw_model)
-    model.to(device) # Ensure the wrapped model is on the correct device
+    # With CPU replicas, every replica process loads its own copy of the models
+    num_replicas = int(eval_cfg.get('cpu_replicas') or 0)
+    if num_replicas and device.type != 'cpu':
+        raise ValueError("Config error: 'cpu_replicas' requires the evaluation device to be 'cpu'.")
+    models = None if num_replicas else [build_detector(model_cfg, eval_cfg, device) for model_cfg in model_cfgs]
 
     # Determine which datasets to evaluate
     datasets_to_evaluate = []
@@ -123,9 +782,49 @@ def main(config):
     
     # Get dataset-specific arguments from the config, defaulting to an empty dict
     data_args = data_cfg.get('data_args', {})
+
+    # Fingerprints of the checkpoints, used to validate score journals on resume
+    checkpoint_sha1s = [
+        file_sha1(model_cfg['checkpoint'])
+        if model_cfg.get('checkpoint') and os.path.isfile(model_cfg['checkpoint']) else None
+        for model_cfg in model_cfgs
+    ]
+    journal_dir = os.path.join(eval_cfg['results_dir'], 'journal')
+
+    # Resolve an 'auto' batch size from the memory budget
+    if eval_cfg['batch_size'] == 'auto':
+        eval_cfg = dict(eval_cfg, batch_size=resolve_auto_batch_size(
+            models, model_cfgs, checkpoint_sha1s, eval_cfg, data_args, device, num_replicas=num_replicas,
+        ))
     
-    # Loop through each dataset and run the evaluation
-    group_results = {}
+    # Optional streaming metrics, updated per batch in bounded memory
+    streaming_args = eval_cfg.get('streaming_metrics')
+    if streaming_args is not None and not isinstance(streaming_args, dict):
+        streaming_args = {} if streaming_args else None
+    # Optional bootstrap confidence intervals of the EER and AUC
+    bootstrap_args = eval_cfg.get('bootstrap')
+    if bootstrap_args is not None and not isinstance(bootstrap_args, dict):
+        bootstrap_args = {} if bootstrap_args else None
+    # Optional FNR/FPR at fixed operating points
+    operating_points = eval_cfg.get('operating_points') or None
+
+    # Scores of every dataset go to a columnar store, tagged with this run's id
+    score_store = ScoreStore(eval_cfg.get('score_store_dir') or os.path.join(eval_cfg['results_dir'], 'scores'))
+    run_id = str(eval_cfg.get('run_id') or new_run_id())
+    score_csv = eval_cfg.get('score_csv', False)
+
+    # Optional pre-flight check that excludes clips that cannot be loaded up front
+    preflight_args = eval_cfg.get('preflight')
+    if preflight_args is not None and not isinstance(preflight_args, dict):
+        preflight_args = {} if preflight_args else None
+    preflight_index = None
+    if preflight_args is not None:
+        preflight_index = PreflightIndex(
+            preflight_args.get('index_path') or os.path.join(eval_cfg['results_dir'], 'preflight_index.jsonl')
+        )
+
+    # Prepare journals (one per model), and a dataset for any rows left to score, per manifest
+    jobs = []
     for dataset_info in datasets_to_evaluate:
         dataset_name = dataset_info['name']
         if data_cfg.get('group_name'):
@@ -133,93 +832,220 @@ def main(config):
         else:
             manifest_path = dataset_info['manifest_path']
         
-        print(f"\n--- Evaluating on: {dataset_name} ---")
+        print(f"\n--- Preparing: {dataset_name} ---")
         if not os.path.exists(manifest_path):
             print(f"Warning: Manifest file not found at {manifest_path}. Skipping.")
             continue
             
-        dataset = AudioManifestDataset(manifest_path, **data_args)
-        dataloader = DataLoader(dataset, batch_size=eval_cfg['batch_size'], shuffle=False, num_workers=4)
-        
-        labels, scores = run_evaluation(model, dataloader, device)
-        
-        # Calculate metrics
-        metrics = calculate_metrics(labels, scores)
-        
-        # Convert all metric values to standard Python floats before saving
-        for key, value in metrics.items():
-            if isinstance(value, (np.float32, np.float64, np.int32, np.int64)):
-                metrics[key] = float(value)
-        
-        group_results[dataset_name] = metrics
-        
-        print(f"Results for {dataset_name}:")
-        if metrics['eer'] == -1:
-            print(f"  -> Single class dataset. Accuracy: {metrics.get('accuracy', 0)*100:.2f}%")
+        manifest_sha1 = file_sha1(manifest_path)
+        journals = [
+            ScoreJournal(
+                journal_dir,
+                f"{model_name}_on_{dataset_name}",
+                fingerprint={
+                    'manifest_sha1': manifest_sha1,
+                    'checkpoint_sha1': checkpoint_sha1,
+                    'data_args': data_args,
+                    'precision': eval_cfg.get('precision') or 'fp32',
+                    'windowed_scoring': eval_cfg.get('windowed_scoring'),
+                    'backend_compile': eval_cfg.get('backend_compile'),
+                    'feature_store_dtype': eval_cfg.get('feature_store_dtype', 'float32')
+                    if eval_cfg.get('feature_store_dir') else None,
+                },
+            )
+            for model_name, checkpoint_sha1 in zip(model_names, checkpoint_sha1s)
+        ]
+        done_rows = [journal.open(resume=resume) for journal in journals]
+        job = {'name': dataset_name, 'manifest_path': manifest_path, 'journals': journals,
+               'dataset': None, 'pending_rows': [], 'failures': {},
+               # Journals holding rows of a previous run, which accumulators never saw
+               'restored': [bool(rows) for rows in done_rows]}
+        if streaming_args is not None:
+            job['accumulators'] = [StreamingMetrics(**streaming_args) for _ in model_names]
+
+        if all(journal.complete for journal in journals):
+            print(f"Already evaluated (resumed from {journal_dir}). Skipping inference.")
         else:
-            print(f"  EER: {metrics['eer']*100:.2f}% | AUC: {metrics['auc']:.4f} | Accuracy: {metrics['accuracy']*100:.2f}%")
-            print(f"  TPR: {metrics['tpr']*100:.2f}% | TNR: {metrics['tnr']*100:.2f}% | Precision: {metrics['precision']*100:.2f}% | F1: {metrics['f1']:.4f}")
-            print(f"  TP: {metrics['tp']} | TN: {metrics['tn']} | FP: {metrics['fp']} | FN: {metrics['fn']}")
-
-        # Save detailed scores
-        results_df = pd.DataFrame({'score': scores, 'label': labels})
-        output_path = os.path.join(eval_cfg['results_dir'], f"{model_cfg['class_name']}_on_{dataset_name}_scores.csv")
-        results_df.to_csv(output_path, index=False)
-        print(f"Detailed scores saved to {output_path}")
+            # Rows missing from any model's journal are scored again for all models
+            scored_by_all = set.intersection(*done_rows)
+            STAGE_TIMER.scope = manifest_path
+            with STAGE_TIMER.stage('manifest_load'):
+                dataset = open_audio_dataset(manifest_path, **data_args)
+            job['pending_rows'] = [i for i in range(len(dataset)) if i not in scored_by_all]
+            if scored_by_all:
+                print(f"Resuming: {len(scored_by_all)} rows already scored, {len(job['pending_rows'])} remaining.")
+            if preflight_index is not None and job['pending_rows']:
+                with STAGE_TIMER.stage('preflight'):
+                    job['failures'] = preflight_failures(dataset, job['pending_rows'], preflight_index,
+                                                         num_threads=preflight_args.get('num_threads', 16))
+                if job['failures']:
+                    print(f"Pre-flight: excluding {len(job['failures'])} clips that cannot be loaded.")
+                    job['pending_rows'] = [i for i in job['pending_rows'] if i not in job['failures']]
+            if job['pending_rows']:
+                job['dataset'] = dataset
+        jobs.append(job)
 
-    # --- Print summary if a group was evaluated ---
-    if data_cfg.get('group_name'):
-        group_name = data_cfg['group_name']
-        print(f"\n--- Summary for group '{group_name}' ---")
-        for name, metrics in group_results.items():
-             if metrics['eer'] == -1:
-                 print(f"- {name}: Single class dataset (Acc={metrics.get('accuracy', 0)*100:.2f}%)")
-             else:
-                 print(f"- {name}: EER={metrics['eer']*100:.2f}%, AUC={metrics['auc']:.4f}, Acc={metrics['accuracy']*100:.2f}%")
-
-        valid_results = [m for m in group_results.values() if m['eer'] != -1]
-        
-        if valid_results:
-            avg_eer = float(np.mean([m['eer'] for m in valid_results]))
-            avg_auc = float(np.mean([m['auc'] for m in valid_results]))
-            avg_acc = float(np.mean([m['accuracy'] for m in valid_results]))
-            avg_tpr = float(np.mean([m['tpr'] for m in valid_results]))
-            avg_tnr = float(np.mean([m['tnr'] for m in valid_results]))
-            avg_pre = float(np.mean([m['precision'] for m in valid_results]))
-            avg_f1  = float(np.mean([m['f1'] for m in valid_results]))
-            sum_tp  = int(sum(m['tp'] for m in valid_results))
-            sum_tn  = int(sum(m['tn'] for m in valid_results))
-            sum_fp  = int(sum(m['fp'] for m in valid_results))
-            sum_fn  = int(sum(m['fn'] for m in valid_results))
-
-            print("---------------------------------")
-            print("Average Metrics (for multi-class datasets):")
-            print(f"  EER: {avg_eer*100:.2f}% | AUC: {avg_auc:.4f} | Accuracy: {avg_acc*100:.2f}%")
-            print(f"  TPR: {avg_tpr*100:.2f}% | TNR: {avg_tnr*100:.2f}% | Precision: {avg_pre*100:.2f}% | F1: {avg_f1:.4f}")
-            print(f"  TP: {sum_tp} | TN: {sum_tn} | FP: {sum_fp} | FN: {sum_fn}")
+    # All datasets share data_args, hence the same batch-level collate
+    collate_fn = next((job['dataset'].collate_fn for job in jobs if job['dataset'] is not None), None)
+
+    # Optional sliding-window scoring over full utterances, packed into model batches
+    windowing = None
+    if eval_cfg.get('windowed_scoring'):
+        windowing = dict(eval_cfg['windowed_scoring'])
+        windowing.setdefault('batch_size', eval_cfg['batch_size'])
+        if data_args.get('target_length') is not None:
+            print("Warning: windowed_scoring is enabled but data_args.target_length is set; "
+                  "only the first target_length samples of each clip will be windowed.")
+
+    # Optional Chrome trace of the first batches (main process only)
+    timing_dir = os.path.join(eval_cfg['results_dir'], 'timing')
+    trace_batches = int(eval_cfg.get('timing_trace_batches') or 0)
+    if STAGE_TIMER.enabled and trace_batches > 0:
+        if num_replicas:
+            print("Warning: timing_trace_batches is not supported with cpu_replicas; no trace is recorded.")
         else:
-            print("---------------------------------")
-            print("No multi-class datasets were evaluated to calculate average metrics.")
+            STAGE_TIMER.start_profiler(os.path.join(timing_dir, 'trace.json'), trace_batches, device)
 
-        # Add average metrics to the group results for saving
-        if valid_results:
-            group_results['Average'] = {
-                'eer': avg_eer, 'auc': avg_auc, 'accuracy': avg_acc,
-                'tpr': avg_tpr, 'tnr': avg_tnr,
-                'precision': avg_pre, 'f1': avg_f1,
-                'tp': sum_tp, 'tn': sum_tn, 'fp': sum_fp, 'fn': sum_fn,
-            }
-
-    # --- Save consolidated metrics to a YAML file ---
+    # Stream every manifest through one loader; finish each dataset as it completes
+    group_results = {model_name: {} for model_name in model_names}
+    if num_replicas:
+        finished_jobs = run_replicated_group_evaluation(
+            jobs, num_replicas, model_cfgs, eval_cfg, data_args, windowing=windowing
+        )
+    else:
+        finished_jobs = run_group_evaluation(
+            models, jobs, eval_cfg['batch_size'], device, collate_fn=collate_fn,
+            max_batch_samples=eval_cfg.get('max_batch_samples'), windowing=windowing,
+        )
+    # With metrics_workers, the metrics of all datasets are computed at the end in a process pool
+    metrics_workers = int(eval_cfg.get('metrics_workers') or 0)
+    deferred_reports = []
+    failure_reports = []
+    job_seconds = {}
+    job_start = time.perf_counter()
+    for job in finished_jobs:
+        dataset_name = job['name']
+        STAGE_TIMER.scope = job['manifest_path']
+        accumulators = job.get('accumulators') or [None] * len(model_names)
+        with STAGE_TIMER.stage('score_write'):
+            # The dataset's manifest if it has one, else parsed with the same caching setting
+            manifest = getattr(job['dataset'], 'manifest', None)
+            if manifest is None:
+                manifest = load_manifest(job['manifest_path'], use_cache=data_args.get('manifest_cache', True))
+            manifest_hashes = path_hashes(manifest.audio_paths())
+        scored = None
+        for model_name, journal, accumulator, restored in zip(model_names, job['journals'], accumulators,
+                                                              job['restored']):
+            if not journal.complete:
+                journal.mark_complete()
+            journal.close()
+
+            output_path = None
+            if score_csv:
+                output_path = os.path.join(eval_cfg['results_dir'], f"{model_name}_on_{dataset_name}_scores.csv")
+            # Full score arrays are only kept for exact metrics, bootstrap and the CSV
+            keep_arrays = accumulator is None or bootstrap_args is not None or output_path is not None
+            if accumulator is not None and restored:
+                # Rows restored from a resumed journal were never streamed
+                accumulator.reset()
+
+            # Scores of this and any previous (resumed) run, streamed from the journal
+            chunks = [] if keep_arrays else None
+            model_scored = np.zeros(len(manifest), dtype=bool)
+            with STAGE_TIMER.stage('score_write'):
+                score_store.append_chunks(model_name, dataset_name, run_id, _journal_chunks(
+                    journal, manifest_hashes, model_scored, accumulator=accumulator if restored else None,
+                    kept=chunks,
+                ))
+            if scored is None:
+                scored = model_scored
+            labels = scores = None
+            if keep_arrays:
+                rows, scores, labels = (np.concatenate(column) for column in zip(*chunks)) if chunks else \
+                    (np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0, dtype=np.int64))
+                # In manifest order
+                order = np.argsort(rows, kind='stable')
+                scores, labels = scores[order], labels[order]
+                chunks = None
+            title = f"{dataset_name} [{model_name}]" if len(model_names) > 1 else dataset_name
+            if metrics_workers > 1 and accumulator is None:
+                deferred_reports.append((model_name, dataset_name, labels, scores, output_path, title))
+                continue
+            group_results[model_name][dataset_name] = report_dataset_results(
+                dataset_name, labels, scores, output_path, title=title, accumulator=accumulator,
+                bootstrap_args=bootstrap_args, operating_points=operating_points,
+            )
+        # Clips excluded up front, and pending clips that failed to load during evaluation
+        failures = dict(job['failures'])
+        for row in np.setdiff1d(np.asarray(job['pending_rows'], dtype=np.int64), np.flatnonzero(scored)):
+            failures[int(row)] = "failed to load during evaluation"
+        if failures:
+            print(f"Warning: {len(failures)} clips of {dataset_name} could not be evaluated.")
+        failure_reports.extend(
+            {'dataset': dataset_name, 'row': row, 'audio_path': manifest.audio_path(row), 'reason': failures[row]}
+            for row in sorted(failures)
+        )
+        # Datasets overlap in the loader, so this is the time since the previous one finished
+        job_seconds[dataset_name] = time.perf_counter() - job_start
+        job_start = time.perf_counter()
+
+    if deferred_reports:
+        print(f"\nComputing metrics of {len(deferred_reports)} score sets with {metrics_workers} processes...")
+        with STAGE_TIMER.stage('metrics'):
+            all_metrics = calculate_metrics_many(
+                [(labels, scores) for _, _, labels, scores, _, _ in deferred_reports], num_workers=metrics_workers,
+                operating_points=operating_points,
+            )
+        for (model_name, dataset_name, labels, scores, output_path, title), metrics in zip(deferred_reports, all_metrics):
+            group_results[model_name][dataset_name] = report_dataset_results(
+                dataset_name, labels, scores, output_path, title=title, metrics=metrics,
+                bootstrap_args=bootstrap_args,
+            )
+
+    print(f"\nScores of run '{run_id}' saved to {score_store.store_dir}")
+
+    # --- Save the clips that could not be evaluated, next to the metrics ---
     run_name = data_cfg.get('group_name') or os.path.basename(data_cfg['manifest_path']).split('.')[0]
-    metrics_output_path = os.path.join(eval_cfg['results_dir'], f"{model_cfg['class_name']}_on_{run_name}_metrics.yaml")
-    with open(metrics_output_path, 'w') as f:
-        yaml.dump(group_results, f, default_flow_style=False, sort_keys=False)
-    print(f"\nConsolidated metrics saved to {metrics_output_path}")
+    failures_output_path = os.path.join(eval_cfg['results_dir'], f"{run_name}_failures.csv")
+    pd.DataFrame(failure_reports, columns=['dataset', 'row', 'audio_path', 'reason']).to_csv(
+        failures_output_path, index=False
+    )
+    print(f"Failure report ({len(failure_reports)} clips) saved to {failures_output_path}")
+
+    # --- Save the per-stage timing of every dataset ---
+    if STAGE_TIMER.enabled:
+        STAGE_TIMER.stop_profiler()
+        STAGE_TIMER.collect_workers()
+        for job in jobs:
+            timing_path = os.path.join(timing_dir, f"{job['name']}.json")
+            write_timing_report(timing_path, job['name'], STAGE_TIMER.report(job['manifest_path']),
+                                wall_seconds=job_seconds.get(job['name']))
+        print(f"\nStage timings saved to {timing_dir}")
+
+    for model_name in model_names:
+        # --- Print summary if a group was evaluated ---
+        if data_cfg.get('group_name'):
+            if len(model_names) > 1:
+                print(f"\n===== Model: {model_name} =====")
+            summarize_group(data_cfg['group_name'], group_results[model_name])
+
+        # --- Save consolidated metrics to a YAML file ---
+        metrics_output_path = os.path.join(eval_cfg['results_dir'], f"{model_name}_on_{run_name}_metrics.yaml")
+        with open(metrics_output_path, 'w') as f:
+            yaml.dump(group_results[model_name], f, default_flow_style=False, sort_keys=False)
+        print(f"\nConsolidated metrics saved to {metrics_output_path}")
+
+        # --- Generate LaTeX table if requested (one table per model) ---
+        latex_output_path = eval_cfg.get('latex_output_path')
+        if latex_output_path:
+            if len(model_names) > 1:
+                root, ext = os.path.splitext(latex_output_path)
+                latex_output_path = f"{root}_{model_name}{ext}"
+            generate_latex_from_metrics(metrics_output_path, latex_output_path)
 
-    # --- Generate LaTeX table if requested ---
-    if eval_cfg.get('latex_output_path'):
-        generate_latex_from_metrics(metrics_output_path, eval_cfg['latex_output_path'])
+    # --- Report the accuracy change of a reduced inference precision ---
+    run_precision_check(model_cfgs, model_names, eval_cfg, data_args, jobs, device,
+                        models=models, windowing=windowing)
 
 
 if __name__ == '__main__':
@@ -230,6 +1056,11 @@ if __name__ == '__main__':
         required=True, 
         help="Path to the evaluation setup YAML file (e.g., evaluate_setup.yaml)"
     )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Resume from the score journals in results_dir, skipping finished datasets and scored rows."
+    )
     args = parser.parse_args()
 
     # Load configuration from the YAML file
@@ -237,4 +1068,4 @@ if __name__ == '__main__':
         config = yaml.safe_load(f)
     
     # Run the main evaluation logic with the loaded config
-    main(config)
+    main(config, resume=args.resume)
@@ -0,0 +1,129 @@
+import torch
+import numpy as np
+import yaml
+import argparse
+import json
+import os
+import sys
+
+from benchmark.evaluate import build_detector
+from benchmark.utils.data_loader import AudioManifestDataset
+from benchmark.utils.onnx_runtime import OnnxDetector, onnx_metadata_path
+from benchmark.utils.score_journal import file_sha1
+
+class _ScoringGraph(torch.nn.Module):
+    """
+    Exposes a detector's get_prediction_score as forward, the traced entry point.
+    """
+    def __init__(self, detector):
+        super().__init__()
+        self.detector = detector
+
+    def forward(self, waveform):
+        return self.detector.get_prediction_score(waveform).reshape(-1)
+
+def load_check_batch(manifest_path, input_length, batch_size):
+    """
+    Returns up to `batch_size` preprocessed clips from a manifest, or random
+    clips normalized like real audio if no manifest is given.
+    """
+    if manifest_path:
+        dataset = AudioManifestDataset(manifest_path, target_length=input_length)
+        clips = [dataset[i][0] for i in range(min(batch_size, len(dataset)))]
+        return torch.stack(clips)
+    generator = torch.Generator().manual_seed(0)
+    clips = torch.randn(batch_size, input_length, generator=generator)
+    return clips / clips.abs().amax(dim=1, keepdim=True)
+
+def export_onnx(model_cfg, output_path, input_length=64000, opset=17, check_manifest=None,
+                check_batch_size=4, atol=1e-3):
+    """
+    Exports a detector (e.g. AudioDeepfakeDetector with its XLSR front-end) to
+    ONNX with a fixed input length and a dynamic batch dimension, then checks
+    ONNX Runtime scores against PyTorch.
+
+    Args:
+        model_cfg (dict): One entry of the config's `model` section.
+        output_path (str): Destination .onnx file. A JSON sidecar with the
+                           input length and checkpoint hash is written next to it.
+        input_length (int): Number of samples per input waveform.
+        opset (int): ONNX opset version.
+        check_manifest (str, optional): Manifest whose first clips are used for
+                                        the score check (default: random clips).
+        check_batch_size (int): Number of clips in the score check.
+        atol (float): Maximum absolute score difference allowed.
+
+    Returns:
+        float: The maximum absolute score difference of the check.
+    """
+    device = torch.device('cpu')
+    detector = build_detector(model_cfg, {}, device)
+    graph = _ScoringGraph(detector).eval()
+    example = torch.zeros(2, input_length)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    print(f"Exporting to '{output_path}' (input length {input_length}, opset {opset})...")
+    with torch.no_grad():
+        torch.onnx.export(
+            graph, (example,), output_path,
+            input_names=['waveform'], output_names=['score'],
+            dynamic_axes={'waveform': {0: 'batch'}, 'score': {0: 'batch'}},
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    metadata = {
+        'input_length': input_length,
+        'opset': opset,
+        'checkpoint_sha1': file_sha1(model_cfg['checkpoint']),
+        'torch_version': torch.__version__,
+    }
+    with open(onnx_metadata_path(output_path), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    # Score check: the same clips through PyTorch and ONNX Runtime
+    waveforms = load_check_batch(check_manifest, input_length, check_batch_size)
+    with torch.no_grad():
+        expected = graph(waveforms).numpy()
+    actual = OnnxDetector(output_path).get_prediction_score(waveforms).numpy()
+    max_diff = float(np.max(np.abs(expected - actual)))
+    print(f"Score check on {len(waveforms)} clips: max |PyTorch - ONNX Runtime| = {max_diff:.3g} (atol {atol:g})")
+    return max_diff
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a detector to ONNX for CPU inference with ONNX Runtime")
+    parser.add_argument(
+        '--config',
+        type=str,
+        required=True,
+        help="Path to the evaluation setup YAML file; its `model` section is exported"
+    )
+    parser.add_argument('--output', type=str, required=True, help="Destination .onnx file")
+    parser.add_argument('--model-name', type=str, default=None,
+                        help="Name of the model to export when the config lists several")
+    parser.add_argument('--length', type=int, default=64000, help="Fixed input length in samples")
+    parser.add_argument('--opset', type=int, default=17, help="ONNX opset version")
+    parser.add_argument('--check-manifest', type=str, default=None,
+                        help="Manifest providing the clips for the score check (default: random clips)")
+    parser.add_argument('--check-batch-size', type=int, default=4, help="Number of clips in the score check")
+    parser.add_argument('--atol', type=float, default=1e-3, help="Maximum absolute score difference allowed")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+
+    model_cfgs = config['model'] if isinstance(config['model'], list) else [config['model']]
+    if args.model_name:
+        model_cfgs = [cfg for cfg in model_cfgs if (cfg.get('name') or cfg['class_name']) == args.model_name]
+    if len(model_cfgs) != 1:
+        raise ValueError("Select exactly one model to export with --model-name.")
+
+    max_diff = export_onnx(
+        model_cfgs[0], args.output, input_length=args.length, opset=args.opset,
+        check_manifest=args.check_manifest, check_batch_size=args.check_batch_size, atol=args.atol,
+    )
+    if max_diff > args.atol:
+        print("Score check FAILED: the exported model does not match PyTorch within tolerance.")
+        sys.exit(1)
+    print("Score check passed.")
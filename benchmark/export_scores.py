@@ -0,0 +1,37 @@
+import argparse
+import os
+
+from benchmark.utils.score_store import ScoreStore
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Export scores from the score store written by evaluate.py to per-dataset CSV files."
+    )
+    parser.add_argument('store_dir', type=str, help="Score store directory (e.g. <results_dir>/scores).")
+    parser.add_argument('--output_dir', type=str, required=True, help="Where the CSV files are written.")
+    parser.add_argument('--model', type=str, default=None, help="Only export this model.")
+    parser.add_argument('--dataset', type=str, default=None, help="Only export this dataset.")
+    parser.add_argument('--run_id', type=str, default=None,
+                        help="Export this run (default: the most recently written of each dataset).")
+    parser.add_argument('--full', action='store_true',
+                        help="Write every column (row, path_hash, score, label, run_id, written_at) "
+                             "instead of score,label.")
+    args = parser.parse_args()
+
+    store = ScoreStore(args.store_dir)
+    table = store.read(model=args.model, dataset=args.dataset, run_id=args.run_id, columns=['model', 'dataset'])
+    pairs = sorted(set(zip(table['model'].to_pylist(), table['dataset'].to_pylist())))
+    if not pairs:
+        print("No scores match the given filters.")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for model, dataset in pairs:
+        output_path = os.path.join(args.output_dir, f"{model}_on_{dataset}_scores.csv")
+        if args.full:
+            run_id = args.run_id or store.run_ids(model=model, dataset=dataset)[-1]
+            scores = store.read(model=model, dataset=dataset, run_id=run_id,
+                                columns=['row', 'path_hash', 'score', 'label', 'run_id', 'written_at'])
+            scores.to_pandas().to_csv(output_path, index=False)
+        else:
+            store.export_csv(output_path, model, dataset, run_id=args.run_id)
+        print(f"Exported {model} on {dataset} to {output_path}")
@@ -19,16 +19,36 @@ COLUMNS = [
     ('FN',         'fn',        1,   '{:.0f}'),
 ]
 
+# Bootstrap confidence intervals, each placed after the column of its metric:
+# (latex_header, yaml_key, multiplier, format_string, after_yaml_key)
+CI_COLUMNS = [
+    ('EER CI (\\%)', 'eer_ci', 100, '{:.2f}', 'eer'),
+    ('AUC CI',       'auc_ci', 1,   '{:.4f}', 'auc'),
+]
+
 NA = 'N/A'
 
 
-def _format_row(metrics):
+def _columns(metrics_data):
+    # The CI columns are only shown when some dataset has intervals
+    if not any('eer_ci' in m for m in metrics_data.values() if isinstance(m, dict)):
+        return COLUMNS
+    columns = []
+    for column in COLUMNS:
+        columns.append(column)
+        columns.extend(ci[:4] for ci in CI_COLUMNS if ci[4] == column[1])
+    return columns
+
+
+def _format_row(metrics, columns=COLUMNS):
     is_single_class = metrics.get('eer', -1) == -1
     row = {}
-    for header, key, mult, fmt in COLUMNS:
+    for header, key, mult, fmt in columns:
         val = metrics.get(key)
         if is_single_class or val is None or val == -1:
             row[header] = NA
+        elif isinstance(val, (list, tuple)):
+            row[header] = '[' + ', '.join(fmt.format(v * mult) for v in val) + ']'
         else:
             row[header] = fmt.format(val * mult)
     return row
@@ -53,18 +73,19 @@ def generate_latex_from_metrics(metric_file_path, output_path=None):
         return
 
     # Individual datasets first (in evaluation order), Average pinned to the bottom.
+    columns = _columns(metrics_data)
     table_data = {}
     for name, metrics in metrics_data.items():
         if name != 'Average':
-            table_data[name] = _format_row(metrics)
+            table_data[name] = _format_row(metrics, columns)
 
     if 'Average' in metrics_data:
-        table_data['\\textbf{Average}'] = _format_row(metrics_data['Average'])
+        table_data['\\textbf{Average}'] = _format_row(metrics_data['Average'], columns)
 
     df = pd.DataFrame.from_dict(table_data, orient='index')
 
     # l for the dataset name, r for every metric column
-    col_fmt = 'l' + 'r' * len(COLUMNS)
+    col_fmt = 'l' + 'r' * len(columns)
 
     # pandas 2.x always emits booktabs rules (\toprule/\midrule/\bottomrule).
     # index_names=False suppresses the spurious blank index-name row in pandas 2.x.
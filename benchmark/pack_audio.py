@@ -0,0 +1,25 @@
+import argparse
+
+from benchmark.utils.audio_shards import pack_dir_for, pack_manifest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Pack the audio of manifests into int16 shards at the target rate (mono, peak-normalized), "
+                    "to be served without decoding by setting data_args.packed_dir to the output directory."
+    )
+    parser.add_argument('manifests', type=str, nargs='+', help="Manifest CSVs written by preprocessing/prep_*.py.")
+    parser.add_argument('--output_dir', type=str, required=True,
+                        help="Root of the packs; each manifest gets <output_dir>/<manifest name>/.")
+    parser.add_argument('--target_sample_rate', type=int, default=16000)
+    parser.add_argument('--shard_mb', type=int, default=1024, help="Approximate size of each shard file.")
+    parser.add_argument('--num_workers', type=int, default=4, help="Processes decoding the audio.")
+    args = parser.parse_args()
+
+    for manifest_path in args.manifests:
+        pack_dir = pack_dir_for(args.output_dir, manifest_path)
+        meta = pack_manifest(manifest_path, pack_dir, target_sample_rate=args.target_sample_rate,
+                             shard_bytes=args.shard_mb << 20, num_workers=args.num_workers)
+        hours = meta['num_samples'] / meta['target_sample_rate'] / 3600
+        print(f"Packed {meta['num_rows']} rows ({hours:.2f} h, {len(meta['shards'])} shards) into {pack_dir}")
+        if meta['num_failed']:
+            print(f"Warning: {meta['num_failed']} files could not be loaded and are marked as failed in the pack.")
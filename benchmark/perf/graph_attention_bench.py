@@ -0,0 +1,102 @@
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import time
+import torch
+
+from benchmark.perf.graph_attention_check import check_layers, make_inputs, make_layer, use_reference
+
+# (batch, nodes of type 1, nodes of type 2); type 2 is unused by GraphAttentionLayer
+DEFAULT_SHAPES = [(32, 42, 67), (128, 42, 67), (64, 128, 128)]
+
+
+def _peak_rss_bytes():
+    # VmHWM is reset by exec, unlike ru_maxrss which a spawned child inherits
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _measure_forward(kind, batch, num_type1, num_type2, reference, device, result_queue):
+    device = torch.device(device)
+    torch.set_num_threads(1)
+    layer = make_layer(kind, seed=0).to(device)
+    if reference:
+        use_reference(layer, kind)
+    inputs = [t.to(device) for t in make_inputs(kind, batch, num_type1, num_type2, seed=1)]
+
+    with torch.no_grad():
+        if device.type == 'cuda':
+            layer(*inputs)  # warm-up
+            torch.cuda.synchronize()
+            torch.cuda.reset_peak_memory_stats(device)
+            base = torch.cuda.memory_allocated(device)
+        else:
+            # No warm-up on CPU: memory kept by the allocator would hide the peak
+            base = _peak_rss_bytes()
+        start = time.perf_counter()
+        layer(*inputs)
+        if device.type == 'cuda':
+            torch.cuda.synchronize()
+            peak = torch.cuda.max_memory_allocated(device) - base
+        else:
+            peak = _peak_rss_bytes() - base
+        elapsed = time.perf_counter() - start
+    result_queue.put((peak, elapsed))
+
+
+def measure_peak_memory(kind, batch, num_type1, num_type2, reference, device):
+    """
+    Runs one forward pass in a fresh process and returns (peak extra bytes,
+    seconds). On CPU the peak is the growth of the process max RSS, on CUDA
+    the peak of allocated device memory.
+    """
+    ctx = mp.get_context('spawn')
+    result_queue = ctx.Queue()
+    process = ctx.Process(target=_measure_forward, args=(kind, batch, num_type1, num_type2, reference,
+                                                         str(device), result_queue))
+    process.start()
+    result = result_queue.get()
+    process.join()
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Check the blocked graph attention against the full pairwise product and compare peak memory.")
+    parser.add_argument('--shapes', type=str, nargs='+', default=None,
+                        help="Cases as batch,nodes1,nodes2 (default: %s)." % ' '.join(
+                            ','.join(map(str, s)) for s in DEFAULT_SHAPES))
+    parser.add_argument('--device', type=str, default='cpu')
+    parser.add_argument('--atol', type=float, default=1e-5)
+    parser.add_argument('--skip_memory', action='store_true', help="Only run the equivalence check.")
+    args = parser.parse_args()
+
+    shapes = [tuple(int(v) for v in s.split(',')) for s in args.shapes] if args.shapes else DEFAULT_SHAPES
+
+    print("== Equivalence against the full pairwise product (see graph_attention_check) ==")
+    worst = check_layers(shapes, atol=args.atol)
+
+    if not args.skip_memory:
+        device = torch.device(args.device)
+        print("\n== Peak memory of one forward pass ==")
+        print(f"{'layer':>5} | {'batch':>5} | {'nodes':>9} | {'full (MB)':>10} | {'blocked (MB)':>12} | "
+              f"{'full (s)':>8} | {'blocked (s)':>11}")
+        print('-' * 80)
+        for kind in ('gat', 'htrg'):
+            for batch, num_type1, num_type2 in shapes:
+                full_bytes, full_s = measure_peak_memory(kind, batch, num_type1, num_type2, True, device)
+                blocked_bytes, blocked_s = measure_peak_memory(kind, batch, num_type1, num_type2, False, device)
+                nodes = f"{num_type1},{num_type2}" if kind == 'htrg' else f"{num_type1}"
+                print(f"{kind:>5} | {batch:>5} | {nodes:>9} | {full_bytes / 2**20:>10.1f} | "
+                      f"{blocked_bytes / 2**20:>12.1f} | {full_s:>8.3f} | {blocked_s:>11.3f}")
+
+    if worst > args.atol:
+        print(f"\nEquivalence check FAILED (max |diff| {worst:.2e} > {args.atol:g}).")
+        sys.exit(1)
@@ -0,0 +1,183 @@
+import argparse
+import sys
+import torch
+import torch.nn.functional as F
+
+# The back-end layers only; importing models.baseline_model needs fairseq installed
+import models.baseline_model as baseline_model
+from models.baseline_model import GraphAttentionLayer, HtrgGraphAttentionLayer, pairwise_attention_logits
+
+# (batch, nodes of type 1, nodes of type 2): a batch of 1, odd node counts and
+# the node counts of Model (type 2 is unused by GraphAttentionLayer)
+DEFAULT_SHAPES = [(1, 42, 67), (3, 13, 29), (8, 42, 67)]
+# Row block sizes, including ones that leave a partial last block
+DEFAULT_BLOCK_ROWS = [1, 3, 7, 16]
+
+
+# --- Reference implementation: the graph attention as it was before blocking ---
+
+def reference_pairwise_mul_nodes(x):
+    """
+    The full pairwise product of nodes, formerly `_pairwise_mul_nodes` of both
+    layers.
+    x           :(#bs, #node, #dim)
+    out_shape   :(#bs, #node, #node, #dim)
+    """
+    nb_nodes = x.size(1)
+    x = x.unsqueeze(2).expand(-1, -1, nb_nodes, -1)
+    x_mirror = x.transpose(1, 2)
+    return x * x_mirror
+
+
+def reference_gat_att_map(layer, x):
+    """
+    GraphAttentionLayer._derive_att_map over the full pairwise product.
+    """
+    att_map = reference_pairwise_mul_nodes(x)
+    att_map = torch.tanh(layer.att_proj(att_map))
+    att_map = torch.matmul(att_map, layer.att_weight)
+    att_map = att_map / layer.temp
+    return F.softmax(att_map, dim=-2)
+
+
+def reference_htrg_att_map(layer, x, num_type1, num_type2):
+    """
+    HtrgGraphAttentionLayer._derive_att_map over the full pairwise product.
+    """
+    att_map = reference_pairwise_mul_nodes(x)
+    att_map = torch.tanh(layer.att_proj(att_map))
+    att_board = torch.zeros_like(att_map[:, :, :, 0]).unsqueeze(-1)
+    att_board[:, :num_type1, :num_type1, :] = torch.matmul(
+        att_map[:, :num_type1, :num_type1, :], layer.att_weight11)
+    att_board[:, num_type1:, num_type1:, :] = torch.matmul(
+        att_map[:, num_type1:, num_type1:, :], layer.att_weight22)
+    att_board[:, :num_type1, num_type1:, :] = torch.matmul(
+        att_map[:, :num_type1, num_type1:, :], layer.att_weight12)
+    att_board[:, num_type1:, :num_type1, :] = torch.matmul(
+        att_map[:, num_type1:, :num_type1, :], layer.att_weight12)
+    att_map = att_board / layer.temp
+    return F.softmax(att_map, dim=-2)
+
+
+def use_reference(layer, kind):
+    """
+    Routes a layer's attention map through the reference implementation.
+    """
+    if kind == 'gat':
+        layer._derive_att_map = lambda x: reference_gat_att_map(layer, x)
+    else:
+        layer._derive_att_map = lambda x, n1, n2: reference_htrg_att_map(layer, x, n1, n2)
+
+
+def make_layer(kind, seed):
+    torch.manual_seed(seed)
+    if kind == 'gat':
+        # GAT_layer_S / GAT_layer_T of Model
+        layer = GraphAttentionLayer(64, 64, temperature=2.0)
+    else:
+        # HtrgGAT_layer_ST11 of Model
+        layer = HtrgGraphAttentionLayer(64, 32, temperature=100.0)
+    return layer.eval()
+
+
+def make_inputs(kind, batch, num_type1, num_type2, seed):
+    generator = torch.Generator().manual_seed(seed)
+    x1 = torch.randn(batch, num_type1, 64, generator=generator)
+    if kind == 'gat':
+        return (x1,)
+    x2 = torch.randn(batch, num_type2, 64, generator=generator)
+    return (x1, x2)
+
+
+# --- Checks ---
+
+def check_logits(shapes, block_rows, atol):
+    """
+    Compares pairwise_attention_logits with the projected full pairwise
+    product for blocks of exactly `block_rows` rows.
+
+    Returns:
+        float: The largest absolute difference seen.
+    """
+    worst = 0.0
+    for batch, num_type1, num_type2 in shapes:
+        layer = make_layer('htrg', seed=0)
+        x = make_inputs('htrg', batch, num_type1 + num_type2, 0, seed=1)[0]
+        att_weights = torch.cat([layer.att_weight11, layer.att_weight12, layer.att_weight22], dim=1)
+        with torch.no_grad():
+            expected = torch.matmul(torch.tanh(layer.att_proj(reference_pairwise_mul_nodes(x))), att_weights)
+            row_elements = batch * x.size(1) * max(x.size(2), layer.att_proj.out_features)
+            for rows in block_rows:
+                actual = pairwise_attention_logits(x, layer.att_proj, att_weights,
+                                                   block_elements=rows * row_elements)
+                diff = float((expected - actual).abs().max())
+                worst = max(worst, diff)
+                status = 'ok' if diff <= atol else 'MISMATCH'
+                print(f"logits bs={batch:<3} nodes={x.size(1):<4} block_rows={rows:<3} "
+                      f"max|diff|={diff:.2e} {status}")
+    return worst
+
+
+def check_layers(shapes, block_elements=(None, 4096, 12345), atol=1e-5):
+    """
+    Compares the outputs of both layers against the reference implementation,
+    with the default block size and with small ones that force many (and
+    partial) row blocks.
+
+    Returns:
+        float: The largest absolute output difference seen.
+    """
+    worst = 0.0
+    default_block = baseline_model.PAIRWISE_BLOCK_ELEMENTS
+    try:
+        for kind in ('gat', 'htrg'):
+            for batch, num_type1, num_type2 in shapes:
+                inputs = make_inputs(kind, batch, num_type1, num_type2, seed=1)
+                reference_layer = make_layer(kind, seed=0)
+                use_reference(reference_layer, kind)
+                with torch.no_grad():
+                    expected = reference_layer(*inputs)
+                for elements in block_elements:
+                    baseline_model.PAIRWISE_BLOCK_ELEMENTS = elements or default_block
+                    with torch.no_grad():
+                        actual = make_layer(kind, seed=0)(*inputs)
+                    expected_t = expected if isinstance(expected, tuple) else (expected,)
+                    actual_t = actual if isinstance(actual, tuple) else (actual,)
+                    diff = max(float((e - a).abs().max()) for e, a in zip(expected_t, actual_t))
+                    worst = max(worst, diff)
+                    status = 'ok' if diff <= atol else 'MISMATCH'
+                    print(f"{kind:>6} bs={batch:<3} nodes=({num_type1},{num_type2}) "
+                          f"block={baseline_model.PAIRWISE_BLOCK_ELEMENTS:<8} max|diff|={diff:.2e} {status}")
+    finally:
+        baseline_model.PAIRWISE_BLOCK_ELEMENTS = default_block
+    return worst
+
+
+def check_equivalence(shapes=DEFAULT_SHAPES, block_rows=DEFAULT_BLOCK_ROWS, atol=1e-5):
+    """
+    Runs every check.
+
+    Returns:
+        bool: True if every difference is within `atol`.
+    """
+    worst = max(check_logits(shapes, block_rows, atol), check_layers(shapes, atol=atol))
+    return worst <= atol
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Check the blocked graph attention of models/baseline_model.py against the full "
+                    "pairwise product it replaced.")
+    parser.add_argument('--shapes', type=str, nargs='+', default=None,
+                        help="Cases as batch,nodes1,nodes2 (default: %s)." % ' '.join(
+                            ','.join(map(str, s)) for s in DEFAULT_SHAPES))
+    parser.add_argument('--block_rows', type=int, nargs='+', default=DEFAULT_BLOCK_ROWS)
+    parser.add_argument('--atol', type=float, default=1e-5)
+    args = parser.parse_args()
+
+    shapes = [tuple(int(v) for v in s.split(',')) for s in args.shapes] if args.shapes else DEFAULT_SHAPES
+    torch.set_num_threads(1)
+    if not check_equivalence(shapes, args.block_rows, args.atol):
+        print(f"\nEquivalence check FAILED (tolerance {args.atol:g}).")
+        sys.exit(1)
+    print("\nEquivalence check passed.")
@@ -0,0 +1,174 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from benchmark.utils.manifest import load_manifest, manifest_cache_path
+
+MODES = ('dataframe', 'arrays', 'mmap')
+# Extra columns as carried by MLAAD / Diffuse-or-Confuse manifests
+METADATA_COLUMNS = {
+    'language': 'en',
+    'model_name': 'tts_models/multilingual/multi-dataset/xtts_v2',
+    'architecture': 'xtts',
+    'transcript': 'the quick brown fox jumps over the lazy dog ' * 3,
+}
+
+
+def write_manifest(path, num_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'audio_path': [f"/data/benchmark/mlaad/fr/xtts_v2/clip_{i:07d}.wav" for i in range(num_rows)],
+        'label': np.where(rng.random(num_rows) < 0.5, 'bonafide', 'spoof'),
+        'duration': np.round(1.0 + 9.0 * rng.random(num_rows), 3),
+        **METADATA_COLUMNS,
+    })
+    df.to_csv(path, index=False)
+
+
+class _DataFrameRows(Dataset):
+    # The manifest access of the pandas-based dataset: one df.iloc row per item
+    def __init__(self, manifest_path):
+        self.df = pd.read_csv(manifest_path, dtype={4: str})
+        self.df['label'] = self.df['label'].apply(lambda x: 0 if x == 'bonafide' else 1)
+
+    def __len__(self):
+        return len(self.df)
+
+    def __getitem__(self, idx):
+        row = self.df.iloc[idx]
+        return len(row['audio_path']), row['label']
+
+
+class _CompactRows(Dataset):
+    # The manifest access of AudioManifestDataset
+    def __init__(self, manifest_path, use_cache):
+        self.manifest = load_manifest(manifest_path, use_cache=use_cache)
+
+    def __len__(self):
+        return len(self.manifest)
+
+    def __getitem__(self, idx):
+        return len(self.manifest.audio_path(idx)), int(self.manifest.labels[idx])
+
+
+def _memory_mb(pid):
+    # Pss splits shared pages between the processes mapping them; Private is
+    # what the process alone holds (copy-on-write copies included)
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)}
+
+
+def measure(manifest_path, mode, num_workers, batch_size=256, start_method='fork'):
+    """
+    Reads every manifest row once through a DataLoader with `num_workers`
+    workers and returns the memory of the main process and of the workers
+    while they are still alive.
+    """
+    before = _memory_mb(os.getpid())['rss']
+    if mode == 'dataframe':
+        dataset = _DataFrameRows(manifest_path)
+    else:
+        dataset = _CompactRows(manifest_path, use_cache=(mode == 'mmap'))
+    # Growth of the main process from loading the manifest (mapped pages count once touched)
+    manifest_mb = _memory_mb(os.getpid())['rss'] - before
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, num_workers=num_workers,
+                        multiprocessing_context=start_method, generator=torch.Generator().manual_seed(0))
+
+    start = time.perf_counter()
+    iterator = iter(loader)
+    # Consume exactly len(loader) batches, so the workers are not shut down yet
+    rows = sum(len(next(iterator)[0]) for _ in range(len(loader)))
+    seconds = time.perf_counter() - start
+    workers = [_memory_mb(w.pid) for w in iterator._workers]
+    main = _memory_mb(os.getpid())
+    del iterator
+
+    return {
+        'manifest_mb': round(manifest_mb, 1),
+        'rows': rows,
+        'seconds': round(seconds, 2),
+        'main_rss_mb': round(main['rss'], 1),
+        'worker_rss_mb': round(sum(w['rss'] for w in workers), 1),
+        'worker_pss_mb': round(sum(w['pss'] for w in workers), 1),
+        'worker_private_mb': round(sum(w['private'] for w in workers), 1),
+    }
+
+
+def _measure_main(result_queue, *args, **kwargs):
+    try:
+        result_queue.put(measure(*args, **kwargs))
+    except Exception as e:
+        result_queue.put({'error': repr(e)})
+        raise
+
+
+def measure_in_process(*args, **kwargs):
+    """
+    Runs `measure` in a fresh process, so no manifest of an earlier
+    measurement is held by the main process or inherited by its workers.
+    """
+    ctx = mp.get_context('spawn')
+    result_queue = ctx.Queue()
+    process = ctx.Process(target=_measure_main, args=(result_queue,) + args, kwargs=kwargs)
+    process.start()
+    result = result_queue.get()
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(f"Measurement failed: {result['error']}")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Measure DataLoader worker memory with the manifest held as a pandas DataFrame, as "
+                    "in-memory arrays, or as a memory-mapped cache, on a synthetic manifest.")
+    parser.add_argument('--num_rows', type=int, default=600000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--modes', type=str, nargs='+', default=list(MODES), choices=MODES)
+    parser.add_argument('--start_method', type=str, default='fork', choices=['fork', 'spawn', 'forkserver'])
+    parser.add_argument('--batch_size', type=int, default=256)
+    parser.add_argument('--manifest', type=str, default=None,
+                        help="Use this manifest instead of a synthetic one.")
+    parser.add_argument('--output', type=str, default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    manifest_path = args.manifest
+    if manifest_path is None:
+        manifest_path = os.path.join(tempfile.gettempdir(), f"auddt_rss_manifest_{args.num_rows}.csv")
+        if not os.path.exists(manifest_path):
+            print(f"Writing a synthetic manifest of {args.num_rows} rows to {manifest_path}...")
+            write_manifest(manifest_path, args.num_rows)
+    if 'mmap' in args.modes:
+        load_manifest(manifest_path)  # builds the cache outside the measurement
+        print(f"Manifest {os.path.getsize(manifest_path) / 2**20:.1f} MB, "
+              f"cache {os.path.getsize(manifest_cache_path(manifest_path)) / 2**20:.1f} MB")
+
+    results = []
+    print(f"{'mode':>9} | {'workers':>7} | {'sec':>6} | {'manifest':>8} | {'main RSS':>8} | {'worker RSS':>10} | "
+          f"{'worker PSS':>10} | {'worker private':>14}")
+    print('-' * 95)
+    for num_workers in args.workers:
+        for mode in args.modes:
+            r = measure_in_process(manifest_path, mode, num_workers, batch_size=args.batch_size,
+                                   start_method=args.start_method)
+            results.append(dict(r, mode=mode, workers=num_workers))
+            print(f"{mode:>9} | {num_workers:>7} | {r['seconds']:>6.1f} | {r['manifest_mb']:>8.1f} | "
+                  f"{r['main_rss_mb']:>8.1f} | "
+                  f"{r['worker_rss_mb']:>10.1f} | {r['worker_pss_mb']:>10.1f} | {r['worker_private_mb']:>14.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'manifest': manifest_path, 'start_method': args.start_method, 'results': results}, f, indent=2)
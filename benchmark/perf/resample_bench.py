@@ -0,0 +1,80 @@
+import argparse
+import time
+import torch
+import torchaudio
+
+from benchmark.utils.audio_preprocessing import WaveformProcessor
+
+# Source rates found across the benchmark datasets (WaveFake, DAPS, EnhanceSpeech, ...)
+DEFAULT_RATES = [8000, 22050, 24000, 44100, 48000]
+
+
+def _make_clips(sample_rate, num_clips, min_seconds, max_seconds, seed):
+    generator = torch.Generator().manual_seed(seed)
+    clips = []
+    for _ in range(num_clips):
+        seconds = min_seconds + (max_seconds - min_seconds) * torch.rand(1, generator=generator).item()
+        clips.append(0.1 * torch.randn(1, int(seconds * sample_rate), generator=generator))
+    return clips
+
+
+def _clips_per_sec(fn, num_clips, repeats):
+    fn()  # warm-up, also builds any cached kernel
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return num_clips * repeats / (time.perf_counter() - start)
+
+
+def run_benchmark(rates, target_sample_rate, target_length, num_clips, min_seconds, max_seconds, repeats):
+    """
+    Measures resampling + preprocessing throughput (clips/sec) per rate pair for:
+      - per_clip_new:  a fresh Resample transform per clip (the previous behaviour)
+      - per_clip_cached: the cached per-rate-pair kernel, one clip at a time
+    """
+    processor = WaveformProcessor(target_sample_rate=target_sample_rate, target_length=target_length)
+    results = {}
+
+    for sample_rate in rates:
+        clips = _make_clips(sample_rate, num_clips, min_seconds, max_seconds, seed=sample_rate)
+
+        def per_clip_new():
+            for clip in clips:
+                resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=target_sample_rate)
+                processor.finalize(resampler(clip))
+
+        def per_clip_cached():
+            for clip in clips:
+                processor(clip, sample_rate)
+
+        results[(sample_rate, target_sample_rate)] = {
+            'per_clip_new': _clips_per_sec(per_clip_new, num_clips, repeats),
+            'per_clip_cached': _clips_per_sec(per_clip_cached, num_clips, repeats),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark resampling throughput per sample-rate pair.")
+    parser.add_argument('--rates', type=int, nargs='+', default=DEFAULT_RATES, help="Source sample rates to test.")
+    parser.add_argument('--target_sample_rate', type=int, default=16000)
+    parser.add_argument('--target_length', type=int, default=64000)
+    parser.add_argument('--num_clips', type=int, default=256)
+    parser.add_argument('--min_seconds', type=float, default=2.0)
+    parser.add_argument('--max_seconds', type=float, default=6.0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=1,
+                        help="torch intra-op threads (1, as in DataLoader workers).")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+
+    results = run_benchmark(
+        args.rates, args.target_sample_rate, args.target_length, args.num_clips,
+        args.min_seconds, args.max_seconds, args.repeats,
+    )
+
+    print(f"{'rate pair':>16} | {'per_clip_new':>12} | {'per_clip_cached':>15}   (clips/sec)")
+    print('-' * 53)
+    for (orig, new), res in results.items():
+        print(f"{orig:>7} -> {new:<6} | {res['per_clip_new']:>12.1f} | {res['per_clip_cached']:>15.1f}")
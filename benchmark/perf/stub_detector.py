@@ -0,0 +1,50 @@
+import torch
+import torch.nn as nn
+
+
+class StubDetector(nn.Module):
+    """
+    A tiny stand-in for AudioDeepfakeDetector that needs neither fairseq nor a
+    checkpoint. Weights are seeded, so scores are reproducible.
+
+    It exposes the same `get_prediction_score` contract, (batch, samples)
+    waveforms in, one score per waveform out, and the extract_frontend /
+    forward_backend split of the baseline Model, so it also runs through the
+    timing and back-end compilation paths. `hidden_dim` and `num_layers` scale
+    its cost.
+    """
+    def __init__(self, frame_length=320, hidden_dim=64, num_layers=2, seed=0):
+        """
+        Args:
+            frame_length (int): Samples per front-end frame (320 = 20 ms at 16 kHz, as XLSR).
+            hidden_dim (int): Feature dimension of the front-end and back-end.
+            num_layers (int): Number of back-end Linear layers.
+            seed (int): Seed of the weight initialization.
+        """
+        super().__init__()
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(seed)
+            self.frontend = nn.Conv1d(1, hidden_dim, kernel_size=frame_length, stride=frame_length)
+            self.layers = nn.ModuleList([nn.Linear(hidden_dim, hidden_dim) for _ in range(num_layers)])
+            self.out_layer = nn.Linear(hidden_dim, 2)
+        self.eval()
+
+    def extract_frontend(self, x):
+        '''
+        x           :(#bs, #samples)
+        out_shape   :(#bs, #frame, #dim)
+        '''
+        return torch.nn.functional.gelu(self.frontend(x.unsqueeze(1))).transpose(1, 2)
+
+    def forward_backend(self, x_ssl_feat):
+        x = x_ssl_feat
+        for layer in self.layers:
+            x = torch.nn.functional.gelu(layer(x))
+        return self.out_layer(x.mean(dim=1))
+
+    def forward(self, x):
+        return self.forward_backend(self.extract_frontend(x))
+
+    def get_prediction_score(self, x):
+        # Same reduction as AudioDeepfakeDetector.output_to_score for two outputs
+        return self(x)[:, 0]
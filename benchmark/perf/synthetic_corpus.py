@@ -0,0 +1,145 @@
+import argparse
+import json
+import math
+import os
+import pandas as pd
+import torch
+import torchaudio
+
+# Mix of source rates, layouts and containers found across the benchmark datasets
+DEFAULT_RATES = [16000, 22050, 24000, 44100, 48000]
+DEFAULT_CHANNELS = [1, 2]
+DEFAULT_FORMATS = ['wav', 'flac']
+
+
+def _synthesize(num_frames, num_channels, sample_rate, generator):
+    # A few harmonics over a noise floor, so codecs and resamplers see speech-like content
+    t = torch.arange(num_frames, dtype=torch.float64) / sample_rate
+    f0 = 80.0 + 220.0 * torch.rand(1, generator=generator).item()
+    voiced = sum(torch.sin(2 * math.pi * f0 * k * t) / k for k in range(1, 6))
+    envelope = 0.5 * (1.0 + torch.sin(2 * math.pi * 3.0 * t))
+    channels = []
+    for _ in range(num_channels):
+        noise = 0.05 * torch.randn(num_frames, generator=generator, dtype=torch.float64)
+        channels.append(0.3 * envelope * voiced / 2.5 + noise)
+    return torch.stack(channels).clamp(-1.0, 1.0).float()
+
+
+def corpus_spec(num_clips=256, sample_rates=DEFAULT_RATES, channels=DEFAULT_CHANNELS, formats=DEFAULT_FORMATS,
+                min_seconds=1.0, max_seconds=6.0, num_manifests=1, spoof_fraction=0.5, seed=0):
+    """
+    Returns the settings of a synthetic corpus as a JSON-serializable dict.
+    """
+    return {
+        'num_clips': int(num_clips),
+        'sample_rates': [int(r) for r in sample_rates],
+        'channels': [int(c) for c in channels],
+        'formats': list(formats),
+        'min_seconds': float(min_seconds),
+        'max_seconds': float(max_seconds),
+        'num_manifests': int(num_manifests),
+        'spoof_fraction': float(spoof_fraction),
+        'seed': int(seed),
+    }
+
+
+def generate_corpus(output_dir, spec):
+    """
+    Writes a synthetic audio corpus and matching manifests.
+
+    Consecutive clips cycle through every combination of the configured sample
+    rates, channel counts and formats; each clip gets a random duration and
+    label. Manifests are written as `manifest_<k>.csv`
+    (audio_path, label, duration), together with a `groups.yaml` in the format
+    of dataset_group.yaml listing them as group 'synthetic'.
+
+    Args:
+        output_dir (str): Destination directory.
+        spec (dict): Corpus settings, see `corpus_spec`.
+
+    Returns:
+        list[str]: The manifest paths.
+    """
+    audio_dir = os.path.join(output_dir, 'audio')
+    os.makedirs(audio_dir, exist_ok=True)
+    generator = torch.Generator().manual_seed(spec['seed'])
+
+    rows = []
+    for i in range(spec['num_clips']):
+        sample_rate = spec['sample_rates'][i % len(spec['sample_rates'])]
+        num_channels = spec['channels'][(i // len(spec['sample_rates'])) % len(spec['channels'])]
+        fmt = spec['formats'][(i // (len(spec['sample_rates']) * len(spec['channels']))) % len(spec['formats'])]
+        seconds = spec['min_seconds'] + (spec['max_seconds'] - spec['min_seconds']) * torch.rand(
+            1, generator=generator).item()
+        num_frames = max(1, int(seconds * sample_rate))
+        label = 'spoof' if torch.rand(1, generator=generator).item() < spec['spoof_fraction'] else 'bonafide'
+
+        audio_path = os.path.join(audio_dir, f"clip_{i:06d}.{fmt}")
+        waveform = _synthesize(num_frames, num_channels, sample_rate, generator)
+        if fmt == 'wav':
+            torchaudio.save(audio_path, waveform, sample_rate, encoding='PCM_S', bits_per_sample=16)
+        elif fmt == 'flac':
+            torchaudio.save(audio_path, waveform, sample_rate, bits_per_sample=16)
+        else:
+            torchaudio.save(audio_path, waveform, sample_rate)
+        rows.append({'audio_path': os.path.abspath(audio_path), 'label': label,
+                     'duration': round(num_frames / sample_rate, 6)})
+
+    manifest_paths = []
+    groups = []
+    num_manifests = max(1, spec['num_manifests'])
+    for k in range(num_manifests):
+        manifest_path = os.path.join(output_dir, f"manifest_{k}.csv")
+        pd.DataFrame(rows[k::num_manifests], columns=['audio_path', 'label', 'duration']).to_csv(
+            manifest_path, index=False)
+        manifest_paths.append(manifest_path)
+        groups.append(f"  - name: synthetic_{k}\n    manifest_path: manifest_{k}.csv\n")
+
+    with open(os.path.join(output_dir, 'groups.yaml'), 'w') as f:
+        f.write(f"ROOT: {os.path.abspath(output_dir)}\nsynthetic:\n{''.join(groups)}")
+    return manifest_paths
+
+
+def ensure_corpus(output_dir, spec):
+    """
+    Generates the corpus unless `output_dir` already holds one with the same
+    settings, and returns its manifest paths.
+    """
+    spec_path = os.path.join(output_dir, 'spec.json')
+    manifest_paths = [os.path.join(output_dir, f"manifest_{k}.csv") for k in range(max(1, spec['num_manifests']))]
+    try:
+        with open(spec_path, 'r') as f:
+            if json.load(f) == spec and all(os.path.exists(p) for p in manifest_paths):
+                return manifest_paths
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    print(f"Generating a synthetic corpus of {spec['num_clips']} clips in '{output_dir}'...")
+    manifest_paths = generate_corpus(output_dir, spec)
+    with open(spec_path, 'w') as f:
+        json.dump(spec, f, indent=2)
+    return manifest_paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic audio corpus and matching manifests.")
+    parser.add_argument('--output_dir', type=str, required=True)
+    parser.add_argument('--num_clips', type=int, default=256)
+    parser.add_argument('--rates', type=int, nargs='+', default=DEFAULT_RATES, help="Source sample rates.")
+    parser.add_argument('--channels', type=int, nargs='+', default=DEFAULT_CHANNELS, help="Channel counts.")
+    parser.add_argument('--formats', type=str, nargs='+', default=DEFAULT_FORMATS,
+                        help="Containers, e.g. wav flac mp3 ogg (depends on the torchaudio backend).")
+    parser.add_argument('--min_seconds', type=float, default=1.0)
+    parser.add_argument('--max_seconds', type=float, default=6.0)
+    parser.add_argument('--num_manifests', type=int, default=1, help="Split the clips over this many manifests.")
+    parser.add_argument('--spoof_fraction', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    spec = corpus_spec(
+        num_clips=args.num_clips, sample_rates=args.rates, channels=args.channels, formats=args.formats,
+        min_seconds=args.min_seconds, max_seconds=args.max_seconds, num_manifests=args.num_manifests,
+        spoof_fraction=args.spoof_fraction, seed=args.seed,
+    )
+    for path in ensure_corpus(args.output_dir, spec):
+        print(path)
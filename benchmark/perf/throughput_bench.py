@@ -0,0 +1,259 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import torch
+from torch.utils.data import ConcatDataset, DataLoader
+
+from benchmark.perf.stub_detector import StubDetector
+from benchmark.perf.synthetic_corpus import corpus_spec, ensure_corpus
+
+SCENARIOS = ('data', 'model', 'e2e')
+
+# Allowed relative change before a result counts as a regression
+DEFAULT_THRESHOLDS = {'clips_per_sec': 0.10, 'peak_rss_mb': 0.20}
+
+# Baselines are absolute numbers of one machine, so each host keeps its own
+# here (ignored by git) instead of sharing a committed one
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def default_baseline_path():
+    return os.path.join(BASELINE_DIR, f"{platform.node() or 'unknown'}.json")
+
+
+def _peak_rss_mb():
+    # VmHWM is reset by exec, unlike ru_maxrss which a spawned child inherits
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _build_loader(manifest_paths, settings):
+    from benchmark.utils.data_loader import AudioManifestDataset
+
+    datasets = [AudioManifestDataset(path, **settings['data_args']) for path in manifest_paths]
+    return DataLoader(ConcatDataset(datasets), batch_size=settings['batch_size'], shuffle=False,
+                      num_workers=settings['num_workers'], collate_fn=datasets[0].collate_fn)
+
+
+def _run_scenario(scenario, manifest_paths, settings):
+    """
+    Runs one scenario and returns (clips, seconds).
+      - data:  the DataLoader alone (decode, resample, normalize/pad, collate)
+      - model: the stub detector alone on pre-built batches
+      - e2e:   both, through the evaluation loop of benchmark.evaluate
+    """
+    device = torch.device(settings['device'])
+    if scenario == 'data':
+        loader = _build_loader(manifest_paths, settings)
+        start = time.perf_counter()
+        clips = sum(len(batch[1]) for batch in loader)
+        return clips, time.perf_counter() - start
+
+    model = StubDetector(**settings['stub_args']).to(device)
+    if scenario == 'model':
+        clips = settings['num_clips']
+        length = settings['data_args'].get('target_length') or 64000
+        generator = torch.Generator().manual_seed(0)
+        batch = torch.randn(settings['batch_size'], length, generator=generator).to(device)
+        with torch.no_grad():
+            model.get_prediction_score(batch)  # warm-up
+            start = time.perf_counter()
+            for first in range(0, clips, settings['batch_size']):
+                model.get_prediction_score(batch[:min(settings['batch_size'], clips - first)]).cpu()
+        return clips, time.perf_counter() - start
+
+    from benchmark.evaluate import iter_scored_batches
+    loader = _build_loader(manifest_paths, settings)
+    start = time.perf_counter()
+    clips = sum(len(labels) for _, _, _, labels in iter_scored_batches(model, loader, device, desc=scenario))
+    return clips, time.perf_counter() - start
+
+
+def _scenario_main(scenario, manifest_paths, settings, result_queue):
+    try:
+        torch.set_num_threads(settings['threads'])
+        device = torch.device(settings['device'])
+        if device.type == 'cuda':
+            torch.cuda.reset_peak_memory_stats(device)
+        clips, seconds = _run_scenario(scenario, manifest_paths, settings)
+        result = {
+            'clips': clips,
+            'seconds': seconds,
+            'peak_rss_mb': _peak_rss_mb(),
+            # Largest DataLoader worker; only workers that have exited count
+            'peak_worker_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        }
+        if device.type == 'cuda':
+            result['peak_cuda_mb'] = torch.cuda.max_memory_allocated(device) / 2**20
+        result_queue.put(result)
+    except Exception as e:
+        result_queue.put({'error': repr(e)})
+        raise
+
+
+def measure_scenario(scenario, manifest_paths, settings, repeats=3):
+    """
+    Runs a scenario `repeats` times, each in a fresh process so peak memory is
+    not shared between runs, and returns the median throughput with the
+    largest peak memory seen.
+    """
+    ctx = mp.get_context('spawn')
+    runs = []
+    for _ in range(repeats):
+        result_queue = ctx.Queue()
+        process = ctx.Process(target=_scenario_main, args=(scenario, manifest_paths, settings, result_queue))
+        process.start()
+        result = result_queue.get()
+        process.join()
+        if 'error' in result:
+            raise RuntimeError(f"Scenario '{scenario}' failed: {result['error']}")
+        runs.append(result)
+
+    summary = {
+        'clips': runs[0]['clips'],
+        'clips_per_sec': statistics.median(r['clips'] / r['seconds'] for r in runs),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        'peak_worker_rss_mb': max(r['peak_worker_rss_mb'] for r in runs),
+    }
+    if 'peak_cuda_mb' in runs[0]:
+        summary['peak_cuda_mb'] = max(r['peak_cuda_mb'] for r in runs)
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in summary.items()}
+
+
+def compare_to_baseline(results, baseline, thresholds):
+    """
+    Compares results against a baseline; throughput may drop and peak memory
+    may grow by the relative thresholds before counting as a regression.
+
+    Returns:
+        list[str]: One message per regression.
+    """
+    regressions = []
+    for scenario, result in results.items():
+        reference = baseline.get('results', {}).get(scenario)
+        if reference is None:
+            continue
+        floor = reference['clips_per_sec'] * (1 - thresholds['clips_per_sec'])
+        if result['clips_per_sec'] < floor:
+            regressions.append(f"{scenario}: {result['clips_per_sec']:.1f} clips/sec < {floor:.1f} "
+                               f"(baseline {reference['clips_per_sec']:.1f})")
+        for key in ('peak_rss_mb', 'peak_worker_rss_mb', 'peak_cuda_mb'):
+            if key not in result or not reference.get(key):
+                continue
+            ceiling = reference[key] * (1 + thresholds['peak_rss_mb'])
+            if result[key] > ceiling:
+                regressions.append(f"{scenario}: {key} {result[key]:.1f} > {ceiling:.1f} "
+                                   f"(baseline {reference[key]:.1f})")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Measure data path, model path and end-to-end throughput on a synthetic corpus "
+                    "with a stub detector, and compare them against a stored baseline.")
+    parser.add_argument('--scenarios', type=str, nargs='+', default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument('--corpus_dir', type=str, default=os.path.join(tempfile.gettempdir(), 'auddt_perf_corpus'),
+                        help="Where the synthetic corpus is generated (reused when the settings match).")
+    parser.add_argument('--num_clips', type=int, default=256)
+    parser.add_argument('--num_manifests', type=int, default=2)
+    parser.add_argument('--min_seconds', type=float, default=1.0)
+    parser.add_argument('--max_seconds', type=float, default=6.0)
+    parser.add_argument('--target_length', type=int, default=64000)
+    parser.add_argument('--batch_size', type=int, default=32)
+    parser.add_argument('--num_workers', type=int, default=4)
+    parser.add_argument('--hidden_dim', type=int, default=64, help="Stub detector width.")
+    parser.add_argument('--threads', type=int, default=4, help="torch intra-op threads per scenario.")
+    parser.add_argument('--device', type=str, default='cpu')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--baseline', type=str, default=None,
+                        help="Baseline JSON to compare against (default: this host's, "
+                             "benchmark/perf/baselines/<host>.json).")
+    parser.add_argument('--save_baseline', action='store_true', help="Write the results as the new baseline.")
+    parser.add_argument('--throughput_threshold', type=float, default=None,
+                        help="Allowed relative clips/sec drop (default: the baseline's, else %g)."
+                             % DEFAULT_THRESHOLDS['clips_per_sec'])
+    parser.add_argument('--memory_threshold', type=float, default=None,
+                        help="Allowed relative peak memory growth (default: the baseline's, else %g)."
+                             % DEFAULT_THRESHOLDS['peak_rss_mb'])
+    parser.add_argument('--output', type=str, default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+    if args.baseline is None:
+        args.baseline = default_baseline_path()
+
+    spec = corpus_spec(num_clips=args.num_clips, min_seconds=args.min_seconds, max_seconds=args.max_seconds,
+                       num_manifests=args.num_manifests)
+    manifest_paths = ensure_corpus(args.corpus_dir, spec)
+    settings = {
+        'num_clips': args.num_clips,
+        'data_args': {'target_sample_rate': 16000, 'target_length': args.target_length},
+        'batch_size': args.batch_size,
+        'num_workers': args.num_workers,
+        'stub_args': {'hidden_dim': args.hidden_dim},
+        'threads': args.threads,
+        'device': args.device,
+    }
+
+    results = {}
+    print(f"{'scenario':>8} | {'clips/sec':>10} | {'peak RSS (MB)':>13} | {'worker RSS (MB)':>15}")
+    print('-' * 56)
+    for scenario in args.scenarios:
+        results[scenario] = measure_scenario(scenario, manifest_paths, settings, repeats=args.repeats)
+        r = results[scenario]
+        print(f"{scenario:>8} | {r['clips_per_sec']:>10.1f} | {r['peak_rss_mb']:>13.1f} | {r['peak_worker_rss_mb']:>15.1f}")
+
+    report = {
+        'host': platform.node(),
+        'torch_version': torch.__version__,
+        'corpus': spec,
+        'settings': settings,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    thresholds = dict(DEFAULT_THRESHOLDS, **(baseline or {}).get('thresholds', {}))
+    if args.throughput_threshold is not None:
+        thresholds['clips_per_sec'] = args.throughput_threshold
+    if args.memory_threshold is not None:
+        thresholds['peak_rss_mb'] = args.memory_threshold
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(report, thresholds=thresholds), f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save_baseline to create one.")
+        sys.exit(0)
+    if baseline.get('corpus') != spec or baseline.get('settings') != settings:
+        print("\nWarning: the baseline was recorded with different corpus or settings; comparison may be meaningless.")
+    if baseline.get('host') != report['host']:
+        print(f"\nWarning: the baseline was recorded on '{baseline.get('host')}', not on this host.")
+
+    regressions = compare_to_baseline(results, baseline, thresholds)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    print(f"\nNo regression against the baseline (thresholds: {thresholds}).")
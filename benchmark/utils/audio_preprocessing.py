@@ -1,5 +1,23 @@
 import torch
 import torchaudio
+from .stage_timer import STAGE_TIMER
+
+# One Resample transform (and hence one precomputed sinc kernel) per
+# (orig_freq, new_freq) pair, shared by every processor in this process.
+_RESAMPLER_CACHE = {}
+
+def get_resampler(orig_freq, new_freq):
+    """
+    Returns a cached torchaudio Resample transform for the given rate pair,
+    building its sinc kernel only the first time the pair is requested.
+    """
+    key = (int(orig_freq), int(new_freq))
+    if key not in _RESAMPLER_CACHE:
+        _RESAMPLER_CACHE[key] = torchaudio.transforms.Resample(
+            orig_freq=key[0],
+            new_freq=key[1]
+        )
+    return _RESAMPLER_CACHE[key]
 
 class WaveformProcessor:
     """
@@ -31,14 +49,26 @@ class WaveformProcessor:
         Returns:
             torch.Tensor: The processed waveform tensor.
         """
-        # Resample to target sampling rate
+        with STAGE_TIMER.stage('resample'):
+            waveform = self.resample(waveform, original_sample_rate)
+        with STAGE_TIMER.stage('normalize_pad'):
+            return self.finalize(waveform)
+
+    def resample(self, waveform, original_sample_rate):
+        """
+        Resamples a waveform to the target sampling rate using the cached kernel
+        for its rate pair. Waveforms already at the target rate are returned as is.
+        """
         if original_sample_rate != self.target_sample_rate:
-            resampler = torchaudio.transforms.Resample(
-                orig_freq=original_sample_rate, 
-                new_freq=self.target_sample_rate
-            )
+            resampler = get_resampler(original_sample_rate, self.target_sample_rate)
             waveform = resampler(waveform)
-        
+        return waveform
+
+    def finalize(self, waveform):
+        """
+        Applies mono conversion, amplitude normalization and padding/trimming to
+        a waveform that is already at the target sampling rate.
+        """
         waveform = waveform.squeeze()
 
         # Convert to mono by averaging channels if necessary
@@ -50,7 +80,7 @@ class WaveformProcessor:
         max_abs_val = torch.max(torch.abs(waveform))
         if max_abs_val > 0:
             waveform = waveform / (max_abs_val + 1e-8)
-        
+
         # Apply padding or trimming to a fixed length
         if self.target_length is not None:
             current_len = waveform.shape[-1]
@@ -61,5 +91,56 @@ class WaveformProcessor:
             elif current_len > self.target_length:
                 # Trim the waveform from the end
                 waveform = waveform[:self.target_length]
-            
+
         return waveform
+
+
+def pad_and_stack(waveforms):
+    """
+    Zero-pads 1-D waveforms to the longest one and stacks them.
+
+    Returns:
+        tuple: (waveforms (batch, max_len), lengths (batch,)) tensors.
+    """
+    lengths = torch.tensor([w.shape[-1] for w in waveforms], dtype=torch.long)
+    max_len = int(lengths.max()) if len(waveforms) else 0
+    padded = torch.stack([
+        torch.nn.functional.pad(w, (0, max_len - w.shape[-1])) for w in waveforms
+    ])
+    return padded, lengths
+
+def pad_collate(batch):
+    """
+    A padding-aware collate for variable-length (waveform, label) items, used
+    when no target_length is set. Returns (waveforms, labels, lengths).
+    """
+    waveforms, lengths = pad_and_stack([item[0] for item in batch])
+    labels = torch.tensor([item[1] for item in batch])
+    return waveforms, labels, lengths
+
+
+class DropFailedCollate:
+    """
+    Wraps a collate function so that items that failed to load (label -1) are
+    dropped from their batch instead of failing or discarding the whole batch.
+
+    Returns (waveforms, labels, lengths, positions): the inner collate's
+    waveforms and labels over the remaining items, their lengths (None if the
+    inner collate returns none) and their positions in the original batch. A
+    batch without remaining items has no waveforms and empty labels.
+    """
+    def __init__(self, collate_fn):
+        """
+        Args:
+            collate_fn (callable): The collate of the dataset's items, e.g.
+                                   default_collate or pad_collate.
+        """
+        self.collate_fn = collate_fn
+
+    def __call__(self, batch):
+        positions = [i for i, item in enumerate(batch) if int(item[1]) != -1]
+        if not positions:
+            return None, torch.zeros(0, dtype=torch.long), None, torch.zeros(0, dtype=torch.long)
+        collated = self.collate_fn([batch[i] for i in positions])
+        lengths = collated[2] if len(collated) > 2 else None
+        return collated[0], collated[1], lengths, torch.tensor(positions, dtype=torch.long)
@@ -0,0 +1,213 @@
+import json
+import mmap
+import os
+import shutil
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+from tqdm import tqdm
+from .audio_preprocessing import pad_and_stack
+from .score_journal import file_sha1
+
+PACK_VERSION = 1
+# int16 full scale; packed clips are peak-normalized waveforms scaled by this
+INT16_SCALE = 32767.0
+
+
+def pack_dir_for(packed_root, manifest_path):
+    """
+    Returns the pack directory of a manifest under a root of packs, e.g.
+    <packed_root>/manifest_asvspoof2019 for .../manifest_asvspoof2019.csv.
+    """
+    return os.path.join(packed_root, os.path.splitext(os.path.basename(manifest_path))[0])
+
+
+def _first_item(batch):
+    return batch[0]
+
+
+def pack_manifest(manifest_path, output_dir, target_sample_rate=16000, shard_bytes=1 << 30, num_workers=4):
+    """
+    Decodes every clip of a manifest once and packs it into int16 shards.
+
+    Each clip goes through the dataset's own preprocessing (resampling to
+    `target_sample_rate`, mono mix, peak normalization; no padding or
+    trimming), is scaled to int16 and appended to the current shard file,
+    which is closed once it exceeds `shard_bytes`. An index holds the shard,
+    offset and length (in samples) and the label of every manifest row;
+    rows that failed to load keep length 0 and label -1. meta.json is written
+    last and marks the pack as complete.
+
+    Args:
+        manifest_path (str): Manifest CSV (audio_path, label[, duration]).
+        output_dir (str): Destination directory, replaced if it exists.
+        target_sample_rate (int): Sample rate of the packed audio.
+        shard_bytes (int): Approximate size of each shard file.
+        num_workers (int): DataLoader workers decoding the clips.
+
+    Returns:
+        dict: The pack metadata.
+    """
+    from .data_loader import AudioManifestDataset
+
+    dataset = AudioManifestDataset(manifest_path, target_sample_rate=target_sample_rate, target_length=None)
+    loader = DataLoader(dataset, batch_size=1, shuffle=False, num_workers=num_workers, collate_fn=_first_item)
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    shards = np.zeros(len(dataset), dtype=np.int32)
+    offsets = np.zeros(len(dataset), dtype=np.int64)
+    lengths = np.zeros(len(dataset), dtype=np.int64)
+    labels = np.zeros(len(dataset), dtype=np.int8)
+
+    shard_names = []
+    shard_file = None
+    shard_samples = 0
+    for idx, (waveform, label) in enumerate(tqdm(loader, desc=f"Packing {os.path.basename(manifest_path)}")):
+        labels[idx] = label
+        if label == -1:
+            continue
+        if shard_file is None or shard_samples * 2 >= shard_bytes:
+            if shard_file is not None:
+                shard_file.close()
+            shard_names.append(f"shard_{len(shard_names):05d}.bin")
+            shard_file = open(os.path.join(output_dir, shard_names[-1]), 'wb')
+            shard_samples = 0
+        samples = torch.round(waveform.clamp(-1.0, 1.0) * INT16_SCALE).to(torch.int16).numpy()
+        shard_file.write(samples.tobytes())
+        shards[idx], offsets[idx], lengths[idx] = len(shard_names) - 1, shard_samples, len(samples)
+        shard_samples += len(samples)
+    if shard_file is not None:
+        shard_file.close()
+
+    np.savez(os.path.join(output_dir, 'index.npz'), shards=shards, offsets=offsets, lengths=lengths, labels=labels)
+    meta = {
+        'version': PACK_VERSION,
+        'manifest_path': os.path.abspath(manifest_path),
+        'manifest_sha1': file_sha1(manifest_path),
+        'target_sample_rate': int(target_sample_rate),
+        'num_rows': len(dataset),
+        'num_failed': int(np.sum(labels == -1)),
+        'num_samples': int(lengths.sum()),
+        'shards': shard_names,
+    }
+    with open(os.path.join(output_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def read_pack_meta(pack_dir):
+    """
+    Returns the metadata of a complete pack, or None.
+    """
+    try:
+        with open(os.path.join(pack_dir, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return meta if meta.get('version') == PACK_VERSION else None
+
+
+class PackedCollate:
+    """
+    Collates (waveform, label) items into a float32 batch, converting packed
+    int16 views in the same copy that pads or trims them to `target_length`.
+    Float items (e.g. from an AudioManifestDataset) pass through unscaled.
+
+    Returns (waveforms, labels) with a fixed target_length, else
+    (waveforms, labels, lengths) like pad_collate.
+    """
+    def __init__(self, target_length=64000):
+        self.target_length = target_length
+
+    def __call__(self, batch):
+        labels = torch.tensor([int(item[1]) for item in batch])
+        clips = [item[0] for item in batch]
+        if self.target_length is None:
+            waveforms, lengths = pad_and_stack([_to_float(c) for c in clips])
+            return waveforms, labels, lengths
+
+        waveforms = torch.zeros(len(clips), self.target_length)
+        for i, clip in enumerate(clips):
+            n = min(clip.shape[-1], self.target_length)
+            if clip.dtype == torch.int16:
+                torch.mul(clip[:n], 1.0 / INT16_SCALE, out=waveforms[i, :n])
+            else:
+                waveforms[i, :n] = clip[:n]
+        return waveforms, labels
+
+
+def _to_float(clip):
+    return clip.float() / INT16_SCALE if clip.dtype == torch.int16 else clip
+
+
+class PackedAudioDataset(Dataset):
+    """
+    Serves the clips of a pack written by `pack_manifest` as zero-copy int16
+    views of its memory-mapped shards, with no file opening or decoding per
+    item. Items are (int16 waveform, label); `collate_fn` converts them to the
+    float batches AudioManifestDataset produces (peak-normalized, then padded
+    or trimmed to `target_length`), up to int16 rounding.
+    """
+    def __init__(self, pack_dir, target_length=64000, manifest_path=None):
+        """
+        Args:
+            pack_dir (str): Directory written by pack_manifest.
+            target_length (int, optional): Fixed number of samples, or None.
+            manifest_path (str, optional): The manifest the pack was built
+                                           from, reported to the stage timer.
+        """
+        self.pack_dir = pack_dir
+        self.meta = read_pack_meta(pack_dir)
+        if self.meta is None:
+            raise FileNotFoundError(f"No complete audio pack in {pack_dir}.")
+        self.manifest_path = manifest_path or self.meta['manifest_path']
+        self.target_length = target_length
+        with np.load(os.path.join(pack_dir, 'index.npz')) as index:
+            self.shards, self.offsets = index['shards'], index['offsets']
+            self.lengths, self.labels = index['lengths'], index['labels']
+        self.collate_fn = PackedCollate(target_length)
+        self._shard_arrays = None
+
+    def __getstate__(self):
+        # Shards are mapped again by each process that uses the dataset
+        state = self.__dict__.copy()
+        state['_shard_arrays'] = None
+        return state
+
+    def _map_shards(self):
+        self._shard_arrays = []
+        for name in self.meta['shards']:
+            path = os.path.join(self.pack_dir, name)
+            if os.path.getsize(path) == 0:
+                # Only empty clips (an empty file cannot be mapped)
+                self._shard_arrays.append(np.zeros(0, dtype=np.int16))
+                continue
+            with open(path, 'rb') as f:
+                # Copy-on-write mapping: writable views for torch, pages shared until written
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            self._shard_arrays.append(np.frombuffer(mapping, dtype=np.int16))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def get_lengths(self):
+        """
+        Returns the processed length (in target-rate samples) of every row.
+        """
+        if self.target_length is not None:
+            return np.full(len(self), self.target_length, dtype=np.int64)
+        return self.lengths.copy()
+
+    def __getitem__(self, idx):
+        label = int(self.labels[idx])
+        if label == -1:
+            return torch.zeros(self.target_length or 1), -1
+        if self._shard_arrays is None:
+            self._map_shards()
+        offset, length = self.offsets[idx], self.lengths[idx]
+        if self.target_length is not None:
+            # Only the samples that survive trimming are viewed
+            length = min(length, self.target_length)
+        return torch.from_numpy(self._shard_arrays[self.shards[idx]][offset:offset + length]), label
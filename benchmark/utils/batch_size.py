@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import torch
+
+def is_out_of_memory(error):
+    """
+    Tells whether an exception raised by a forward pass is an out-of-memory
+    error, on CUDA or from the CPU allocator.
+    """
+    if isinstance(error, torch.cuda.OutOfMemoryError):
+        return True
+    message = str(error)
+    return isinstance(error, RuntimeError) and (
+        'out of memory' in message or "can't allocate memory" in message
+    )
+
+def default_memory_budget(device):
+    """
+    Returns a default memory budget in bytes: 90% of the device memory on
+    CUDA, 80% of the physical memory otherwise.
+    """
+    if device.type == 'cuda':
+        return int(0.9 * torch.cuda.get_device_properties(device).total_memory)
+    return int(0.8 * os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE'))
+
+def _reset_peak_rss():
+    # Resets VmHWM (Linux); returns False where the peak cannot be reset
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _peak_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def measure_peak_memory(fn, device):
+    """
+    Runs `fn()` and returns the peak memory in bytes while it ran: allocated
+    device memory on CUDA, resident set size of this process otherwise.
+    Raises the out-of-memory error if `fn` runs out of memory.
+    """
+    if device.type == 'cuda':
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        fn()
+        torch.cuda.synchronize(device)
+        return torch.cuda.max_memory_allocated(device)
+    _reset_peak_rss()
+    fn()
+    return _peak_rss()
+
+def _current_memory(device):
+    # Memory in use before a forward pass, the base its peak is measured against
+    if device.type == 'cuda':
+        return torch.cuda.memory_allocated(device)
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def probe_batch_size(score_fn, input_length, device, budget_bytes, max_batch_size=1024, min_batch_size=1):
+    """
+    Finds the largest batch size whose forward pass fits in `budget_bytes`.
+
+    The batch size grows geometrically from known-safe sizes: each step at
+    most doubles the last batch that fit, and is capped so that its predicted
+    peak stays within the budget, the memory a batch adds over the base being
+    assumed proportional to its size (measured at the last batch that fit,
+    where cached allocator pages only make the prediction more conservative).
+    The search stops at the first step that exceeds the budget or runs out of
+    memory, so no untested size far beyond a known-safe one is ever run (an
+    out-of-memory kill of the process on CPU cannot be caught).
+
+    Args:
+        score_fn (callable): Scores a (batch, input_length) tensor on `device`.
+        input_length (int): Samples per input waveform.
+        device (torch.device): The evaluation device.
+        budget_bytes (int): Peak memory allowed during a forward pass.
+        max_batch_size (int): Upper bound of the search.
+
+    Returns:
+        int: The batch size to use.
+    """
+    generator = torch.Generator().manual_seed(0)
+
+    def peak_at(batch_size):
+        x = torch.randn(batch_size, input_length, generator=generator)
+        x = (x / x.abs().amax(dim=1, keepdim=True)).to(device)
+        with torch.no_grad():
+            return measure_peak_memory(lambda: score_fn(x), device)
+
+    base = _current_memory(device)
+    safe = min_batch_size
+    peak = peak_at(safe)
+    if peak > budget_bytes:
+        return safe
+
+    while safe < max_batch_size:
+        per_item = max(peak - base, 1) / safe
+        candidate = min(2 * safe, max_batch_size, safe + int((budget_bytes - peak) / per_item))
+        if candidate <= safe:
+            break
+        try:
+            candidate_peak = peak_at(candidate)
+        except RuntimeError as e:
+            if not is_out_of_memory(e):
+                raise
+            if device.type == 'cuda':
+                torch.cuda.empty_cache()
+            break
+        if candidate_peak > budget_bytes:
+            break
+        safe, peak = candidate, candidate_peak
+    return safe
+
+
+class BatchSizeCache:
+    """
+    A small JSON file of probed batch sizes, keyed by model hash, input length,
+    host and memory budget, so only the first run on a host pays for probing.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def key(model_hash, input_length, device, budget_bytes):
+        host = socket.gethostname()
+        return f"{model_hash}|{input_length}|{host}|{device.type}|{budget_bytes >> 20}MB"
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, key):
+        return self._read().get(key)
+
+    def put(self, key, batch_size):
+        entries = self._read()
+        entries[key] = int(batch_size)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def model_hash(*parts):
+    """
+    Combines model identifiers (checkpoint hashes, precision, ...) into one digest.
+    """
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,121 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+# Upper bound on resampled indices drawn at once (replicates x clips)
+BLOCK_ELEMENTS = 1 << 23
+
+
+class _RankedScores:
+    """
+    The class-wise positions of a dataset's scores among its distinct values,
+    computed once and shared by every replicate.
+    """
+    def __init__(self, labels, scores):
+        labels = np.asarray(labels).reshape(-1)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        distinct, groups = np.unique(scores, return_inverse=True)
+        self.num_groups = len(distinct)
+        self.spoof_groups = groups[labels == 1]
+        self.bonafide_groups = groups[labels != 1]
+
+    def resampled_counts(self, class_groups, num_replicates, rng):
+        # (replicates, groups) counts of one class, resampled with replacement
+        n = len(class_groups)
+        draws = class_groups[rng.integers(0, n, size=(num_replicates, n))]
+        draws += (np.arange(num_replicates) * self.num_groups)[:, None]
+        return np.bincount(draws.ravel(), minlength=num_replicates * self.num_groups).reshape(
+            num_replicates, self.num_groups)
+
+
+def replicate_metrics(spoof_counts, bonafide_counts):
+    """
+    EER and AUC of many replicates at once, from per-replicate counts of each
+    class at every distinct score (ascending), with the same definitions as
+    MetricEngine: the interpolated FPR/FNR crossing and the trapezoidal AUC.
+
+    Returns:
+        tuple: (eer, auc) arrays, one entry per replicate.
+    """
+    spoof = spoof_counts.astype(np.float64)
+    bonafide = bonafide_counts.astype(np.float64)
+    num_spoof = spoof.sum(axis=1, keepdims=True)
+    num_bonafide = bonafide.sum(axis=1, keepdims=True)
+
+    # Spoof clips above bonafide ones, ties counting half
+    bonafide_below = np.cumsum(bonafide, axis=1) - bonafide
+    auc = (spoof * (bonafide_below + 0.5 * bonafide)).sum(axis=1) / (num_spoof[:, 0] * num_bonafide[:, 0])
+
+    # Rates with the threshold at each distinct score, and above the last one
+    zeros = np.zeros((len(spoof), 1))
+    fnr = np.concatenate([zeros, np.cumsum(spoof, axis=1)], axis=1) / num_spoof
+    fpr = 1.0 - np.concatenate([zeros, np.cumsum(bonafide, axis=1)], axis=1) / num_bonafide
+    gap = fnr - fpr
+    k = np.argmax(gap >= 0, axis=1)
+    rows = np.arange(len(spoof))
+    gap_a, gap_b = gap[rows, k - 1], gap[rows, k]
+    span = gap_b - gap_a
+    t = np.divide(-gap_a, span, out=np.ones_like(span), where=span > 0)
+    eer = fpr[rows, k - 1] + t * (fpr[rows, k] - fpr[rows, k - 1])
+    return eer, auc
+
+
+def _bootstrap_chunk(ranked, num_replicates, seed_sequence):
+    rng = np.random.default_rng(seed_sequence)
+    n = len(ranked.spoof_groups) + len(ranked.bonafide_groups)
+    block = max(1, BLOCK_ELEMENTS // n)
+    eers, aucs = [], []
+    for start in range(0, num_replicates, block):
+        size = min(block, num_replicates - start)
+        spoof = ranked.resampled_counts(ranked.spoof_groups, size, rng)
+        bonafide = ranked.resampled_counts(ranked.bonafide_groups, size, rng)
+        eer, auc = replicate_metrics(spoof, bonafide)
+        eers.append(eer)
+        aucs.append(auc)
+    return np.concatenate(eers), np.concatenate(aucs)
+
+
+def bootstrap_ci(labels, scores, num_replicates=1000, confidence=0.95, seed=0, num_workers=0,
+                 chunk_replicates=100):
+    """
+    Percentile bootstrap confidence intervals of the EER and AUC.
+
+    Clips are resampled with replacement within each class, so every replicate
+    keeps the class sizes. Scores are ranked once; each block of replicates is
+    drawn as an index matrix and reduced to per-replicate counts at each
+    distinct score, from which all replicate metrics are computed at once.
+    Replicates are split into fixed chunks with their own seeds, so results
+    do not depend on `num_workers`.
+
+    Args:
+        labels, scores: As for calculate_metrics.
+        num_replicates (int): Number of bootstrap replicates.
+        confidence (float): Coverage of the intervals.
+        seed (int): Seed of the resampling.
+        num_workers (int): Processes sharing the chunks (0 or 1 = this process).
+        chunk_replicates (int): Replicates per chunk.
+
+    Returns:
+        dict: {'eer_ci': [low, high], 'auc_ci': [low, high]}, or None for a
+              single-class dataset.
+    """
+    ranked = _RankedScores(labels, scores)
+    if len(ranked.spoof_groups) == 0 or len(ranked.bonafide_groups) == 0:
+        return None
+
+    sizes = [min(chunk_replicates, num_replicates - start) for start in range(0, num_replicates, chunk_replicates)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if num_workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=min(num_workers, len(sizes)),
+                                 mp_context=mp.get_context('spawn')) as pool:
+            results = list(pool.map(_bootstrap_chunk, [ranked] * len(sizes), sizes, seeds))
+    else:
+        results = [_bootstrap_chunk(ranked, size, s) for size, s in zip(sizes, seeds)]
+
+    eer = np.concatenate([r[0] for r in results])
+    auc = np.concatenate([r[1] for r in results])
+    tail = 100 * (1 - confidence) / 2
+    return {
+        'eer_ci': [float(v) for v in np.percentile(eer, [tail, 100 - tail])],
+        'auc_ci': [float(v) for v in np.percentile(auc, [tail, 100 - tail])],
+    }
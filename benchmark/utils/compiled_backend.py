@@ -0,0 +1,98 @@
+import copy
+import hashlib
+import os
+import tempfile
+import torch
+
+from benchmark.utils.precision import find_backbone
+
+BACKEND_COMPILE_MODES = ('script',)
+
+class TracedBackend:
+    """
+    Serves a model's `forward_backend` from TorchScript graphs traced once per
+    input shape and cached on disk.
+
+    A traced graph is only valid for the per-utterance input shape (frames,
+    dim) it was traced with, since graph pooling sizes are derived from it; the
+    batch dimension stays dynamic. Artifacts are keyed by the checkpoint hash,
+    that shape and the torch version, so later runs load them instead of
+    tracing again. Tracing excludes the SSL front-end, keeping artifacts small.
+    """
+    def __init__(self, model, cache_dir, checkpoint_hash):
+        """
+        Args:
+            model (nn.Module): The raw model exposing `forward_backend`, in eval mode.
+            cache_dir (str): Directory holding the traced artifacts.
+            checkpoint_hash (str): Digest identifying the weights (and any
+                                   precision variant) of `model`.
+        """
+        # A shallow copy that shares every back-end submodule but not the front-end
+        self.backend = copy.copy(model)
+        self.backend._modules = {k: v for k, v in model._modules.items() if k != 'ssl_model'}
+        self.cache_dir = cache_dir
+        self.checkpoint_hash = checkpoint_hash
+        self._traced = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def artifact_path(self, shape):
+        key = f"{self.checkpoint_hash}|{tuple(shape)}|{torch.__version__}"
+        return os.path.join(self.cache_dir, f"backend_{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pt")
+
+    def __call__(self, x_ssl_feat):
+        shape = tuple(x_ssl_feat.shape[1:])
+        if shape not in self._traced:
+            self._traced[shape] = self._load_or_trace(x_ssl_feat, shape)
+        return self._traced[shape].forward_backend(x_ssl_feat)
+
+    def _load_or_trace(self, example, shape):
+        path = self.artifact_path(shape)
+        if os.path.exists(path):
+            try:
+                return torch.jit.load(path, map_location=example.device)
+            except RuntimeError as e:
+                print(f"Warning: could not load traced back-end {path} ({e}). Tracing again.")
+
+        print(f"Tracing back-end for input shape {shape}...")
+        with torch.no_grad():
+            traced = torch.jit.trace_module(self.backend, {'forward_backend': example}, check_trace=False)
+
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            torch.jit.save(traced, tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, RuntimeError) as e:
+            print(f"Warning: could not save traced back-end to {path}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return traced
+
+
+def compile_backend(detector, mode, cache_dir, checkpoint_hash):
+    """
+    Replaces the back-end of a detector's raw model (from `LL` onward, i.e.
+    `forward_backend`) with a compiled version. The front-end stays eager.
+
+    torch.compile (inductor) is not offered: it crashed in native code while
+    compiling this back-end on CPU.
+
+    Args:
+        detector (nn.Module): The detector; wrappers are unwrapped down to the
+                              model exposing `forward_backend`.
+        mode (str): 'script' traces TorchScript graphs cached as artifacts in
+                    `cache_dir`.
+        cache_dir (str): Root directory of compiled artifacts.
+        checkpoint_hash (str): Digest identifying the model weights.
+    """
+    if mode not in BACKEND_COMPILE_MODES:
+        raise ValueError(f"Unknown backend_compile mode '{mode}'. Expected one of {BACKEND_COMPILE_MODES}.")
+    backbone = find_backbone(detector)
+    if not hasattr(backbone, 'forward_backend'):
+        raise ValueError(
+            f"Model '{type(backbone).__name__}' does not expose forward_backend; its back-end cannot be compiled."
+        )
+
+    backbone.forward_backend = TracedBackend(backbone, os.path.join(cache_dir, 'torchscript'), checkpoint_hash)
+    return detector
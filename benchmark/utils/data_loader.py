@@ -1,15 +1,22 @@
 import torch
-import pandas as pd
+import numpy as np
 import torchaudio
-from torch.utils.data import Dataset
-from .audio_preprocessing import WaveformProcessor
+from torch.utils.data import Dataset, Sampler
+from .audio_preprocessing import WaveformProcessor, pad_collate
+from .waveform_cache import WaveformCache
+from .stage_timer import STAGE_TIMER
+from .manifest import load_manifest
+from .audio_shards import PackedAudioDataset, PackedCollate, pack_dir_for, read_pack_meta
+from .score_journal import file_sha1
 
 class AudioManifestDataset(Dataset):
     """
     A PyTorch Dataset for loading and preprocessing audio from a manifest file.
-    Assumes a CSV with 'audio_path' and 'label' columns.
+    Assumes a CSV with 'audio_path' and 'label' columns (and optionally
+    'duration'); only these are read, into a CompactManifest.
     """
-    def __init__(self, manifest_path, target_sample_rate=16000, target_length=64000):
+    def __init__(self, manifest_path, target_sample_rate=16000, target_length=64000, cache_dir=None,
+                 manifest_cache=True):
         """
         Initializes the dataset.
 
@@ -19,31 +26,154 @@ class AudioManifestDataset(Dataset):
             target_length (int, optional): The fixed number of samples for all
                                           waveforms. If None, no padding or
                                           trimming is performed.
+            cache_dir (str, optional): If given, processed waveforms are read from
+                                       and written to a persistent cache here.
+            manifest_cache (bool): If True, the parsed manifest is cached in a
+                                   binary file next to the CSV.
         """
-        # Specify dtype for column 4 to prevent DtypeWarning
-        self.df = pd.read_csv(manifest_path, dtype={4: str})
-        self.df['label'] = self.df['label'].apply(lambda x: 0 if x == 'bonafide' else 1)
+        self.manifest_path = manifest_path
+        self.manifest = load_manifest(manifest_path, use_cache=manifest_cache)
         # Instantiate the waveform processor with the target length
         self.processor = WaveformProcessor(
             target_sample_rate=target_sample_rate,
             target_length=target_length
         )
-        
+        self.cache = None
+        if cache_dir is not None:
+            self.cache = WaveformCache(
+                cache_dir,
+                target_sample_rate=target_sample_rate,
+                target_length=target_length
+            )
+
+        # Batch-level processing hook for the DataLoader (None = default collate)
+        self.collate_fn = None
+        if target_length is None:
+            # Variable-length items are padded per batch and returned with lengths
+            self.collate_fn = pad_collate
+
     def __len__(self):
-        return len(self.df)
+        return len(self.manifest)
+
+    def get_lengths(self):
+        """
+        Returns the expected processed length (in target-rate samples) of every row.
+
+        With a fixed target_length every row has that length. Otherwise lengths
+        come from the manifest's 'duration' column (seconds) when present, and
+        from the audio file headers for rows without a usable duration.
+
+        Returns:
+            np.ndarray: int64 array of lengths, one per manifest row.
+        """
+        if self.processor.target_length is not None:
+            return np.full(len(self.manifest), self.processor.target_length, dtype=np.int64)
+
+        durations = self.manifest.durations.astype(np.float64)
+
+        missing = np.flatnonzero(np.isnan(durations))
+        if len(missing) > 0:
+            print(f"Reading headers of {len(missing)} files without a 'duration' entry...")
+        for i in missing:
+            try:
+                info = torchaudio.info(self.manifest.audio_path(i))
+                durations[i] = info.num_frames / info.sample_rate
+            except Exception:
+                durations[i] = 0.0
+
+        return np.ceil(durations * self.processor.target_sample_rate).astype(np.int64)
 
     def __getitem__(self, idx):
-        row = self.df.iloc[idx]
-        audio_path = row['audio_path']
-        label = row['label']
-        
+        audio_path = self.manifest.audio_path(idx)
+        label = int(self.manifest.labels[idx])
+        STAGE_TIMER.scope = self.manifest_path
+
         try:
-            waveform, sample_rate = torchaudio.load(audio_path)
+            if self.cache is not None:
+                cached_waveform = self.cache.load(audio_path)
+                if cached_waveform is not None:
+                    return cached_waveform, label
+
+            # File read and decode, timed together exactly as they run untimed
+            with STAGE_TIMER.stage('load'):
+                waveform, sample_rate = torchaudio.load(audio_path)
             processed_waveform = self.processor(waveform, sample_rate)
+
+            if self.cache is not None:
+                self.cache.store(audio_path, processed_waveform)
             return processed_waveform, label
         
         except Exception as e:
             print(f"Error loading or processing file {audio_path}: {e}")
             # Return a dummy tensor with the correct shape on error
-            dummy_waveform = torch.zeros(self.processor.target_length)
+            dummy_waveform = torch.zeros(self.processor.target_length or 1)
             return dummy_waveform, -1
+
+
+class DurationBucketBatchSampler(Sampler):
+    """
+    A batch sampler that groups clips of similar length and caps each batch by
+    its padded size (batch items x longest item, in samples) instead of by item
+    count. Rows are visited in ascending length order, so padding within a batch
+    stays small when evaluating full-length utterances.
+    """
+    def __init__(self, lengths, max_batch_samples, rows=None, max_batch_size=None):
+        """
+        Args:
+            lengths (array-like): Expected length in samples of every dataset row.
+            max_batch_samples (int): Upper bound on padded samples per batch. A
+                                     single clip longer than this forms its own batch.
+            rows (list[int], optional): Subset of rows to batch. Defaults to all rows.
+            max_batch_size (int, optional): Upper bound on items per batch.
+        """
+        lengths = np.asarray(lengths)
+        rows = np.arange(len(lengths)) if rows is None else np.asarray(rows, dtype=np.int64)
+        order = rows[np.argsort(lengths[rows], kind='stable')]
+
+        self.batches = []
+        batch = []
+        for row in order:
+            row_len = max(int(lengths[row]), 1)
+            # Sorted ascending, so the new row is the longest in the batch
+            full = max_batch_size is not None and len(batch) >= max_batch_size
+            if batch and (full or (len(batch) + 1) * row_len > max_batch_samples):
+                self.batches.append(batch)
+                batch = []
+            batch.append(int(row))
+        if batch:
+            self.batches.append(batch)
+
+    def __iter__(self):
+        return iter(self.batches)
+
+    def __len__(self):
+        return len(self.batches)
+
+
+def open_audio_dataset(manifest_path, packed_dir=None, **data_args):
+    """
+    Opens the dataset of a manifest: its pack under `packed_dir` (see
+    benchmark/pack_audio.py) when one was built from this manifest at the
+    target rate, else an AudioManifestDataset with `data_args`.
+
+    With `packed_dir`, every dataset gets a PackedCollate, so manifests with
+    and without a pack can share one DataLoader; cache_dir does not apply
+    then.
+    """
+    if packed_dir is None:
+        return AudioManifestDataset(manifest_path, **data_args)
+
+    target_sample_rate = data_args.get('target_sample_rate', 16000)
+    target_length = data_args.get('target_length', 64000)
+    pack_dir = pack_dir_for(packed_dir, manifest_path)
+    meta = read_pack_meta(pack_dir)
+    if meta is not None and meta['target_sample_rate'] == target_sample_rate \
+            and meta['manifest_sha1'] == file_sha1(manifest_path):
+        return PackedAudioDataset(pack_dir, target_length=target_length, manifest_path=manifest_path)
+
+    reason = "none was built" if meta is None else "it is stale or at another sample rate"
+    print(f"Warning: no usable pack for {manifest_path} in {packed_dir} ({reason}); decoding the files instead.")
+    dataset = AudioManifestDataset(manifest_path, target_sample_rate=target_sample_rate, target_length=target_length,
+                                   manifest_cache=data_args.get('manifest_cache', True))
+    dataset.collate_fn = PackedCollate(target_length)
+    return dataset
@@ -0,0 +1,240 @@
+import glob
+import hashlib
+import mmap
+import os
+import socket
+import uuid
+import zlib
+import numpy as np
+import torch
+
+def hash_module_weights(module):
+    """
+    Computes a SHA-1 digest over the names, shapes, dtypes and values of all
+    tensors in a module's state dict. Two checkpoints that share the same
+    front-end weights produce the same digest.
+    """
+    digest = hashlib.sha1()
+    for name, tensor in sorted(module.state_dict().items()):
+        array = tensor.detach().cpu().contiguous()
+        digest.update(name.encode('utf-8'))
+        digest.update(str(tuple(array.shape)).encode('utf-8'))
+        digest.update(str(array.dtype).encode('utf-8'))
+        digest.update(array.reshape(-1).view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    An on-disk store of SSL front-end embeddings, held in memory-mapped shard
+    files.
+
+    Each writing process appends embeddings to a shard file of its own and,
+    once an entry's bytes are written, records it (key, offset, size, shape,
+    encoding) in the shard's index file, as the WaveformCache does for
+    waveforms. Readers map every shard once: uncompressed entries are served
+    as copy-on-write views of the mapping, zlib-compressed ones are inflated
+    on load. A store is thus a few large files instead of one file per
+    utterance, and is safe to share between concurrent runs.
+
+    Entries live under a directory named after the front-end weights hash and
+    the on-disk dtype, so any checkpoint or back-end variant sharing the same
+    front-end reuses them. Utterances are keyed by a hash of the exact input
+    waveform, which already reflects the decoding and preprocessing
+    arguments. Embeddings are stored in float32 by default, so the store never
+    changes scores; float16 halves the footprint at the cost of rounding, and
+    zlib compression (lossless) shrinks it further at the cost of inflating
+    every entry on load instead of mapping it.
+    """
+    COMPRESSIONS = (None, 'zlib')
+
+    def __init__(self, store_dir, frontend_hash, dtype='float32', compression=None, shard_bytes=1 << 30):
+        """
+        Args:
+            store_dir (str): Root directory of the feature store.
+            frontend_hash (str): Digest of the front-end weights (see hash_module_weights).
+            dtype (str): NumPy dtype used on disk ('float16' or 'float32').
+            compression (str, optional): None to store entries as raw arrays,
+                                         or 'zlib' to compress new entries.
+                                         Entries of either kind are read.
+            shard_bytes (int): Size after which a writer starts a new shard.
+        """
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unknown feature store compression '{compression}'. "
+                             f"Choose from {list(self.COMPRESSIONS)}.")
+        self.dtype = np.dtype(dtype)
+        # Entries of each on-disk precision are kept apart
+        self.root = os.path.join(store_dir, frontend_hash[:16], self.dtype.name)
+        self.torch_dtype = getattr(torch, dtype)
+        self.compression = compression
+        self.shard_bytes = shard_bytes
+        os.makedirs(self.root, exist_ok=True)
+        self._entries = None
+        self._writer = None
+
+    @staticmethod
+    def utterance_key(waveform):
+        """
+        Hashes a single preprocessed input waveform.
+        """
+        array = waveform.detach().cpu().contiguous().float().numpy()
+        return hashlib.sha1(array.tobytes()).hexdigest()
+
+    def _map_shards(self):
+        # Maps the shards present now; entries written later are seen by the next run
+        self._entries = {}
+        for index_path in sorted(glob.glob(os.path.join(self.root, '*.idx'))):
+            shard_path = index_path[:-len('.idx')] + '.bin'
+            try:
+                with open(index_path, 'r') as f:
+                    lines = f.readlines()
+                size = os.path.getsize(shard_path)
+            except OSError:
+                continue
+            if size == 0:
+                continue
+            with open(shard_path, 'rb') as f:
+                # Copy-on-write mapping: writable views for torch, pages shared until written
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            for line in lines:
+                parts = line.split()
+                if len(parts) != 6 or not line.endswith('\n') or parts[5] not in ('raw', 'zlib'):
+                    continue
+                offset, nbytes, frames, dim = (int(v) for v in parts[1:5])
+                if offset + nbytes <= size:
+                    self._entries[parts[0]] = (buffer, offset, nbytes, (frames, dim), parts[5])
+
+    def load(self, key):
+        """
+        Returns the stored embedding of shape (frames, dim) for `key`, or None.
+        Uncompressed float32 entries are returned as views of the mapped shard.
+        """
+        if self._entries is None:
+            self._map_shards()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        buffer, offset, nbytes, shape, encoding = entry
+        if encoding == 'zlib':
+            array = np.frombuffer(bytearray(zlib.decompress(buffer[offset:offset + nbytes])), dtype=self.dtype)
+        else:
+            array = np.frombuffer(buffer, dtype=self.dtype, count=nbytes // self.dtype.itemsize, offset=offset)
+        array = array.reshape(shape)
+        if array.dtype != np.float32:
+            array = array.astype(np.float32)
+        return torch.from_numpy(array)
+
+    def __getstate__(self):
+        # Shards are mapped, and written, separately by each process
+        state = self.__dict__.copy()
+        state['_entries'] = None
+        state['_writer'] = None
+        return state
+
+    def _open_writer(self):
+        self._close_writer()
+        name = f"shard-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        shard_file = open(os.path.join(self.root, f"{name}.bin"), 'ab')
+        index_file = open(os.path.join(self.root, f"{name}.idx"), 'a')
+        self._writer = {'pid': os.getpid(), 'shard': shard_file, 'index': index_file, 'offset': 0}
+
+    def _close_writer(self):
+        # A writer inherited from another process is left to that process
+        if self._writer is not None and self._writer['pid'] == os.getpid():
+            self._writer['shard'].close()
+            self._writer['index'].close()
+        self._writer = None
+
+    def store(self, key, features):
+        """
+        Appends one utterance embedding of shape (frames, dim) to this
+        process's shard. Failures are reported but never propagated.
+        """
+        try:
+            array = np.ascontiguousarray(features.detach().float().cpu().numpy().astype(self.dtype))
+            data = array.tobytes()
+            if self.compression == 'zlib':
+                data = zlib.compress(data, 1)
+            if self._writer is None or self._writer['pid'] != os.getpid() \
+                    or self._writer['offset'] >= self.shard_bytes:
+                self._open_writer()
+            # Entries start 8-byte aligned, so raw ones map to aligned views
+            padding = -len(data) % 8
+            self._writer['shard'].write(data + b'\0' * padding)
+            self._writer['shard'].flush()
+            # The index line is written after the data, so it never points past it
+            encoding = self.compression or 'raw'
+            self._writer['index'].write(
+                f"{key} {self._writer['offset']} {len(data)} {array.shape[0]} {array.shape[1]} {encoding}\n")
+            self._writer['index'].flush()
+            self._writer['offset'] += len(data) + padding
+        except OSError as e:
+            print(f"Warning: could not write feature store entry {key}: {e}")
+            # The shard may end in a partial entry; later entries go to a new one
+            try:
+                self._close_writer()
+            except OSError:
+                self._writer = None
+
+
+class FeatureCachedDetector(torch.nn.Module):
+    """
+    Wraps an AudioDeepfakeDetector and serves SSL front-end embeddings from a
+    FeatureStore. The (possibly nested) raw model must expose `ssl_model`,
+    `extract_frontend` and `forward_backend`. Only utterances missing from the
+    store go through the front-end; the back-end always runs, so back-end
+    ablations re-evaluate in minutes.
+    """
+    def __init__(self, detector, store_dir, dtype='float32', compression=None, variant=None):
+        """
+        Args:
+            detector (AudioDeepfakeDetector): The wrapped detector.
+            store_dir (str): Root directory of the feature store.
+            dtype (str): On-disk precision of the stored embeddings.
+            compression (str, optional): Compression of new entries (None or 'zlib').
+            variant (str, optional): Tag of a front-end variant computed from
+                                     the same weights (e.g. a reduced
+                                     inference precision), stored separately.
+        """
+        super().__init__()
+        # Unwrap detector wrappers down to the model that splits front-end/back-end
+        self.wrappers = []
+        backbone = detector
+        while not hasattr(backbone, 'forward_backend') and hasattr(backbone, 'model'):
+            self.wrappers.append(backbone)
+            backbone = backbone.model
+        if not all(hasattr(backbone, attr) for attr in ('ssl_model', 'extract_frontend', 'forward_backend')):
+            raise ValueError(
+                f"Model '{type(backbone).__name__}' does not expose ssl_model/extract_frontend/forward_backend; "
+                "the feature store cannot be used with it."
+            )
+        self.detector = detector
+        self.backbone = backbone
+
+        frontend_hash = hash_module_weights(backbone.ssl_model)
+        if variant:
+            frontend_hash = hashlib.sha1(f"{frontend_hash}:{variant}".encode('utf-8')).hexdigest()
+        print(f"Using feature store at '{store_dir}' (front-end hash {frontend_hash[:16]})")
+        self.store = FeatureStore(store_dir, frontend_hash, dtype=dtype, compression=compression)
+
+    def get_prediction_score(self, x):
+        keys = [FeatureStore.utterance_key(w) for w in x]
+        features = [self.store.load(k) for k in keys]
+
+        missing = [i for i, f in enumerate(features) if f is None]
+        if missing:
+            computed = self.backbone.extract_frontend(x[missing])
+            for i, feat in zip(missing, computed):
+                self.store.store(keys[i], feat)
+                # Round through the storage dtype so scores match later cached runs
+                features[i] = feat.to(self.store.torch_dtype)
+
+        features = torch.stack([f.to(x.device, dtype=torch.float32) for f in features])
+        output = self.backbone.forward_backend(features)
+        # Apply each wrapper's output reduction, innermost first
+        for wrapper in reversed(self.wrappers):
+            output = wrapper.output_to_score(output)
+        return output
+
+    def forward(self, x):
+        return self.get_prediction_score(x)
@@ -0,0 +1,212 @@
+import json
+import mmap
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv_csv
+from .score_journal import file_sha1
+
+CACHE_MAGIC = b'AUDDTMF1'
+CACHE_VERSION = 1
+# Array offsets in the cache file are multiples of this
+ALIGNMENT = 64
+
+
+def manifest_cache_path(manifest_path):
+    """
+    Returns the path of the compiled cache kept next to a manifest CSV.
+    """
+    return f"{manifest_path}.cache.bin"
+
+
+class CompactManifest:
+    """
+    The columns of a manifest CSV needed for evaluation, as flat NumPy arrays.
+
+    Audio paths are stored as one UTF-8 byte buffer with an int64 offset table
+    (path i is `path_bytes[path_offsets[i]:path_offsets[i + 1]]`), labels as
+    int8 (0 bonafide, 1 anything else) and durations as float64 seconds (NaN
+    where missing). No other column is read, so manifests carrying many
+    metadata columns cost no more than their paths.
+
+    Loaded from its cache file, the arrays are read-only memory maps of it:
+    every process using the manifest (DataLoader workers, CPU replicas) shares
+    the same page-cache pages, which no Python refcount ever writes to, and a
+    pickled manifest re-maps the file instead of carrying a copy.
+    """
+    def __init__(self, path_bytes, path_offsets, labels, durations, source=None):
+        self.path_bytes = path_bytes
+        self.path_offsets = path_offsets
+        self.labels = labels
+        self.durations = durations
+        # (cache_path, header, data_start) when the arrays map a cache file
+        self.source = source
+
+    def __getstate__(self):
+        if self.source is not None:
+            return {'source': self.source}
+        return dict(self.arrays(), source=None)
+
+    def __setstate__(self, state):
+        if state['source'] is None:
+            self.__init__(**state)
+            return
+        cache_path, header, data_start = state['source']
+        cached = CompactManifest.read_header(cache_path)
+        if cached is None or cached[0] != header:
+            raise RuntimeError(f"The manifest cache {cache_path} changed while in use; restart the evaluation.")
+        self.__init__(**CompactManifest.map_arrays(cache_path, header, data_start), source=state['source'])
+
+    def __len__(self):
+        return len(self.labels)
+
+    def audio_path(self, idx):
+        start, end = self.path_offsets[idx], self.path_offsets[idx + 1]
+        return self.path_bytes[start:end].tobytes().decode('utf-8')
+
+    def audio_paths(self):
+        """
+        Returns every audio path as a list of str.
+        """
+        return [self.audio_path(i) for i in range(len(self))]
+
+    @classmethod
+    def from_csv(cls, manifest_path):
+        # pyarrow parses in parallel and yields the path column already as a
+        # byte buffer with an offset table
+        header = pd.read_csv(manifest_path, nrows=0).columns
+        for column in ('audio_path', 'label'):
+            if column not in header:
+                raise KeyError(f"Manifest {manifest_path} has no '{column}' column.")
+        columns = [c for c in ('audio_path', 'label', 'duration') if c in header]
+        table = pv_csv.read_csv(manifest_path, convert_options=pv_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={'audio_path': pa.large_string(), 'label': pa.string(), 'duration': pa.string()},
+        ))
+
+        paths = table['audio_path'].combine_chunks()
+        offsets = np.frombuffer(paths.buffers()[1], dtype=np.int64)[paths.offset:paths.offset + len(paths) + 1]
+        path_bytes = np.frombuffer(paths.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]].copy()
+        path_offsets = offsets - offsets[0]
+        labels = (table['label'].to_numpy(zero_copy_only=False) != 'bonafide').astype(np.int8)
+        if 'duration' in columns:
+            durations = pd.to_numeric(table['duration'].to_pandas(), errors='coerce').to_numpy(dtype=np.float64)
+        else:
+            durations = np.full(len(labels), np.nan)
+        return cls(path_bytes, path_offsets, labels, durations)
+
+    def arrays(self):
+        return {'path_bytes': self.path_bytes, 'path_offsets': self.path_offsets,
+                'labels': self.labels, 'durations': self.durations}
+
+    def save(self, cache_path, source):
+        """
+        Writes the arrays to a binary cache: a magic string, a length-prefixed
+        JSON header (source identity and array layout), then each array at an
+        aligned offset. Written to a temporary file and renamed into place.
+        """
+        layout, offset = {}, 0
+        for name, array in self.arrays().items():
+            layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        header = json.dumps({'version': CACHE_VERSION, 'source': source, 'arrays': layout}).encode('utf-8')
+        data_start = -(-(len(CACHE_MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(CACHE_MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for name, array in self.arrays().items():
+                f.seek(data_start + layout[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+        os.replace(tmp_path, cache_path)
+
+    @staticmethod
+    def read_header(cache_path):
+        """
+        Returns (header dict, data start offset) of a cache file, or None if it
+        is missing or not a cache of this version.
+        """
+        try:
+            with open(cache_path, 'rb') as f:
+                if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                    return None
+                header_length = int.from_bytes(f.read(8), 'little')
+                header = json.loads(f.read(header_length).decode('utf-8'))
+        except (OSError, ValueError):
+            return None
+        if header.get('version') != CACHE_VERSION:
+            return None
+        data_start = -(-(len(CACHE_MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+        return header, data_start
+
+    @staticmethod
+    def map_arrays(cache_path, header, data_start):
+        # Plain read-only ndarrays over one mapping of the file (np.memmap
+        # slices are slower to index)
+        with open(cache_path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+            arrays[name] = np.frombuffer(mapping, dtype=dtype, count=int(np.prod(shape)),
+                                         offset=data_start + spec['offset']).reshape(shape)
+        return arrays
+
+    @classmethod
+    def load(cls, cache_path, header, data_start):
+        return cls(**cls.map_arrays(cache_path, header, data_start), source=(cache_path, header, data_start))
+
+
+def _source_identity(manifest_path):
+    stat = os.stat(manifest_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_manifest(manifest_path, use_cache=True):
+    """
+    Loads a manifest CSV as a CompactManifest, through its binary cache.
+
+    The cache is valid while the CSV keeps the size and modification time it
+    was compiled from; when only the time changed (e.g. the file was copied),
+    the CSV's SHA-1 is compared instead and the cache kept if it matches. A
+    stale or missing cache is rebuilt; a cache that cannot be written (e.g. a
+    read-only dataset directory) is skipped with a warning.
+
+    Args:
+        manifest_path (str): Path to the manifest CSV.
+        use_cache (bool): If False, always parse the CSV and write no cache.
+
+    Returns:
+        CompactManifest: The manifest.
+    """
+    if not use_cache:
+        return CompactManifest.from_csv(manifest_path)
+
+    cache_path = manifest_cache_path(manifest_path)
+    source = _source_identity(manifest_path)
+    cached = CompactManifest.read_header(cache_path)
+    if cached is not None:
+        header, data_start = cached
+        cached_source = header['source']
+        if cached_source.get('size') == source['size'] and cached_source.get('mtime_ns') == source['mtime_ns']:
+            return CompactManifest.load(cache_path, header, data_start)
+        if cached_source.get('size') == source['size'] and cached_source.get('sha1') == file_sha1(manifest_path):
+            manifest = CompactManifest(**CompactManifest.map_arrays(cache_path, header, data_start))
+            return _write_cache(manifest, cache_path, dict(cached_source, **source))
+
+    manifest = CompactManifest.from_csv(manifest_path)
+    return _write_cache(manifest, cache_path, dict(source, sha1=file_sha1(manifest_path)))
+
+
+def _write_cache(manifest, cache_path, source):
+    # Returns the manifest mapped from the new cache, or kept in memory if it cannot be written
+    try:
+        manifest.save(cache_path, source)
+    except OSError as e:
+        print(f"Warning: could not write the manifest cache {cache_path} ({e}); it will be parsed again next time.")
+        return manifest
+    header, data_start = CompactManifest.read_header(cache_path)
+    return CompactManifest.load(cache_path, header, data_start)
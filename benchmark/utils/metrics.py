@@ -1,15 +1,21 @@
+import functools
 import numpy as np
-from sklearn.metrics import roc_curve, roc_auc_score, confusion_matrix
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
 
-def calculate_metrics(labels, scores):
+def calculate_metrics(labels, scores, operating_points=None):
     """
-    Calculates EER, Accuracy, TPR, TNR, and AUC.
+    Calculates EER (with its threshold), Accuracy, TPR, TNR, and AUC.
     
-    For datasets with only one class, returns metrics that can still be computed.
+    For datasets with only one class, returns metrics that can still be
+    computed; for an empty dataset, every metric is -1 (accuracy 0).
     
     Args:
         labels (list or np.array): True labels (0 for bonafide, 1 for spoof).
         scores (list or np.array): Raw prediction scores from the model.
+        operating_points (dict, optional): {'fpr_targets': [...], 'fnr_targets': [...]};
+            adds the lowest FNR at each target FPR and the lowest FPR at each
+            target FNR (see operating_point_metrics).
         
     Returns:
         dict: A dictionary containing all calculated metrics.
@@ -17,6 +23,15 @@ def calculate_metrics(labels, scores):
     labels = np.array(labels)
     scores = np.array(scores)
 
+    # A dataset whose clips were all excluded or failed to load
+    if len(labels) == 0:
+        print("Warning: No clips were scored. No metrics can be computed.")
+        return {
+            'eer': -1, 'auc': -1, 'accuracy': 0.0, 'tpr': -1, 'tnr': -1,
+            'precision': -1, 'f1': -1, 'tp': -1, 'tn': -1, 'fp': -1, 'fn': -1,
+            **operating_point_metrics(operating_points),
+        }
+
     # Check for single-class datasets
     unique_labels = np.unique(labels)
     if len(unique_labels) < 2:
@@ -49,22 +64,48 @@ def calculate_metrics(labels, scores):
             'tn': -1,
             'fp': -1,
             'fn': -1,
+            **operating_point_metrics(operating_points),
         }
 
-    # EER and AUC Calculation
-    fpr, tpr, thresholds = roc_curve(labels, scores, pos_label=1)
-    fnr = 1 - tpr
-    eer_index = np.nanargmin(np.abs(fnr - fpr))
-    eer_threshold = thresholds[eer_index]
-    eer = fpr[eer_index]
-    auc = roc_auc_score(labels, scores)
+    # One sort of the scores gives EER, AUC, the confusion counts at 0.5 and the operating points
+    engine = MetricEngine(labels, scores)
+    eer, eer_threshold = engine.eer()
+    (tp,), (tn,), (fp,), (fn,) = engine.confusion([0.5])
+    metrics = {'eer': eer, 'auc': engine.auc(), 'eer_threshold': eer_threshold,
+               **confusion_metrics(tp, tn, fp, fn)}
+    if operating_points:
+        rates = engine.operating_points(operating_points.get('fpr_targets', ()),
+                                        operating_points.get('fnr_targets', ()))
+        metrics.update(operating_point_metrics(operating_points, *rates))
+    return metrics
 
-    # Accuracy, TPR, TNR Calculation
-    predictions = (scores >= 0.5).astype(int)
-    
-    # Use confusion matrix to get TP, TN, FP, FN
-    tn, fp, fn, tp = confusion_matrix(labels, predictions, labels=[0, 1]).ravel()
-    
+def operating_point_metrics(operating_points, fnr_at_fpr=None, fpr_at_fnr=None):
+    """
+    Names the rates of MetricEngine.operating_points as metrics, e.g.
+    'fnr_at_fpr_0.01' and 'fpr_at_fnr_0.05' (-1 when the rates are not given,
+    e.g. for a single-class dataset).
+
+    Returns:
+        dict: One entry per target, FPR targets first.
+    """
+    if not operating_points:
+        return {}
+    fpr_targets = operating_points.get('fpr_targets', ())
+    fnr_targets = operating_points.get('fnr_targets', ())
+    if fnr_at_fpr is None:
+        fnr_at_fpr, fpr_at_fnr = [-1] * len(fpr_targets), [-1] * len(fnr_targets)
+    metrics = {f"fnr_at_fpr_{float(t):g}": float(v) for t, v in zip(fpr_targets, fnr_at_fpr)}
+    metrics.update({f"fpr_at_fnr_{float(t):g}": float(v) for t, v in zip(fnr_targets, fpr_at_fnr)})
+    return metrics
+
+def confusion_metrics(tp, tn, fp, fn):
+    """
+    Derives accuracy, TPR, TNR, precision and F1 from the confusion counts of a
+    two-class dataset at the 0.5 decision threshold.
+
+    Returns:
+        dict: The derived metrics followed by the counts.
+    """
     accuracy = (tp + tn) / (tp + tn + fp + fn)
     
     # True Positive Rate (TPR) / Recall
@@ -80,8 +121,6 @@ def calculate_metrics(labels, scores):
     f1 = 2 * precision * tpr_val / (precision + tpr_val) if (precision + tpr_val) > 0 else 0.0
 
     return {
-        'eer': eer,
-        'auc': auc,
         'accuracy': accuracy,
         'tpr': tpr_val,
         'tnr': tnr_val,
@@ -92,3 +131,103 @@ def calculate_metrics(labels, scores):
         'fp': int(fp),
         'fn': int(fn),
     }
+
+
+class MetricEngine:
+    """
+    Exact ROC metrics of one two-class dataset from a single sort of its scores.
+
+    Scores are sorted once, descending, with their labels; cumulative spoof and
+    bonafide counts over that order give the ROC at every distinct score, from
+    which the EER, AUC, confusion counts at any thresholds and operating
+    points are read without going over the data again. Clips scoring at or
+    above a threshold are classified as spoof (label 1).
+    """
+    def __init__(self, labels, scores):
+        labels = np.asarray(labels).reshape(-1)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        order = np.argsort(-scores, kind='stable')
+        self.sorted_scores = scores[order]
+        spoof = (labels[order] == 1).astype(np.int64)
+
+        # Cumulative counts above the last occurrence of each distinct score
+        last = np.flatnonzero(np.diff(self.sorted_scores, append=-np.inf))
+        tps = np.cumsum(spoof)[last]
+        fps = last + 1 - tps
+        self.num_spoof = int(spoof.sum())
+        self.num_bonafide = len(spoof) - self.num_spoof
+        if self.num_spoof == 0 or self.num_bonafide == 0:
+            raise ValueError("MetricEngine needs both bonafide and spoof clips.")
+
+        # ROC points, starting at (0, 0) for a threshold above every score
+        self.thresholds = np.concatenate([[np.inf], self.sorted_scores[last]])
+        self.fpr = np.concatenate([[0.0], fps / self.num_bonafide])
+        self.tpr = np.concatenate([[0.0], tps / self.num_spoof])
+        self._spoof_above = np.concatenate([[0], np.cumsum(spoof)])
+
+    def eer(self):
+        """
+        Returns (eer, threshold): the rate at which FPR and FNR cross, linearly
+        interpolated along the ROC segment where they do, and the matching
+        (interpolated) score threshold.
+        """
+        gap = (1.0 - self.tpr) - self.fpr
+        # gap decreases from 1 at (0, 0) to -1 at (1, 1)
+        i = int(np.argmax(gap <= 0))
+        if gap[i] == 0:
+            return float(self.fpr[i]), float(self.thresholds[i])
+        t = gap[i - 1] / (gap[i - 1] - gap[i])
+        eer = self.fpr[i - 1] + t * (self.fpr[i] - self.fpr[i - 1])
+        if i == 1:
+            threshold = self.thresholds[1]
+        else:
+            threshold = self.thresholds[i - 1] + t * (self.thresholds[i] - self.thresholds[i - 1])
+        return float(eer), float(threshold)
+
+    def auc(self):
+        """
+        Returns the area under the ROC (ties count as half a correct pair).
+        """
+        return float(np.sum(np.diff(self.fpr) * (self.tpr[1:] + self.tpr[:-1])) / 2.0)
+
+    def confusion(self, thresholds):
+        """
+        Returns (tp, tn, fp, fn) int arrays, one entry per threshold.
+        """
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        # Clips at or above each threshold, found on the descending scores
+        above = np.searchsorted(-self.sorted_scores, -thresholds, side='right')
+        tp = self._spoof_above[above]
+        fp = above - tp
+        return tp, self.num_bonafide - fp, fp, self.num_spoof - tp
+
+    def operating_points(self, fpr_targets=(), fnr_targets=()):
+        """
+        Returns the lowest achievable FNR at each target FPR and the lowest
+        achievable FPR at each target FNR, as two arrays.
+        """
+        fnr = 1.0 - self.tpr
+        # Last ROC point within each FPR target (FPR and TPR increase along the ROC)
+        within_fpr = np.searchsorted(self.fpr, np.asarray(fpr_targets, dtype=np.float64), side='right') - 1
+        # First ROC point within each FNR target (FNR decreases along the ROC)
+        within_fnr = np.searchsorted(-fnr, -np.asarray(fnr_targets, dtype=np.float64), side='left')
+        return fnr[within_fpr], self.fpr[within_fnr]
+
+
+def _metrics_task(item, operating_points=None):
+    return calculate_metrics(*item, operating_points=operating_points)
+
+def calculate_metrics_many(datasets, num_workers=0, operating_points=None):
+    """
+    Runs `calculate_metrics` over many (labels, scores) datasets, spread over a
+    pool of `num_workers` processes (0 or 1 = in this process).
+
+    Returns:
+        list[dict]: The metrics of each dataset, in order.
+    """
+    datasets = list(datasets)
+    if num_workers <= 1 or len(datasets) < 2:
+        return [calculate_metrics(labels, scores, operating_points=operating_points) for labels, scores in datasets]
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(datasets)),
+                             mp_context=mp.get_context('spawn')) as pool:
+        return list(pool.map(functools.partial(_metrics_task, operating_points=operating_points), datasets))
@@ -0,0 +1,60 @@
+import json
+import os
+import numpy as np
+import torch
+
+def onnx_metadata_path(onnx_path):
+    """
+    Returns the path of the JSON sidecar written next to an exported model.
+    """
+    return f"{os.path.splitext(onnx_path)[0]}.json"
+
+
+class OnnxDetector:
+    """
+    Runs a detector exported by `benchmark.export_onnx` with ONNX Runtime on CPU.
+
+    Exposes the same `get_prediction_score` contract as AudioDeepfakeDetector,
+    (batch, samples) waveforms in, one score per waveform out, without
+    importing fairseq or the model code. The exported graph has a fixed input
+    length, so batches must match it (data_args.target_length).
+    """
+    def __init__(self, onnx_path, num_threads=None):
+        """
+        Args:
+            onnx_path (str): Path to the exported .onnx file.
+            num_threads (int, optional): ONNX Runtime intra-op threads
+                                         (default: torch.get_num_threads()).
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The ONNX backend requires onnxruntime (pip install onnxruntime).") from e
+
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(f"ONNX model not found at: {onnx_path}")
+        self.input_length = None
+        metadata_path = onnx_metadata_path(onnx_path)
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                self.input_length = json.load(f).get('input_length')
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or torch.get_num_threads()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        print(f"Loading ONNX model from '{onnx_path}' ({options.intra_op_num_threads} threads)...")
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def get_prediction_score(self, x):
+        if self.input_length is not None and x.shape[-1] != self.input_length:
+            raise ValueError(
+                f"The ONNX model was exported for inputs of {self.input_length} samples, got {x.shape[-1]}. "
+                "Set data_args.target_length accordingly."
+            )
+        waveforms = x.detach().cpu().numpy().astype(np.float32, copy=False)
+        scores = self.session.run(None, {self.input_name: waveforms})[0]
+        return torch.from_numpy(scores.reshape(-1))
+
+    def __call__(self, x):
+        return self.get_prediction_score(x)
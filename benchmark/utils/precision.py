@@ -0,0 +1,103 @@
+import torch
+import torch.nn as nn
+
+PRECISIONS = ('fp32', 'bf16', 'int8-dynamic')
+
+def find_backbone(detector):
+    """
+    Unwraps detector wrappers (anything holding the next model in `.backbone`,
+    `.model` or `.detector`) down to the raw model that splits front-end and
+    back-end, or the innermost model if none does.
+    """
+    backbone = detector
+    while not hasattr(backbone, 'forward_backend'):
+        inner = next((getattr(backbone, attr) for attr in ('backbone', 'model', 'detector')
+                      if isinstance(getattr(backbone, attr, None), nn.Module)), None)
+        if inner is None:
+            break
+        backbone = inner
+    return backbone
+
+def dynamic_quantization_targets(backbone):
+    """
+    Returns the names of the Linear layers that `int8-dynamic` quantizes.
+
+    For the baseline Model these are the Linear layers of the XLSR transformer
+    encoder, `LL` and `out_layer`. Projections owned by attention modules are
+    kept in fp32, since fairseq's attention reads their `.weight` directly.
+    Models without an SSL front-end get every Linear layer quantized.
+    """
+    modules = dict(backbone.named_modules())
+    if not hasattr(backbone, 'ssl_model'):
+        return [name for name, m in modules.items() if isinstance(m, nn.Linear)]
+
+    targets = [name for name in ('LL', 'out_layer') if isinstance(modules.get(name), nn.Linear)]
+    for name, m in modules.items():
+        if not (name.startswith('ssl_model.') and '.encoder.' in name and isinstance(m, nn.Linear)):
+            continue
+        parent = modules[name.rsplit('.', 1)[0]]
+        if hasattr(parent, 'q_proj'):
+            continue
+        targets.append(name)
+    return targets
+
+def quantize_int8_dynamic(detector):
+    """
+    Applies dynamic int8 quantization in place to the Linear layers listed by
+    `dynamic_quantization_targets`: weights are stored as int8 and activations
+    are quantized on the fly, per batch. CPU only.
+
+    Returns:
+        int: The number of quantized layers.
+    """
+    backbone = find_backbone(detector)
+    targets = dynamic_quantization_targets(backbone)
+    qconfig = torch.ao.quantization.default_dynamic_qconfig
+    torch.ao.quantization.quantize_dynamic(
+        backbone, {name: qconfig for name in targets}, dtype=torch.qint8, inplace=True
+    )
+    return len(targets)
+
+
+class AutocastDetector(nn.Module):
+    """
+    Wraps a detector so every scoring call runs under bfloat16 autocast on
+    the given device. Scores are returned in float32.
+    """
+    def __init__(self, detector, device_type='cpu'):
+        super().__init__()
+        self.detector = detector
+        self.device_type = device_type
+
+    def get_prediction_score(self, x):
+        with torch.autocast(device_type=self.device_type, dtype=torch.bfloat16):
+            scores = self.detector.get_prediction_score(x)
+        return scores.float()
+
+    def forward(self, x):
+        return self.get_prediction_score(x)
+
+
+def apply_precision(detector, precision, device):
+    """
+    Switches a detector to the requested inference precision.
+
+    Args:
+        detector (nn.Module): A detector exposing get_prediction_score.
+        precision (str): 'fp32' (unchanged), 'bf16' (autocast) or
+                         'int8-dynamic' (dynamic quantization, CPU only).
+        device (torch.device): The evaluation device.
+
+    Returns:
+        nn.Module: The detector to score with.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Expected one of {PRECISIONS}.")
+    if precision == 'bf16':
+        return AutocastDetector(detector, device_type=device.type)
+    if precision == 'int8-dynamic':
+        if device.type != 'cpu':
+            raise ValueError("Config error: precision 'int8-dynamic' requires the evaluation device to be 'cpu'.")
+        num_layers = quantize_int8_dynamic(detector)
+        print(f"Quantized {num_layers} Linear layers to int8 (dynamic).")
+    return detector
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import torchaudio
+from tqdm import tqdm
+from .audio_shards import PackedAudioDataset
+
+
+def probe_audio_file(audio_path):
+    """
+    Checks that an audio file exists, is non-empty and has a readable header
+    with at least one frame.
+
+    Returns:
+        str or None: Why the file cannot be evaluated, or None if it looks fine.
+    """
+    try:
+        size = os.stat(audio_path).st_size
+    except OSError as e:
+        return f"missing: {e.strerror}"
+    if size == 0:
+        return "empty file"
+    try:
+        info = torchaudio.info(audio_path)
+    except Exception as e:
+        return f"unreadable header: {e}"
+    if info.num_frames <= 0:
+        # Some formats (e.g. MP3) do not report a frame count; decode one frame
+        try:
+            waveform, _ = torchaudio.load(audio_path, num_frames=1)
+        except Exception as e:
+            return f"undecodable: {e}"
+        if waveform.shape[-1] == 0:
+            return "no audio frames"
+    return None
+
+
+class PreflightIndex:
+    """
+    A persistent index of probe results, so every audio file is probed once.
+
+    Entries are keyed by the file identity (absolute path, size, mtime), so a
+    changed or replaced file is probed again; missing files have no identity
+    and are never cached. New entries are appended to a JSON-lines file, one
+    write per scan, which makes the index safe to share between concurrent
+    evaluation processes.
+    """
+    def __init__(self, path):
+        """
+        Args:
+            path (str): The index file. Created on the first scan if missing.
+        """
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Partially written line (e.g. from a killed process)
+                        continue
+                    self.entries[entry['key']] = entry['error']
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def key(audio_path):
+        """
+        Returns the index key of an audio file, or None if it cannot be stat'ed.
+        """
+        try:
+            stat = os.stat(audio_path)
+        except OSError:
+            return None
+        identity = f"{os.path.abspath(audio_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def _check(self, audio_path):
+        key = self.key(audio_path)
+        if key is not None and key in self.entries:
+            return key, self.entries[key], False
+        return key, probe_audio_file(audio_path), True
+
+    def scan(self, audio_paths, num_threads=16, desc="Pre-flight check"):
+        """
+        Probes every file not yet in the index with a pool of threads (probing
+        is I/O bound) and records the new results.
+
+        Args:
+            audio_paths (list[str]): The files to check.
+            num_threads (int): Threads probing files concurrently.
+
+        Returns:
+            list: One entry per path, None for usable files and the reason
+                  (str) for the others.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, num_threads)) as executor:
+            results = list(tqdm(executor.map(self._check, audio_paths, chunksize=64),
+                                total=len(audio_paths), desc=desc))
+
+        new_entries = {key: error for key, error, probed in results if probed and key is not None}
+        if new_entries:
+            self.entries.update(new_entries)
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            lines = ''.join(json.dumps({'key': key, 'error': error}) + '\n' for key, error in new_entries.items())
+            with open(self.path, 'a') as f:
+                f.write(lines)
+        return [error for _, error, _ in results]
+
+
+def preflight_failures(dataset, rows, index, num_threads=16):
+    """
+    Returns the rows of a dataset that cannot be evaluated, with the reason.
+
+    Rows of a PackedAudioDataset are known from the pack (clips that failed
+    when it was built); the files of any other dataset are probed through
+    `index`.
+
+    Args:
+        dataset (Dataset): An AudioManifestDataset or PackedAudioDataset.
+        rows (list[int]): The rows to check.
+        index (PreflightIndex): Cached probe results.
+
+    Returns:
+        dict: Failing row -> reason.
+    """
+    if isinstance(dataset, PackedAudioDataset):
+        return {row: "failed to load when packed" for row in rows if dataset.labels[row] == -1}
+    errors = index.scan([dataset.manifest.audio_path(row) for row in rows], num_threads=num_threads)
+    return {row: error for row, error in zip(rows, errors) if error is not None}
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+def file_sha1(path, chunk_size=1 << 20):
+    """
+    Computes the SHA-1 digest of a file, reading it in chunks.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScoreJournal:
+    """
+    An append-only on-disk journal of per-row scores for one dataset evaluation.
+
+    Every scored batch is appended as `row,score,label` lines and flushed to disk,
+    so a crashed or preempted run loses at most the batch in flight. A JSON
+    sidecar holds a fingerprint of the run (manifest hash, checkpoint hash, data
+    args and scoring settings) and a completion flag; a journal whose fingerprint no longer matches
+    is discarded rather than resumed.
+    """
+    def __init__(self, journal_dir, name, fingerprint):
+        """
+        Args:
+            journal_dir (str): Directory holding the journal files.
+            name (str): Journal name, e.g. '<model>_on_<dataset>'.
+            fingerprint (dict): JSON-serializable description of the run that
+                                must match for the journal to be resumed.
+        """
+        os.makedirs(journal_dir, exist_ok=True)
+        self.meta_path = os.path.join(journal_dir, f"{name}.meta.json")
+        self.scores_path = os.path.join(journal_dir, f"{name}.scores.csv")
+        self.fingerprint = fingerprint
+        self.complete = False
+        self._file = None
+
+    def open(self, resume=False):
+        """
+        Opens the journal for appending.
+
+        Args:
+            resume (bool): If True and a journal with a matching fingerprint
+                           exists, its rows are kept; otherwise it is reset.
+
+        Returns:
+            set: Manifest row indices that are already scored.
+        """
+        done_rows = set()
+        meta = self._read_meta() if resume else None
+        if meta is not None and meta.get('fingerprint') == self.fingerprint:
+            self.complete = meta.get('complete', False)
+            self._drop_partial_line()
+            done_rows = set(self.read()[0])
+        else:
+            if meta is not None:
+                print(f"Warning: journal {self.meta_path} does not match this run (manifest, checkpoint "
+                      "or scoring settings changed). Starting this dataset from scratch.")
+            self.complete = False
+            self._write_meta()
+            open(self.scores_path, 'w').close()
+
+        self._file = open(self.scores_path, 'a')
+        return done_rows
+
+    def append(self, rows, scores, labels):
+        """
+        Appends one batch of scores and forces it to disk.
+        """
+        lines = [f"{int(r)},{float(s)!r},{int(l)}\n" for r, s, l in zip(rows, scores, labels)]
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def mark_complete(self):
+        """
+        Records that every row of the dataset has been processed.
+        """
+        self.complete = True
+        self._write_meta()
+
+    def read(self):
+        """
+        Reads back all journaled scores sorted by manifest row.
+
+        Returns:
+            tuple: (rows, scores, labels) lists. A line truncated by a crash
+                   is ignored; if a row was journaled twice the last entry wins.
+        """
+        entries = {}
+        if os.path.exists(self.scores_path):
+            with open(self.scores_path, 'r') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split(',')
+                    if len(parts) != 3 or not line.endswith('\n'):
+                        continue
+                    try:
+                        entries[int(parts[0])] = (float(parts[1]), int(parts[2]))
+                    except ValueError:
+                        continue
+        rows = sorted(entries)
+        scores = [entries[r][0] for r in rows]
+        labels = [entries[r][1] for r in rows]
+        return rows, scores, labels
+
+    def read_chunks(self, num_rows, chunk_size=65536):
+        """
+        Reads back the journaled scores in chunks of up to `chunk_size` lines,
+        in journal order, without holding them all in memory. Only the last
+        entry of a row journaled twice is kept, as in `read`; finding it takes
+        one extra pass and an int64 per manifest row.
+
+        Args:
+            num_rows (int): Number of manifest rows; rows outside [0, num_rows)
+                            are ignored.
+
+        Yields:
+            tuple: (rows, scores, labels) numpy arrays (int64, float64, int64).
+        """
+        last_line = np.full(num_rows, -1, dtype=np.int64)
+        for first, rows, _, _ in self._parsed_chunks(num_rows, chunk_size):
+            np.maximum.at(last_line, rows, np.arange(first, first + len(rows)))
+        for first, rows, scores, labels in self._parsed_chunks(num_rows, chunk_size):
+            keep = last_line[rows] == np.arange(first, first + len(rows))
+            if keep.any():
+                yield rows[keep], scores[keep], labels[keep]
+
+    def _parsed_chunks(self, num_rows, chunk_size):
+        # (index of the first line, rows, scores, labels) of every chunk of
+        # well-formed lines, with the same rules as `read`
+        if not os.path.exists(self.scores_path):
+            return
+        first = 0
+        rows, scores, labels = [], [], []
+        with open(self.scores_path, 'r') as f:
+            for line in f:
+                parts = line.rstrip('\n').split(',')
+                if len(parts) != 3 or not line.endswith('\n'):
+                    continue
+                try:
+                    row, score, label = int(parts[0]), float(parts[1]), int(parts[2])
+                except ValueError:
+                    continue
+                if not 0 <= row < num_rows:
+                    continue
+                rows.append(row)
+                scores.append(score)
+                labels.append(label)
+                if len(rows) == chunk_size:
+                    yield first, np.array(rows, dtype=np.int64), np.array(scores), np.array(labels, dtype=np.int64)
+                    first += len(rows)
+                    rows, scores, labels = [], [], []
+        if rows:
+            yield first, np.array(rows, dtype=np.int64), np.array(scores), np.array(labels, dtype=np.int64)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _drop_partial_line(self):
+        # Cut a line left half-written by a crash so new appends start cleanly
+        if not os.path.exists(self.scores_path):
+            return
+        with open(self.scores_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'complete': self.complete}, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import time
+import uuid
+from urllib.parse import quote
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+SCHEMA = pa.schema([
+    ('row', pa.int64()),          # manifest row index
+    ('path_hash', pa.uint64()),   # see path_hashes
+    ('score', pa.float64()),
+    ('label', pa.int8()),
+    ('run_id', pa.string()),
+    ('written_at', pa.timestamp('us', tz='UTC')),  # when the run's file was written; orders runs
+])
+
+# Partition columns, from the directory names
+PARTITION_SCHEMA = pa.schema([('model', pa.string()), ('dataset', pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+
+# Columns of a read: the stored ones and the partition columns
+READ_SCHEMA = pa.unify_schemas([SCHEMA, PARTITION_SCHEMA])
+
+
+def path_hashes(paths):
+    """
+    Returns a uint64 hash of every audio path (the first 8 bytes of its
+    BLAKE2b digest), the key joining scores back to a manifest.
+    """
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(str(p).encode('utf-8'), digest_size=8).digest(), 'little') for p in paths],
+        dtype=np.uint64,
+    )
+
+
+def new_run_id():
+    """
+    Returns a unique run id from the current local time and a random suffix,
+    e.g. '20250101T120000-3f9c1a2b', so runs started in the same second differ.
+    """
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class ScoreStore:
+    """
+    A columnar store of per-clip scores, partitioned by model and dataset.
+
+    Each append writes one uncompressed Arrow IPC file per run under
+    `<store_dir>/model=<model>/dataset=<dataset>/<run_id>.arrow`, holding the
+    manifest row, audio path hash, score, label, run id and write time of
+    every clip. Runs sit side by side and are told apart by their run id, and
+    ordered by write time; appending again under a run id already stored
+    (e.g. a resumed run with a fixed run_id) atomically replaces that run's
+    file, so no clip is ever stored twice for one run. Reads memory-map the
+    files and only open the partitions matching the model/dataset filters.
+    """
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    def _partition_dir(self, model, dataset):
+        return os.path.join(self.store_dir, f"model={quote(model, safe='')}", f"dataset={quote(dataset, safe='')}")
+
+    def append(self, model, dataset, run_id, rows, hashes, scores, labels):
+        """
+        Appends the scores of one model on one dataset, replacing any scores
+        already stored for this run.
+
+        Args:
+            model (str), dataset (str), run_id (str): Partition and run keys.
+            rows, hashes, scores, labels: Equal-length sequences of manifest
+                row indices, path hashes, scores and labels (0/1).
+
+        Returns:
+            str: Path of the written file.
+        """
+        return self.append_chunks(model, dataset, run_id, [(rows, hashes, scores, labels)])
+
+    def append_chunks(self, model, dataset, run_id, chunks):
+        """
+        Like `append`, but takes an iterable of (rows, hashes, scores, labels)
+        chunks, written as record batches of one file, so the scores never
+        need to be in memory all at once.
+
+        Returns:
+            str: Path of the written file.
+        """
+        partition_dir = self._partition_dir(model, dataset)
+        os.makedirs(partition_dir, exist_ok=True)
+        name = f"{quote(run_id, safe='')}.arrow"
+        path = os.path.join(partition_dir, name)
+        # Written under a hidden temporary name (unique, as concurrent runs may
+        # share a run id), so readers never see a partial file
+        tmp_path = os.path.join(partition_dir, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        written_at = pa.scalar(time.time_ns() // 1000, type=SCHEMA.field('written_at').type)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, SCHEMA) as writer:
+                for rows, hashes, scores, labels in chunks:
+                    writer.write_table(pa.table({
+                        'row': np.asarray(rows, dtype=np.int64),
+                        'path_hash': np.asarray(hashes, dtype=np.uint64),
+                        'score': np.asarray(scores, dtype=np.float64),
+                        'label': np.asarray(labels, dtype=np.int8),
+                        'run_id': pa.array([run_id] * len(rows), type=pa.string()),
+                        'written_at': pa.array([written_at] * len(rows), type=written_at.type),
+                    }, schema=SCHEMA))
+        os.replace(tmp_path, path)
+        return path
+
+    def dataset(self):
+        """
+        Returns the whole store as a memory-mapped pyarrow Dataset, with the
+        'model' and 'dataset' partition columns.
+        """
+        # An explicit schema, so an empty store still has every column
+        return ds.dataset(
+            self.store_dir, format='ipc', partitioning=PARTITIONING, schema=READ_SCHEMA,
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+        )
+
+    def read(self, model=None, dataset=None, run_id=None, columns=None):
+        """
+        Reads the scores matching the given model, dataset and run id.
+
+        Returns:
+            pyarrow.Table: Matching rows sorted by model, dataset, run and row,
+                           with the 'model' and 'dataset' columns (empty, with
+                           every column, if the store does not exist).
+        """
+        if not os.path.isdir(self.store_dir):
+            table = READ_SCHEMA.empty_table()
+            return table.select(columns) if columns is not None else table
+        expression = None
+        for name, value in (('model', model), ('dataset', dataset), ('run_id', run_id)):
+            if value is not None:
+                term = pc.field(name) == value
+                expression = term if expression is None else expression & term
+        table = self.dataset().to_table(filter=expression)
+        table = table.sort_by([('model', 'ascending'), ('dataset', 'ascending'),
+                               ('run_id', 'ascending'), ('row', 'ascending')])
+        return table.select(columns) if columns is not None else table
+
+    def run_ids(self, model=None, dataset=None):
+        """
+        Returns the run ids present for the given model and dataset, ordered by
+        when they were last written (oldest first), whatever their names.
+        """
+        table = self.read(model=model, dataset=dataset, columns=['run_id', 'written_at'])
+        runs = table.group_by('run_id').aggregate([('written_at', 'max')])
+        runs = runs.sort_by([('written_at_max', 'ascending'), ('run_id', 'ascending')])
+        return runs['run_id'].to_pylist()
+
+    def export_csv(self, output_path, model, dataset, run_id=None):
+        """
+        Writes the `score,label` CSV of one model on one dataset (the most
+        recently written run unless `run_id` is given), in manifest row order.
+        """
+        if run_id is None:
+            run_ids = self.run_ids(model=model, dataset=dataset)
+            if not run_ids:
+                raise ValueError(f"No scores stored for model '{model}' on dataset '{dataset}'.")
+            run_id = run_ids[-1]
+        table = self.read(model=model, dataset=dataset, run_id=run_id, columns=['score', 'label'])
+        table.to_pandas().to_csv(output_path, index=False)
@@ -0,0 +1,247 @@
+import functools
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from multiprocessing import util as mp_util
+import torch
+
+# Stages in pipeline order, as they appear in the reports
+STAGES = (
+    'manifest_load', 'preflight', 'load', 'resample', 'normalize_pad', 'collate',
+    'data_wait', 'host_to_device', 'model', 'extract_feat', 'backend', 'metrics', 'score_write',
+)
+
+# Stages that run in DataLoader workers (or in the main process without workers)
+WORKER_STAGES = ('load', 'resample', 'normalize_pad', 'collate')
+
+
+class StageTimer:
+    """
+    Accumulates wall time and call counts per (scope, stage), where the scope is
+    the manifest being processed. Disabled by default, in which case `stage()`
+    costs a single attribute check.
+
+    A stage timed while another one is running (e.g. the SSL front-end inside
+    the model, or the worker stages inside data_wait without DataLoader
+    workers) is recorded as nested in it, and its time is also subtracted from
+    the enclosing stage's exclusive time, so exclusive times add up without
+    double counting.
+
+    DataLoader workers get their own (forked or spawned) copy of the timer:
+    `worker_init_fn()` resets it there and registers a dump of its totals at
+    worker exit, which `collect_workers` merges back in the main process. Optionally,
+    stages are also recorded as torch.profiler ranges for a Chrome trace.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.scope = None
+        self.totals = {}
+        self.worker_dir = None
+        self._profiler = None
+        self._running = []
+
+    def enable(self):
+        self.enabled = True
+        if self.worker_dir is None:
+            self.worker_dir = tempfile.mkdtemp(prefix='stage_timer_')
+
+    def add(self, stage, seconds, count=1, parent=None):
+        # Entries are [seconds, count, seconds of nested stages, enclosing stage]
+        stages = self.totals.setdefault(self.scope, {})
+        entry = stages.setdefault(stage, [0.0, 0, 0.0, parent])
+        entry[0] += seconds
+        entry[1] += count
+        if parent is not None:
+            entry[3] = parent
+            stages.setdefault(parent, [0.0, 0, 0.0, None])[2] += seconds
+
+    def stage(self, name, count=1, sync_device=None):
+        """
+        Context manager timing one occurrence (or `count` items) of a stage.
+        With `sync_device` set to a CUDA device, pending kernels are awaited
+        before the clock stops, so asynchronous GPU work is attributed correctly.
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name, count, sync_device)
+
+    @contextmanager
+    def _timed(self, name, count, sync_device):
+        record = torch.profiler.record_function(name) if self._profiler is not None else nullcontext()
+        parent = self._running[-1] if self._running else None
+        self._running.append(name)
+        start = time.perf_counter()
+        try:
+            with record:
+                yield
+                if sync_device is not None and sync_device.type == 'cuda':
+                    torch.cuda.synchronize(sync_device)
+        finally:
+            self._running.pop()
+        self.add(name, time.perf_counter() - start, count, parent)
+
+    # --- DataLoader workers ---
+
+    def worker_init_fn(self):
+        """
+        Returns the `worker_init_fn` to pass to DataLoaders (None when disabled).
+        """
+        if not self.enabled:
+            return None
+        return functools.partial(_init_worker_timer, self.worker_dir)
+
+    def start_worker(self, worker_dir):
+        # A fresh timer in a DataLoader worker, dumped when the worker exits
+        self.enabled = True
+        self.worker_dir = worker_dir
+        self.totals = {}
+        self._profiler = None
+        self._running = []
+        mp_util.Finalize(self, self._dump_worker, exitpriority=10)
+
+    def _dump_worker(self):
+        path = os.path.join(self.worker_dir, f"worker_{os.getpid()}_{time.monotonic_ns()}.json")
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f)
+
+    def collect_workers(self):
+        """
+        Merges the totals dumped by exited workers into this timer.
+        """
+        if not self.enabled or self.worker_dir is None:
+            return
+        for name in sorted(os.listdir(self.worker_dir)):
+            path = os.path.join(self.worker_dir, name)
+            try:
+                with open(path, 'r') as f:
+                    self.merge(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                continue
+            os.remove(path)
+
+    # --- Aggregation ---
+
+    def snapshot(self):
+        """
+        Returns the totals as {scope: {stage: [seconds, count, nested seconds,
+        enclosing stage]}}, JSON-serializable.
+        """
+        return {str(scope): {stage: list(v) for stage, v in stages.items()} for scope, stages in self.totals.items()}
+
+    def merge(self, snapshot):
+        for scope, stages in snapshot.items():
+            scope = None if scope == 'None' else scope
+            for stage, (seconds, count, nested, parent) in stages.items():
+                entry = self.totals.setdefault(scope, {}).setdefault(stage, [0.0, 0, 0.0, parent])
+                entry[0] += seconds
+                entry[1] += count
+                entry[2] += nested
+                entry[3] = entry[3] or parent
+
+    def report(self, scope):
+        """
+        Returns the stage table of one scope, in pipeline order, with mean
+        milliseconds per occurrence, where each stage runs, the stage it is
+        nested in (if any) and its exclusive time (without nested stages).
+        """
+        stages = self.totals.get(scope, {})
+        ordered = [s for s in STAGES if s in stages] + sorted(s for s in stages if s not in STAGES)
+        def process(stage):
+            # Nested stages run in the process of the stage enclosing them
+            parent = stages[stage][3]
+            if parent is not None and parent in stages:
+                return process(parent)
+            return 'worker' if stage in WORKER_STAGES else 'main'
+
+        report = {}
+        for stage in ordered:
+            seconds, count, nested, parent = stages[stage]
+            report[stage] = {
+                'seconds': round(seconds, 6),
+                'exclusive_seconds': round(max(seconds - nested, 0.0), 6),
+                'count': count,
+                'mean_ms': round(1000 * seconds / count, 4) if count else 0.0,
+                'process': process(stage),
+                'nested_in': parent,
+            }
+        return report
+
+    # --- Optional torch.profiler trace ---
+
+    def start_profiler(self, trace_path, num_batches, device):
+        """
+        Profiles `num_batches` batches (after one warm-up batch) and writes a
+        Chrome trace to `trace_path`. Call `step()` once per batch.
+        """
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if device.type == 'cuda':
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+        self._profiler = torch.profiler.profile(
+            activities=activities,
+            schedule=torch.profiler.schedule(wait=0, warmup=1, active=num_batches, repeat=1),
+            on_trace_ready=lambda prof: prof.export_chrome_trace(trace_path),
+        )
+        self._profiler.start()
+
+    def step(self):
+        if self._profiler is not None:
+            self._profiler.step()
+
+    def stop_profiler(self):
+        if self._profiler is not None:
+            self._profiler.stop()
+            self._profiler = None
+
+
+# The process-wide timer used by the data pipeline and the evaluation loop
+STAGE_TIMER = StageTimer()
+
+
+class TimedCall:
+    """
+    Calls `fn` as one occurrence of stage `name` of STAGE_TIMER, synchronizing
+    on the device of the first tensor argument. Picklable, so it can wrap the
+    collate function handed to DataLoader workers.
+    """
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+    def __call__(self, *args, **kwargs):
+        if not STAGE_TIMER.enabled:
+            return self.fn(*args, **kwargs)
+        device = next((a.device for a in args if isinstance(a, torch.Tensor)), None)
+        with STAGE_TIMER.stage(self.name, sync_device=device):
+            return self.fn(*args, **kwargs)
+
+
+def _init_worker_timer(worker_dir, worker_id):
+    # Module-level so spawned workers resolve their own STAGE_TIMER
+    STAGE_TIMER.start_worker(worker_dir)
+
+
+def write_timing_report(path, scope_name, report, wall_seconds=None):
+    """
+    Writes one dataset's stage report as JSON, with a hint on whether the main
+    process mostly waited for data (I/O-bound) or computed (compute-bound), and
+    the exclusive time summed per process. Only those sums are free of double
+    counting; 'seconds' of a stage includes the stages nested in it.
+    """
+    waiting = report.get('data_wait', {}).get('seconds', 0.0)
+    computing = sum(report.get(s, {}).get('seconds', 0.0) for s in ('host_to_device', 'model'))
+    payload = {
+        'dataset': scope_name,
+        'wall_seconds': None if wall_seconds is None else round(wall_seconds, 6),
+        'bound': 'io' if waiting > computing else 'compute',
+        'exclusive_seconds': {
+            process: round(sum(r['exclusive_seconds'] for r in report.values() if r['process'] == process), 6)
+            for process in ('main', 'worker')
+        },
+        'stages': report,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
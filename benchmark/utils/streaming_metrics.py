@@ -0,0 +1,160 @@
+import numpy as np
+from .metrics import calculate_metrics, confusion_metrics, operating_point_metrics
+
+def _ordered_keys(scores):
+    # float32 bit patterns mapped to uint32 keys that sort like the scores
+    # (adding zero turns -0.0 into 0.0, so both land in the same bin)
+    bits = (np.ascontiguousarray(scores, dtype=np.float32) + np.float32(0)).view(np.uint32)
+    return np.where(bits >> 31, ~bits, bits | np.uint32(0x80000000)).astype(np.uint32)
+
+def _bin_edge(index, bits):
+    # Smallest score of a histogram bin (inverse of _ordered_keys)
+    key = np.uint32(index << (32 - bits))
+    raw = key ^ np.uint32(0x80000000) if key >> 31 else ~key
+    return float(np.array([raw], dtype=np.uint32).view(np.float32)[0])
+
+
+class StreamingMetrics:
+    """
+    Accumulates labels and scores batch by batch and computes the metrics of
+    `calculate_metrics` in bounded memory.
+
+    Up to `exact_limit` items are also buffered, and metrics over them are
+    exact. Beyond that the buffer is dropped and EER and AUC come from per-class
+    score histograms, whose bins are the leading `bits` bits of the float32
+    scores: a fixed grid that needs no score range and whose relative width is
+    2^-(bits - 9) (about 0.4% with 16 bits), finest near zero. The confusion
+    counts at the 0.5 threshold are counted exactly either way.
+
+    Histogram estimates come with bounds that contain the exact EER and AUC,
+    since scores are only ordered up to their bin: the FPR/FNR crossing and the
+    ordering of score pairs are unknown within a bin only.
+    """
+    def __init__(self, exact_limit=1_000_000, bits=16):
+        """
+        Args:
+            exact_limit (int): Largest number of items whose metrics are
+                               computed exactly (0 = always histograms).
+            bits (int): Histogram resolution; 2^bits bins per class.
+        """
+        if not 9 <= bits <= 24:
+            raise ValueError("StreamingMetrics bits must be between 9 and 24.")
+        self.exact_limit = exact_limit
+        self.bits = bits
+        self.reset()
+
+    def reset(self):
+        self.histograms = np.zeros((2, 1 << self.bits), dtype=np.int64)
+        # Confusion counts at 0.5, indexed by [label, prediction]
+        self.confusion = np.zeros((2, 2), dtype=np.int64)
+        self.count = 0
+        self._buffer = []
+
+    @property
+    def exact(self):
+        return self._buffer is not None
+
+    def update(self, labels, scores):
+        """
+        Adds one batch (labels: 0 bonafide, 1 spoof; scores: higher = spoof).
+        """
+        labels = np.asarray(labels).reshape(-1).astype(np.int64)
+        scores = np.asarray(scores).reshape(-1)
+        if len(labels) == 0:
+            return
+        predictions = (scores >= 0.5).astype(np.int64)
+        self.confusion += np.bincount(2 * labels + predictions, minlength=4).reshape(2, 2)
+
+        bins = (_ordered_keys(scores) >> np.uint32(32 - self.bits)).astype(np.int64)
+        for label in (0, 1):
+            selected = bins[labels == label]
+            if len(selected):
+                self.histograms[label] += np.bincount(selected, minlength=1 << self.bits)
+
+        self.count += len(labels)
+        if self._buffer is not None:
+            if self.count <= self.exact_limit:
+                self._buffer.append((labels, np.array(scores, copy=True)))
+            else:
+                self._buffer = None
+
+    def compute(self, operating_points=None):
+        """
+        Returns the metrics of `calculate_metrics`, plus 'exact' and the
+        [low, high] intervals 'eer_bounds' and 'auc_bounds' (equal to the value
+        when exact). From histograms, operating points are read at bin edges:
+        rates achievable there, so never better than the exact ones.
+        """
+        if self._buffer is not None and self._buffer:
+            labels = np.concatenate([b[0] for b in self._buffer])
+            scores = np.concatenate([b[1] for b in self._buffer])
+            metrics = calculate_metrics(labels, scores, operating_points=operating_points)
+            metrics['exact'] = True
+            metrics['eer_bounds'] = [float(metrics['eer'])] * 2
+            metrics['auc_bounds'] = [float(metrics['auc'])] * 2
+            return metrics
+
+        (tn, fp), (fn, tp) = self.confusion
+        num_bonafide, num_spoof = int(tn + fp), int(fn + tp)
+        if num_bonafide == 0 or num_spoof == 0:
+            print("Warning: Only one class present in labels. EER and AUC cannot be computed.")
+            total = num_bonafide + num_spoof
+            return {
+                'eer': -1, 'auc': -1,
+                'accuracy': (tn + tp) / total if total else 0.0,
+                'tpr': tp / num_spoof if num_spoof else -1,
+                'tnr': tn / num_bonafide if num_bonafide else -1,
+                'precision': -1, 'f1': -1, 'tp': -1, 'tn': -1, 'fp': -1, 'fn': -1,
+                **operating_point_metrics(operating_points),
+                'exact': False, 'eer_bounds': [-1, -1], 'auc_bounds': [-1, -1],
+            }
+
+        eer, eer_threshold, eer_bounds = self._histogram_eer(num_bonafide, num_spoof)
+        auc, auc_bounds = self._histogram_auc(num_bonafide, num_spoof)
+        metrics = {'eer': eer, 'auc': auc, 'eer_threshold': eer_threshold, **confusion_metrics(tp, tn, fp, fn)}
+        if operating_points:
+            metrics.update(operating_point_metrics(
+                operating_points, *self._histogram_operating_points(num_bonafide, num_spoof, operating_points)))
+        return {**metrics, 'exact': False, 'eer_bounds': eer_bounds, 'auc_bounds': auc_bounds}
+
+    def _edge_rates(self, num_bonafide, num_spoof):
+        # Rates at the lower edge of every bin (and above the last one): clips
+        # scoring at or above the edge are classified as spoof. FPR falls and
+        # FNR rises along the edges.
+        bonafide, spoof = self.histograms
+        fpr = np.concatenate([[num_bonafide], num_bonafide - np.cumsum(bonafide)]) / num_bonafide
+        fnr = np.concatenate([[0], np.cumsum(spoof)]) / num_spoof
+        return fpr, fnr
+
+    def _histogram_operating_points(self, num_bonafide, num_spoof, operating_points):
+        # Lowest FNR among edges within each FPR target, and vice versa
+        fpr, fnr = self._edge_rates(num_bonafide, num_spoof)
+        fpr_targets = np.asarray(operating_points.get('fpr_targets', ()), dtype=np.float64)
+        fnr_targets = np.asarray(operating_points.get('fnr_targets', ()), dtype=np.float64)
+        within_fpr = np.searchsorted(-fpr, -fpr_targets, side='left')
+        within_fnr = np.searchsorted(fnr, fnr_targets, side='right') - 1
+        return fnr[within_fpr], fpr[within_fnr]
+
+    def _histogram_eer(self, num_bonafide, num_spoof):
+        fpr, fnr = self._edge_rates(num_bonafide, num_spoof)
+
+        # FNR - FPR increases with the threshold; the rates cross inside bin k - 1
+        k = int(np.argmax(fnr - fpr >= 0))
+        fpr_a, fpr_b, fnr_a, fnr_b = fpr[k - 1], fpr[k], fnr[k - 1], fnr[k]
+        low, high = max(fpr_b, fnr_a), min(fpr_a, fnr_b)
+        # Linear interpolation of both rates across the bin
+        span = (fpr_a - fpr_b) + (fnr_b - fnr_a)
+        eer = fnr_a + (fpr_a - fnr_a) / span * (fnr_b - fnr_a) if span > 0 else fnr_a
+        eer = min(max(eer, low), high)
+        # The upper edge of the crossing bin
+        threshold = _bin_edge(min(k, (1 << self.bits) - 1), self.bits)
+        return float(eer), threshold, [float(low), float(high)]
+
+    def _histogram_auc(self, num_bonafide, num_spoof):
+        # Pairs in different bins are ordered; pairs sharing a bin count as ties
+        bonafide, spoof = self.histograms.astype(np.float64)
+        bonafide_below = np.cumsum(bonafide) - bonafide
+        pairs = float(num_bonafide) * float(num_spoof)
+        ordered = float(np.dot(spoof, bonafide_below)) / pairs
+        same_bin = float(np.dot(spoof, bonafide)) / pairs
+        return ordered + 0.5 * same_bin, [ordered, ordered + same_bin]
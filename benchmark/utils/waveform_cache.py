@@ -0,0 +1,138 @@
+import glob
+import hashlib
+import mmap
+import os
+import socket
+import uuid
+import numpy as np
+import torch
+
+class WaveformCache:
+    """
+    A persistent on-disk cache of preprocessed waveforms, held in memory-mapped
+    shard files.
+
+    Each writing process appends float32 waveforms to a shard file of its own
+    and, once an entry's samples are written, records it (key, offset, length)
+    in the shard's index file. Readers map every shard once and serve entries
+    as zero-copy views, so a warm cache costs a few large files instead of one
+    file per clip. Entries are keyed by the file identity (absolute path, size,
+    mtime) and the preprocessing arguments, so a changed file or a different
+    target rate/length never hits a stale entry. Processes never write to the
+    same shard, which makes the cache safe to share between concurrent
+    evaluation processes; a process killed mid-write leaves at most a truncated
+    index line, which is ignored.
+    """
+    def __init__(self, cache_dir, target_sample_rate=16000, target_length=64000, shard_bytes=1 << 30):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir (str): Root directory of the cache. Created if missing.
+            target_sample_rate (int): The target sample rate used by the processor.
+            target_length (int, optional): The fixed number of samples used by
+                                          the processor, or None.
+            shard_bytes (int): Size after which a writer starts a new shard.
+        """
+        self.cache_dir = cache_dir
+        self.target_sample_rate = target_sample_rate
+        self.target_length = target_length
+        self.shard_bytes = shard_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries = None
+        self._writer = None
+
+    def __getstate__(self):
+        # Shards are mapped, and written, separately by each process
+        state = self.__dict__.copy()
+        state['_entries'] = None
+        state['_writer'] = None
+        return state
+
+    def key(self, audio_path):
+        """
+        Builds the cache key for an audio file from its identity and the data args.
+        """
+        stat = os.stat(audio_path)
+        identity = "|".join([
+            os.path.abspath(audio_path),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            str(self.target_sample_rate),
+            str(self.target_length),
+        ])
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def _map_shards(self):
+        # Maps the shards present now; entries written later are seen by the next run
+        self._entries = {}
+        for index_path in sorted(glob.glob(os.path.join(self.cache_dir, '*.idx'))):
+            shard_path = index_path[:-len('.idx')] + '.bin'
+            try:
+                with open(index_path, 'r') as f:
+                    lines = f.readlines()
+                size = os.path.getsize(shard_path)
+            except OSError:
+                continue
+            if size == 0:
+                continue
+            with open(shard_path, 'rb') as f:
+                # Copy-on-write mapping: writable views for torch, pages shared until written
+                samples = np.frombuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY), dtype=np.float32)
+            for line in lines:
+                parts = line.split()
+                if len(parts) != 3 or not line.endswith('\n'):
+                    continue
+                offset, length = int(parts[1]), int(parts[2])
+                if offset + length <= len(samples):
+                    self._entries[parts[0]] = samples[offset:offset + length]
+
+    def load(self, audio_path):
+        """
+        Returns the cached waveform for `audio_path` as a view of its shard,
+        or None on a cache miss.
+        """
+        if self._entries is None:
+            self._map_shards()
+        samples = self._entries.get(self.key(audio_path))
+        return None if samples is None else torch.from_numpy(samples)
+
+    def _open_writer(self):
+        self._close_writer()
+        name = f"shard-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        shard_file = open(os.path.join(self.cache_dir, f"{name}.bin"), 'ab')
+        index_file = open(os.path.join(self.cache_dir, f"{name}.idx"), 'a')
+        self._writer = {'pid': os.getpid(), 'shard': shard_file, 'index': index_file, 'offset': 0}
+
+    def _close_writer(self):
+        # A writer inherited from another process is left to that process
+        if self._writer is not None and self._writer['pid'] == os.getpid():
+            self._writer['shard'].close()
+            self._writer['index'].close()
+        self._writer = None
+
+    def store(self, audio_path, waveform):
+        """
+        Appends a processed waveform to this process's shard. Failures are
+        reported but never propagated, since the cache is only an optimization.
+        """
+        try:
+            key = self.key(audio_path)
+            # Forked DataLoader workers inherit the parent's writer; each opens its own
+            if self._writer is None or self._writer['pid'] != os.getpid() \
+                    or self._writer['offset'] * 4 >= self.shard_bytes:
+                self._open_writer()
+            samples = np.ascontiguousarray(waveform.detach().cpu().numpy().reshape(-1), dtype=np.float32)
+            self._writer['shard'].write(samples.tobytes())
+            self._writer['shard'].flush()
+            # The index line is written after the samples, so it never points past the data
+            self._writer['index'].write(f"{key} {self._writer['offset']} {len(samples)}\n")
+            self._writer['index'].flush()
+            self._writer['offset'] += len(samples)
+        except OSError as e:
+            print(f"Warning: could not write cache entry for {audio_path}: {e}")
+            # The shard may end in a partial entry; later entries go to a new one
+            try:
+                self._close_writer()
+            except OSError:
+                self._writer = None
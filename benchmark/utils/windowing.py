@@ -0,0 +1,140 @@
+from collections import deque
+import numpy as np
+import torch
+
+AGGREGATIONS = ('mean', 'max', 'trimmed_mean')
+
+def window_starts(length, window, hop):
+    """
+    Returns the start offsets of sliding windows over `length` samples.
+
+    Windows advance by `hop`. If the last regular window stops short of the end,
+    one more window aligned to the end of the signal is added so the tail is
+    always scored. A signal shorter than `window` yields a single window at 0.
+    """
+    if length <= window:
+        return [0]
+    starts = list(range(0, length - window + 1, hop))
+    if starts[-1] + window < length:
+        starts.append(length - window)
+    return starts
+
+def split_windows(waveform, length, window, hop):
+    """
+    Cuts the first `length` samples of a 1-D waveform into sliding windows.
+    A signal shorter than `window` is zero-padded, as WaveformProcessor does.
+
+    Returns:
+        torch.Tensor: Windows of shape (num_windows, window).
+    """
+    waveform = waveform[:length]
+    if length < window:
+        waveform = torch.nn.functional.pad(waveform, (0, window - length))
+    return torch.stack([waveform[s:s + window] for s in window_starts(length, window, hop)])
+
+def aggregate_scores(scores, aggregation='mean', trim=0.1):
+    """
+    Reduces the window scores of one utterance to a single score.
+
+    Args:
+        scores (array-like): Scores of all windows of the utterance.
+        aggregation (str): 'mean', 'max' or 'trimmed_mean'.
+        trim (float): Fraction cut from each end for 'trimmed_mean'.
+    """
+    scores = np.sort(np.asarray(scores, dtype=np.float64))
+    if aggregation == 'mean':
+        return float(scores.mean())
+    if aggregation == 'max':
+        return float(scores[-1])
+    if aggregation == 'trimmed_mean':
+        k = int(len(scores) * trim)
+        if len(scores) - 2 * k > 0:
+            scores = scores[k:len(scores) - k]
+        return float(scores.mean())
+    raise ValueError(f"Unknown aggregation '{aggregation}'. Expected one of {AGGREGATIONS}.")
+
+
+class WindowedScorer:
+    """
+    Scores whole utterances over sliding windows.
+
+    Windows of all added utterances are queued and packed into full model
+    batches of `batch_size` windows, regardless of which utterance they come
+    from. Window scores are scattered back to their utterance and aggregated
+    once all of its windows are scored. Utterances complete in the order they
+    were added.
+    """
+    def __init__(self, score_fn, window=64000, hop=32000, aggregation='mean', trim=0.1, batch_size=256):
+        """
+        Args:
+            score_fn (callable): Maps a (batch, window) tensor to one score per window,
+                                 e.g. AudioDeepfakeDetector.get_prediction_score,
+                                 or to a (batch, models) tensor of scores, each
+                                 column being aggregated separately.
+            window (int): Window length in samples.
+            hop (int): Hop between window starts in samples.
+            aggregation (str): 'mean', 'max' or 'trimmed_mean'.
+            trim (float): Fraction cut from each end for 'trimmed_mean'.
+            batch_size (int): Number of windows per model batch.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{aggregation}'. Expected one of {AGGREGATIONS}.")
+        self.score_fn = score_fn
+        self.window = window
+        self.hop = hop
+        self.aggregation = aggregation
+        self.trim = trim
+        self.batch_size = batch_size
+        self._queue = deque()      # (utterance id, window index, window tensor)
+        self._utterances = {}      # utterance id -> [key, label, window scores, remaining]
+        self._order = deque()      # utterance ids in insertion order
+        self._next_id = 0
+
+    def add(self, key, waveform, length, label):
+        """
+        Queues all windows of one utterance.
+
+        Args:
+            key: Caller-defined identifier returned with the utterance's score.
+            waveform (torch.Tensor): 1-D (possibly padded) waveform.
+            length (int): Number of valid samples in `waveform`.
+            label (int): The utterance label, returned unchanged.
+        """
+        windows = split_windows(waveform, length, self.window, self.hop)
+        uid = self._next_id
+        self._next_id += 1
+        self._utterances[uid] = [key, label, [None] * len(windows), len(windows)]
+        self._order.append(uid)
+        for j, w in enumerate(windows):
+            self._queue.append((uid, j, w))
+
+    def score_ready(self, flush=False):
+        """
+        Runs every full batch of queued windows (and a final partial batch if
+        `flush`) and returns the utterances that are now complete.
+
+        Returns:
+            list: (key, score, label) tuples, in insertion order. With a
+                  multi-column score_fn, `score` is an array with one
+                  aggregated score per column.
+        """
+        while len(self._queue) >= self.batch_size or (flush and self._queue):
+            chunk = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            scores = self.score_fn(torch.stack([w for _, _, w in chunk]))
+            scores = scores.detach().cpu().numpy()
+            scores = scores.reshape(len(chunk), -1) if scores.ndim > 1 else scores.reshape(-1)
+            for (uid, j, _), score in zip(chunk, scores):
+                utterance = self._utterances[uid]
+                utterance[2][j] = score
+                utterance[3] -= 1
+
+        completed = []
+        while self._order and self._utterances[self._order[0]][3] == 0:
+            key, label, window_scores, _ = self._utterances.pop(self._order.popleft())
+            if np.ndim(window_scores[0]) > 0:
+                window_scores = np.stack(window_scores)
+                score = np.array([aggregate_scores(col, self.aggregation, self.trim) for col in window_scores.T])
+            else:
+                score = aggregate_scores(window_scores, self.aggregation, self.trim)
+            completed.append((key, score, label))
+        return completed
@@ -55,6 +55,34 @@ class SSLModel(nn.Module):
     In Proc. ICASSP 2022, pp: 6367--6371.'''
 
 
+# Upper bound on pairwise node products alive at once when deriving attention maps
+PAIRWISE_BLOCK_ELEMENTS = 1 << 22
+
+
+def pairwise_attention_logits(x, att_proj, att_weight, block_elements=None):
+    '''
+    Calculates tanh(att_proj(x_i * x_j)) @ att_weight for every node pair (i, j),
+    without building the full (#bs, #node, #node, #dim) pairwise product: rows i
+    are processed in blocks holding at most `block_elements` products
+    (default: PAIRWISE_BLOCK_ELEMENTS).
+    x           :(#bs, #node, #dim)
+    att_weight  :(#dim_out, #k)
+    out_shape   :(#bs, #node, #node, #k)
+    '''
+    if block_elements is None:
+        block_elements = PAIRWISE_BLOCK_ELEMENTS
+    bs, nb_nodes, dim = x.shape
+    row_elements = bs * nb_nodes * max(dim, att_proj.out_features)
+    block_rows = max(1, block_elements // max(1, row_elements))
+
+    blocks = []
+    for start in range(0, nb_nodes, block_rows):
+        # size: (#bs, #block_rows, #node, #dim)
+        pair = x[:, start:start + block_rows].unsqueeze(2) * x.unsqueeze(1)
+        blocks.append(torch.matmul(torch.tanh(att_proj(pair)), att_weight))
+    return torch.cat(blocks, dim=1)
+
+
 class GraphAttentionLayer(nn.Module):
     def __init__(self, in_dim, out_dim, **kwargs):
         super().__init__()
@@ -99,30 +127,14 @@ class GraphAttentionLayer(nn.Module):
         x = self.act(x)
         return x
 
-    def _pairwise_mul_nodes(self, x):
-        '''
-        Calculates pairwise multiplication of nodes.
-        - for attention map
-        x           :(#bs, #node, #dim)
-        out_shape   :(#bs, #node, #node, #dim)
-        '''
-
-        nb_nodes = x.size(1)
-        x = x.unsqueeze(2).expand(-1, -1, nb_nodes, -1)
-        x_mirror = x.transpose(1, 2)
-
-        return x * x_mirror
-
     def _derive_att_map(self, x):
         '''
         x           :(#bs, #node, #dim)
         out_shape   :(#bs, #node, #node, 1)
         '''
-        att_map = self._pairwise_mul_nodes(x)
-        # size: (#bs, #node, #node, #dim_out)
-        att_map = torch.tanh(self.att_proj(att_map))
-        # size: (#bs, #node, #node, 1)
-        att_map = torch.matmul(att_map, self.att_weight)
+        # size: (#bs, #node, #node, 1), same as projecting the full pairwise
+        # product x_i * x_j (see benchmark/perf/graph_attention_check.py)
+        att_map = pairwise_attention_logits(x, self.att_proj, self.att_weight)
 
         # apply temperature
         att_map = att_map / self.temp
@@ -238,20 +250,6 @@ class HtrgGraphAttentionLayer(nn.Module):
 
         return master
 
-    def _pairwise_mul_nodes(self, x):
-        '''
-        Calculates pairwise multiplication of nodes.
-        - for attention map
-        x           :(#bs, #node, #dim)
-        out_shape   :(#bs, #node, #node, #dim)
-        '''
-
-        nb_nodes = x.size(1)
-        x = x.unsqueeze(2).expand(-1, -1, nb_nodes, -1)
-        x_mirror = x.transpose(1, 2)
-
-        return x * x_mirror
-
     def _derive_att_map_master(self, x, master):
         '''
         x           :(#bs, #node, #dim)
@@ -274,25 +272,19 @@ class HtrgGraphAttentionLayer(nn.Module):
         x           :(#bs, #node, #dim)
         out_shape   :(#bs, #node, #node, 1)
         '''
-        att_map = self._pairwise_mul_nodes(x)
-        # size: (#bs, #node, #node, #dim_out)
-        att_map = torch.tanh(self.att_proj(att_map))
+        # logits of every pair under each edge type's weight, same as
+        # projecting the full pairwise product x_i * x_j
+        # size: (#bs, #node, #node, 3)
+        att_weights = torch.cat([self.att_weight11, self.att_weight12, self.att_weight22], dim=1)
+        att_map = pairwise_attention_logits(x, self.att_proj, att_weights)
+
+        # edge type of each pair: 0 (type1-type1), 1 (mixed), 2 (type2-type2)
+        node_type = (torch.arange(x.size(1), device=x.device) >= num_type1).long()
+        edge_type = node_type.unsqueeze(1) + node_type.unsqueeze(0)
         # size: (#bs, #node, #node, 1)
+        att_map = torch.gather(
+            att_map, -1, edge_type.expand(x.size(0), -1, -1).unsqueeze(-1))
 
-        att_board = torch.zeros_like(att_map[:, :, :, 0]).unsqueeze(-1)
-
-        att_board[:, :num_type1, :num_type1, :] = torch.matmul(
-            att_map[:, :num_type1, :num_type1, :], self.att_weight11)
-        att_board[:, num_type1:, num_type1:, :] = torch.matmul(
-            att_map[:, num_type1:, num_type1:, :], self.att_weight22)
-        att_board[:, :num_type1, num_type1:, :] = torch.matmul(
-            att_map[:, :num_type1, num_type1:, :], self.att_weight12)
-        att_board[:, num_type1:, :num_type1, :] = torch.matmul(
-            att_map[:, num_type1:, :num_type1, :], self.att_weight12)
-
-        att_map = att_board
-
-        
 
         # apply temperature
         att_map = att_map / self.temp
@@ -505,7 +497,21 @@ class Model(nn.Module):
 
     def forward(self, x):
         #-------pre-trained Wav2vec model fine tunning ------------------------##
-        x_ssl_feat = self.ssl_model.extract_feat(x.squeeze(-1))
+        x_ssl_feat = self.extract_frontend(x)
+        return self.forward_backend(x_ssl_feat)
+
+    def extract_frontend(self, x):
+        '''
+        x           :(#bs, #samples)
+        out_shape   :(#bs, #frame, #ssl_dim)
+        '''
+        return self.ssl_model.extract_feat(x.squeeze(-1))
+
+    def forward_backend(self, x_ssl_feat):
+        '''
+        AASIST back-end on top of (possibly cached) SSL front-end features.
+        x_ssl_feat  :(#bs, #frame, #ssl_dim)
+        '''
         x = self.LL(x_ssl_feat) #(bs,frame_number,feat_out_dim)
         
         # post-processing on front-end features
@@ -15,6 +15,12 @@ class AudioDeepfakeDetector(nn.Module):
         """
         # x = self.shape_transform(x)
         raw_output = self.model(x)
+        return self.output_to_score(raw_output)
+
+    def output_to_score(self, raw_output):
+        """
+        Reduce the raw model output to a single score per input.
+        """
         if raw_output.dim() > 1 and raw_output.size(1) > 1:
             # Assumes the score for the positive class (e.g., fake) is the second neuron
             score = raw_output[:, 0]